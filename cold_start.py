@@ -0,0 +1,130 @@
+"""
+Local cold-start measurement for the list_buckets Lambda.
+
+Every run starts a fresh interpreter, imports ``lambda_function`` and invokes
+the handler once against moto, reading the init duration and S3 call latency
+from the function's own EMF line. moto has to be imported before the function
+(it imports boto3 itself), so the child times ``import boto3`` on its own
+first and adds it to the import and init figures, as a real cold start pays
+it inside the function's init. It is the same in every mode; the difference
+lies in the first invocation, where creating the S3 client loads botocore's
+data files. Modes:
+
+- ``default``: stock botocore loader,
+- ``slim-cold``: ``SLIM_BOTOCORE=1`` with an empty model cache,
+- ``slim-warm``: ``SLIM_BOTOCORE=1`` reading the cache the previous run wrote.
+
+Usage::
+
+    python cold_start.py
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+FUNCTION_DIR: str = os.path.join(os.path.dirname(__file__), "lambdas", "list_buckets")
+
+MODES: tuple = ("default", "slim-cold", "slim-warm")
+
+# Runs inside the fresh interpreter; prints one JSON line of timings
+_CHILD = """
+import io, contextlib, json, sys, time
+started = time.perf_counter()
+import boto3  # Timed here: moto imports it too, before the function would
+boto3_ms = (time.perf_counter() - started) * 1000
+from moto import mock_aws  # Before the function, so its session is mocked too
+sys.path.insert(0, {function_dir!r})
+started = time.perf_counter()
+import lambda_function
+imported = time.perf_counter()
+with mock_aws():
+    stdout = io.StringIO()
+    invoked = time.perf_counter()
+    with contextlib.redirect_stdout(stdout):
+        lambda_function.lambda_handler({{}}, None)
+    finished = time.perf_counter()
+emf = json.loads(stdout.getvalue().splitlines()[-1])
+print(json.dumps({{
+    "boto3_import_ms": boto3_ms,
+    "import_ms": boto3_ms + (imported - started) * 1000,
+    "init_ms": boto3_ms + emf["InitDuration"],
+    "first_invocation_ms": (finished - invoked) * 1000,
+    "s3_call_ms": emf["S3CallLatency"],
+}}))
+"""
+
+
+def measure_once(mode: str, cache_dir: str) -> dict:
+    """
+    Times one cold start in a fresh interpreter.
+
+    Args:
+        mode (str): One of MODES.
+        cache_dir (str): SLIM_BOTOCORE_CACHE_DIR for the child.
+
+    Returns:
+        dict: boto3_import_ms, import_ms, init_ms, first_invocation_ms and
+              s3_call_ms (import and init include the boto3 import).
+    """
+    env = {
+        **os.environ,
+        "EMF_METRICS_ENABLED": "1",
+        "SLIM_BOTOCORE": "0" if mode == "default" else "1",
+        "SLIM_BOTOCORE_CACHE_DIR": cache_dir,
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "AWS_ACCESS_KEY_ID": "testing",
+        "AWS_SECRET_ACCESS_KEY": "testing",
+    }
+    if mode == "slim-cold":
+        for name in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, name))
+    output = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(function_dir=FUNCTION_DIR)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+def measure(runs: int = 5) -> dict:
+    """
+    Measures every mode several times and keeps the medians.
+
+    Args:
+        runs (int, optional): Cold starts per mode. Defaults to 5.
+
+    Returns:
+        dict: mode -> median timings in milliseconds.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        samples = {mode: [] for mode in MODES}
+        for _ in range(runs):
+            for mode in MODES:  # Interleaved, so machine noise hits every mode
+                samples[mode].append(measure_once(mode, cache_dir))
+        for mode, rows in samples.items():
+            results[mode] = {
+                key: round(statistics.median(row[key] for row in rows), 1)
+                for key in rows[0]
+            }
+    return results
+
+
+if __name__ == "__main__":
+    # Print a small table of median cold-start timings per mode
+    print(
+        f"{'mode':<10} {'boto3':>8} {'import':>8} {'init':>8} {'1st call':>9} "
+        f"{'s3 call':>8}"
+    )
+    for mode, timings in measure().items():
+        print(
+            f"{mode:<10} {timings['boto3_import_ms']:>8} {timings['import_ms']:>8} "
+            f"{timings['init_ms']:>8} {timings['first_invocation_ms']:>9} "
+            f"{timings['s3_call_ms']:>8}"
+        )
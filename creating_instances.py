@@ -1,55 +1,75 @@
+import executors
 from helpers import (
-    create_ubuntu_instance,
-    create_amazon_linux_2023_instance,
-    create_amazon_linux_2_instance,
+    create_instance,
     get_ec2_client,
+    launch_client_token,
 )
+from launch_profiles import default_resolver, resolve_ami_type
 
 
 def create_instances(
-    ec2_client: object, ami_type: str = "ubuntu", instance_amount: int = 1
-) -> None:
+    ec2_client: object,
+    ami_type: str = "ubuntu",
+    instance_amount: int = 1,
+    launch_request_id: str | None = None,
+    region: str | None = None,
+) -> list:
     """
     Create one or more EC2 instances based on the specified AMI type.
 
     Args:
         ec2_client (object): Boto3 EC2 client used to create instances.
-        ami_type (str, optional): The type of AMI to use. Supported values:
+        ami_type (str, optional): The type of AMI to use. Any alias registered
+            in launch_profiles, ignoring case and spacing, e.g.:
             - "ubuntu"
-            - "linux2023"
-            - "linux2"
+            - "linux2023" / "al2023"
+            - "linux2" / "al2"
             Defaults to "ubuntu".
         instance_amount (int, optional): The number of instances to create. Defaults to 1.
+        launch_request_id (str, optional): ID for this launch request. When given,
+            each instance gets a ClientToken derived from it, so re-running the
+            same request after a timeout does not launch duplicates.
+        region (str, optional): Region of ``ec2_client``. When given, the AMI is
+            resolved for that region from SSM (cached) once, before any launch.
 
     Returns:
-        None
+        list: The IDs of the launched instances.
+
+    Raises:
+        ValueError: If the AMI type is not registered, or the profile has no
+            key pair and security groups for ``region``. Nothing is launched.
     """
-    # Normalize the AMI type string (e.g., " Ubuntu " -> "ubuntu", "Linux 2023" -> "linux2023")
-    cleaned_ami_type: str = ami_type.lower().strip().replace(" ", "")
+    # Look up the profile once (e.g., " Ubuntu " -> ubuntu, "AL2023" -> linux2023)
+    profile = resolve_ami_type(ami_type)
+
+    instance_ids: list[str] = []
+    if instance_amount <= 0:
+        return instance_ids
+
+    # Resolve the launch parameters (and the regional AMI) once, not per instance
+    launch_params: dict = default_resolver.launch_params(profile.name, region)
 
-    # Create the requested number of instances
+    def launch(i: int) -> list:
+        # Same request ID + index always yields the same idempotency token
+        token = launch_client_token(launch_request_id, i) if launch_request_id else None
+        return create_instance(
+            ec2_client, client_token=token, **launch_params
+        )  # Call helper with the profile's launch parameters
+
+    # Launch through the shared "ec2" pool; collect IDs back in request order
+    launched: dict = {}
+    for i, ids in executors.map_unordered(launch, range(instance_amount), pool="ec2"):
+        launched[i] = ids
+        print(f"{profile.label} Created")
     for i in range(instance_amount):
-        if cleaned_ami_type == "ubuntu":
-            create_ubuntu_instance(ec2_client)  # Call helper to create Ubuntu instance
-            print("Ubuntu Created")
-        elif cleaned_ami_type == "linux2023":
-            create_amazon_linux_2023_instance(
-                ec2_client
-            )  # Call helper to create Amazon Linux 2023 instance
-            print("Linux 2023 Created")
-        elif cleaned_ami_type == "linux2":
-            create_amazon_linux_2_instance(
-                ec2_client
-            )  # Call helper to create Amazon Linux 2 instance
-            print("Linux 2 Created")
-        else:
-            # Handle unsupported AMI types gracefully
-            print("Unsupported AMI")
+        instance_ids.extend(launched[i])
+
+    return instance_ids
 
 
 if __name__ == "__main__":
-    # Get the EC2 client
-    ec2_client = get_ec2_client()
+    # Get an EC2 client sized for the shared "ec2" worker pool
+    ec2_client = get_ec2_client(concurrency=executors.pool_size("ec2"))
 
     # Example usage with different AMI types and amounts
     create_instances(ec2_client)  # Default Ubuntu, 1 instance
@@ -0,0 +1,225 @@
+"""
+Shared worker pools for every fan-out in the project.
+
+Each AWS service gets one named, bounded ``ThreadPoolExecutor`` that is created
+on first use and shared by every caller, so parallel features do not each
+start their own threads (and exhaust the client's connection pool). Size
+clients to match, e.g. ``helpers.get_ec2_client(concurrency=pool_size("ec2"))``.
+
+``map_unordered`` streams results as tasks finish while keeping at most
+``max_in_flight`` futures alive, so a huge input iterator is consumed lazily.
+Work already running inside a pool that fans out to the *same* pool runs
+inline instead, which rules out the classic nested-submit deadlock.
+
+While instrumentation is enabled, every task records its queue wait and run
+time (``executor_queue_seconds`` / ``executor_task_seconds``, labelled by pool).
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import instrumentation
+
+# Default worker count per named pool; override with EXECUTOR_<NAME>_WORKERS
+POOL_SIZES: dict = {
+    "ec2": 16,
+    "s3": 16,
+    "ssm": 4,
+    "service-quotas": 4,
+    "accounts": 16,  # Account x region cells of multi_account.run_matrix
+    "default": 8,
+}
+
+_pools: dict = {}  # pool name -> ThreadPoolExecutor
+_pools_lock = threading.Lock()
+_local = threading.local()  # .pool is set while a worker runs a task
+
+
+def pool_size(name: str) -> int:
+    """
+    Returns the worker count of a named pool.
+
+    Args:
+        name (str): The pool name, usually the AWS service name.
+
+    Returns:
+        int: The configured size.
+    """
+    env_name = f"EXECUTOR_{name.upper().replace('-', '_')}_WORKERS"
+    default = POOL_SIZES.get(name, POOL_SIZES["default"])
+    return int(os.environ.get(env_name, default))
+
+
+def get_pool(name: str = "default") -> ThreadPoolExecutor:
+    """
+    Returns the shared executor for a name, creating it on first use.
+
+    Args:
+        name (str, optional): The pool name. Defaults to "default".
+
+    Returns:
+        ThreadPoolExecutor: The shared, bounded executor.
+    """
+    with _pools_lock:
+        pool = _pools.get(name)
+        if pool is None:
+            pool = ThreadPoolExecutor(
+                max_workers=pool_size(name), thread_name_prefix=f"{name}-pool"
+            )
+            _pools[name] = pool
+        return pool
+
+
+def shutdown(wait_for_tasks: bool = True) -> None:
+    """
+    Shuts every pool down; queued tasks that have not started are cancelled.
+
+    Pools are recreated on the next ``get_pool`` call.
+
+    Args:
+        wait_for_tasks (bool, optional): Block until running tasks finish.
+            Defaults to True.
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=wait_for_tasks, cancel_futures=True)
+
+
+def _in_pool(name: str) -> bool:
+    """Reports whether the current thread is a worker of the named pool."""
+    return getattr(_local, "pool", None) == name
+
+
+def _run_task(pool: str, func, args: tuple, kwargs: dict, submitted: float):
+    """Runs one task in a worker, recording queue and run time when enabled."""
+    started = time.perf_counter()
+    previous, _local.pool = getattr(_local, "pool", None), pool
+    try:
+        return func(*args, **kwargs)
+    finally:
+        _local.pool = previous
+        if instrumentation.is_enabled():
+            registry = instrumentation.registry
+            registry.observe("executor_queue_seconds", pool, started - submitted)
+            registry.observe(
+                "executor_task_seconds", pool, time.perf_counter() - started
+            )
+
+
+def submit(pool: str, func, *args, **kwargs) -> Future:
+    """
+    Submits one task to a named pool.
+
+    Called from a worker of the same pool, the task runs inline and an
+    already completed future is returned.
+
+    Args:
+        pool (str): The pool name.
+        func (callable): The task.
+        *args: Positional arguments for the task.
+        **kwargs: Keyword arguments for the task.
+
+    Returns:
+        Future: The task's future.
+    """
+    submitted = time.perf_counter()
+    if _in_pool(pool):
+        future = Future()
+        try:
+            future.set_result(_run_task(pool, func, args, kwargs, submitted))
+        except Exception as error:  # noqa: BLE001 - re-raised by future.result()
+            future.set_exception(error)
+        return future
+    return get_pool(pool).submit(_run_task, pool, func, args, kwargs, submitted)
+
+
+def map_unordered(
+    func,
+    items,
+    pool: str = "default",
+    max_in_flight: int | None = None,
+    cancel_event: threading.Event | None = None,
+    return_exceptions: bool = False,
+):
+    """
+    Applies ``func`` to every item in a shared pool, yielding as tasks finish.
+
+    At most ``max_in_flight`` futures exist at any time; the next item is
+    pulled from ``items`` only when a slot frees up. When ``cancel_event`` is
+    set, no further items are submitted, queued tasks are cancelled and the
+    tasks already running are allowed to finish and are still yielded.
+
+    Args:
+        func (callable): Function of one item.
+        items (iterable): Inputs; consumed lazily.
+        pool (str, optional): Pool name. Defaults to "default".
+        max_in_flight (int, optional): Bound on outstanding futures.
+            Defaults to twice the pool size.
+        cancel_event (threading.Event, optional): Set it to stop gracefully.
+        return_exceptions (bool, optional): Yield a task's exception as its
+            result instead of raising it. Defaults to False.
+
+    Yields:
+        tuple: (item, result) in completion order.
+
+    Raises:
+        Exception: The first task exception, unless ``return_exceptions`` is
+            set. Outstanding queued tasks are cancelled first.
+    """
+    if _in_pool(pool):
+        # Nested fan-out into our own pool would wait on itself; run inline
+        for item in items:
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            try:
+                result = func(item)
+            except Exception as error:
+                if not return_exceptions:
+                    raise
+                result = error
+            yield item, result
+        return
+
+    limit = max_in_flight or 2 * pool_size(pool)
+    iterator = iter(items)
+    in_flight: dict = {}  # future -> item
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(in_flight) < limit:
+                if cancel_event is not None and cancel_event.is_set():
+                    exhausted = True
+                    break
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    exhausted = True
+                    break
+                in_flight[submit(pool, func, item)] = item
+            if not in_flight:
+                return
+            if cancel_event is not None and cancel_event.is_set():
+                exhausted = True
+                for future in list(in_flight):
+                    if future.cancel():
+                        del in_flight[future]  # Never started; drop it quietly
+                if not in_flight:
+                    return
+
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                item = in_flight.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield item, future.result()
+                elif return_exceptions:
+                    yield item, error
+                else:
+                    raise error
+    finally:
+        for future in in_flight:
+            future.cancel()  # Early exit or error: drop work that has not started
@@ -0,0 +1,196 @@
+"""
+Opt-in fast parsing of DescribeInstances responses.
+
+botocore turns every DescribeInstances page into a full tree of dicts, and on
+big fleets most of that CPU time goes to fields nobody reads. With the fast
+path, a ``before-parse`` hook reads the raw XML body with ``iterparse``, keeps
+only the requested instance fields, and clears every element once it has been
+read. botocore is then handed a stub body, so its own parser has almost nothing
+left to do.
+
+The fields that are kept are converted with botocore's own shape-aware parser,
+so ``State``, ``Tags`` or ``LaunchTime`` come out exactly as on the normal
+path. Use it through ``helpers.iter_instances(client, fields=...)`` or
+``helpers.describe_instances(client, fields=...)``.
+"""
+
+import io
+import threading
+from contextlib import contextmanager
+from xml.etree import ElementTree
+from xml.sax.saxutils import escape
+
+import boto3
+from botocore.parsers import EC2QueryParser
+
+# Fields returned when the fast path is asked for without a field list
+DEFAULT_FIELDS: tuple = ("InstanceId", "State", "InstanceType", "Tags")
+
+# Element depth of an instance <item> below the response root:
+# DescribeInstancesResponse/reservationSet/item/instancesSet/item
+# (reservationSet/item/groupSet/item is at the same depth but is not one)
+_INSTANCE_DEPTH = 5
+_RESERVATION_DEPTH = 3
+
+_local = threading.local()  # .fields is set while a fast page is requested
+_shape_parser = EC2QueryParser()  # Converts the kept subtrees, as botocore would
+
+
+def _tag(element) -> str:
+    """Strips the XML namespace from an element's tag."""
+    return element.tag.rpartition("}")[2]
+
+
+def instance_members(output_shape, fields: tuple) -> dict:
+    """
+    Maps the XML names of requested instance fields to their botocore shapes.
+
+    Args:
+        output_shape (botocore.model.Shape): DescribeInstances output shape.
+        fields (tuple): Instance member names, e.g. ("InstanceId", "State").
+
+    Returns:
+        dict: XML element name -> (member name, member shape).
+
+    Raises:
+        ValueError: If a field is not an Instance member.
+    """
+    instance_shape = output_shape.members["Reservations"].member
+    instance_shape = instance_shape.members["Instances"].member
+    unknown = set(fields) - set(instance_shape.members)
+    if unknown:
+        raise ValueError(f"Unknown instance fields {sorted(unknown)}")
+    members = {}
+    for name in fields:
+        shape = instance_shape.members[name]
+        members[shape.serialization.get("name", name)] = (name, shape)
+    return members
+
+
+def parse_instances(body: bytes, members: dict) -> tuple:
+    """
+    Streams a raw DescribeInstances body, keeping only the requested fields.
+
+    Args:
+        body (bytes): The raw XML response body.
+        members (dict): Output of ``instance_members``.
+
+    Returns:
+        tuple: (reservations, next token or None, request ID or None), where
+        reservations is a list of {"Instances": [...]} dicts.
+    """
+    reservations = []
+    next_token = request_id = None
+    path = []  # Tags from the root down to the current element
+    instance: dict | None = None  # Set while inside an instancesSet <item>
+    for event, element in ElementTree.iterparse(
+        io.BytesIO(body), events=("start", "end")
+    ):
+        if event == "start":
+            path.append(_tag(element))
+            if len(path) == _RESERVATION_DEPTH:
+                reservations.append({"Instances": []})
+            elif len(path) == _INSTANCE_DEPTH and path[-2] == "instancesSet":
+                instance = {}
+            continue
+
+        path.pop()
+        depth = len(path)
+        if depth == _INSTANCE_DEPTH:  # A direct child of an <item> at that depth
+            member = members.get(_tag(element))
+            if instance is not None and member is not None:
+                name, shape = member
+                instance[name] = _shape_parser._parse_shape(shape, element)
+            element.clear()  # Drop the subtree whether it was kept or not
+        elif depth == _INSTANCE_DEPTH - 1:
+            if instance is not None:
+                reservations[-1]["Instances"].append(instance)
+                instance = None
+            element.clear()
+        elif depth == _RESERVATION_DEPTH - 1:
+            element.clear()
+        elif depth == 1:
+            tag = _tag(element)
+            if tag == "nextToken":
+                next_token = element.text
+            elif tag == "requestId":
+                request_id = element.text
+    return reservations, next_token, request_id
+
+
+def _before_parse(operation_model, response_dict, customized_response_dict, **kwargs):
+    """Replaces botocore's parse of a page requested through the fast path."""
+    fields = getattr(_local, "fields", None)
+    if (
+        fields is None
+        or response_dict["status_code"] >= 300  # Errors take the normal path
+        or operation_model.service_model.resolved_protocol != "ec2"
+        or not isinstance(response_dict.get("body"), bytes)
+    ):
+        return
+    members = instance_members(operation_model.output_shape, fields)
+    reservations, next_token, request_id = parse_instances(
+        response_dict["body"], members
+    )
+    customized_response_dict["Reservations"] = reservations
+    if next_token:
+        customized_response_dict["NextToken"] = next_token
+    stub = "<DescribeInstancesResponse>"
+    if request_id:
+        stub += f"<requestId>{escape(request_id)}</requestId>"
+    response_dict["body"] = (stub + "</DescribeInstancesResponse>").encode()
+
+
+def enable(client: boto3.client) -> None:
+    """
+    Registers the fast-path hook on an EC2 client (idempotent).
+
+    The hook does nothing unless a page is requested inside ``requesting``.
+
+    Args:
+        client (boto3.client): The EC2 client.
+    """
+    client.meta.events.register(
+        "before-parse.ec2.DescribeInstances",
+        _before_parse,
+        unique_id="fast-describe-before-parse",
+    )
+
+
+@contextmanager
+def requesting(fields: tuple):
+    """
+    Requests fast parsing, for the current thread, of the pages fetched inside.
+
+    Args:
+        fields (tuple): Instance member names to keep; InstanceId is always kept.
+    """
+    previous = getattr(_local, "fields", None)
+    _local.fields = ("InstanceId",) + tuple(f for f in fields if f != "InstanceId")
+    try:
+        yield
+    finally:
+        _local.fields = previous
+
+
+def iter_pages(client: boto3.client, fields: tuple = DEFAULT_FIELDS, **params):
+    """
+    Pages DescribeInstances through the fast path.
+
+    Args:
+        client (boto3.client): The EC2 client.
+        fields (tuple, optional): Instance member names to keep.
+            Defaults to DEFAULT_FIELDS.
+        **params: DescribeInstances parameters such as Filters.
+
+    Yields:
+        dict: One parsed page holding only the requested instance fields.
+    """
+    enable(client)
+    pages = iter(client.get_paginator("describe_instances").paginate(**params))
+    while True:
+        with requesting(fields):  # Only around the request, never across a yield
+            page = next(pages, None)
+        if page is None:
+            return
+        yield page
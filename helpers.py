@@ -1,36 +1,227 @@
+import hashlib  # Used to derive deterministic idempotency tokens
+import os  # Reads optional tuning settings from the environment
+import re  # Pulls instance IDs out of EC2 error messages
+
 import boto3  # Import the Boto3 library to interact with AWS services
+from botocore.config import Config  # Connection pool, keep-alive and timeout settings
+from botocore.exceptions import ClientError
+
+import executors  # Shared worker pools used for every fan-out below
+import fast_describe  # Opt-in raw XML parsing for describe_instances
+import instrumentation  # Optional latency/retry metrics for the functions below
+import rate_limiting  # Shared client-side limiter for bulk API calls
+import singleflight  # Coalesces identical concurrent listing calls
+from instrumentation import timed
+
+# Default launch parameters used by create_instance
+DEFAULT_REGION = "us-east-1"  # Region the key pair and security groups below live in
+DEFAULT_INSTANCE_TYPE = "t2.micro"  # Instance type for new instances
+DEFAULT_KEY_NAME = "private-ec2"  # Key pair name for new instances
+DEFAULT_SECURITY_GROUP_IDS = ("sg-0197b8159a5d886f8",)  # Security groups to attach
+
+# AMI IDs used by the create_*_instance helpers (us-east-1)
+UBUNTU_AMI_ID = "ami-04b70fa74e45c3917"
+AMAZON_LINUX_2023_AMI_ID = "ami-08a0d1e16fc3f61ea"
+AMAZON_LINUX_2_AMI_ID = "ami-0eaf7c3456e7b5b68"
+
+# HTTP settings for every client created below
+DEFAULT_MAX_POOL_CONNECTIONS = 10  # botocore's own default pool size
+CONNECT_TIMEOUT_SECONDS = 5  # Fail fast on an unreachable endpoint
+READ_TIMEOUT_SECONDS = 30  # No describe/list call should take longer per page
+
+# Identical concurrent listings share one API call; a TTL > 0 also reuses results
+listing_flight = singleflight.SingleFlight(
+    ttl=float(os.environ.get("HELPERS_LISTING_CACHE_TTL", "0")), name="helpers"
+)
+
+# Partitioned listing: every instance state, and the family letters types start with
+INSTANCE_STATES = (
+    "pending",
+    "running",
+    "shutting-down",
+    "terminated",
+    "stopping",
+    "stopped",
+)
+INSTANCE_FAMILY_LETTERS = "abcdefghijklmnopqrstuvwxyz"
+
+# Bulk lifecycle operations
+BULK_CHUNK_SIZE = 1000  # Most instance IDs sent in one Terminate/Stop/Start call
+
+# Error code EC2 returns when a request names instance IDs it does not know
+INSTANCE_NOT_FOUND = "InvalidInstanceID.NotFound"
+INSTANCE_ID_PATTERN = re.compile(r"\bi-[0-9a-f]+\b")  # IDs quoted in error messages
+
+# Errors caused by some of the IDs in a request; only these are worth bisecting.
+# Anything else (throttling, UnauthorizedOperation, ...) fails the whole chunk.
+PER_INSTANCE_ERRORS = frozenset(
+    (INSTANCE_NOT_FOUND, "InvalidInstanceID.Malformed", "IncorrectInstanceState")
+)
+
+# Per operation: (client method, response key, states selected by filter/tag)
+LIFECYCLE_OPERATIONS = {
+    "terminate": (
+        "terminate_instances",
+        "TerminatingInstances",
+        ("pending", "running", "stopping", "stopped"),
+    ),
+    "stop": ("stop_instances", "StoppingInstances", ("pending", "running")),
+    "start": ("start_instances", "StartingInstances", ("stopped",)),
+}
+
+
+def client_config(concurrency: int | None = None) -> Config:
+    """
+    Builds the botocore config used by every client factory.
 
+    Args:
+        concurrency (int, optional): Number of threads expected to share the
+            client. The connection pool is sized to match so fan-out does not
+            queue on connections ("Connection pool is full" warnings).
 
-def get_ec2_client() -> boto3.client:
+    Returns:
+        botocore.config.Config: Pool size, TCP keep-alive and timeouts.
+    """
+    return Config(
+        max_pool_connections=max(DEFAULT_MAX_POOL_CONNECTIONS, concurrency or 0),
+        tcp_keepalive=True,  # Keep idle pooled connections alive between bursts
+        connect_timeout=CONNECT_TIMEOUT_SECONDS,
+        read_timeout=READ_TIMEOUT_SECONDS,
+    )
+
+
+def _new_client(
+    service: str,
+    region_name: str | None = None,
+    concurrency: int | None = None,
+    session: boto3.session.Session = None,
+) -> boto3.client:
+    """Creates a configured, optionally instrumented client for a service."""
+    factory = session.client if session is not None else boto3.client
+    client = factory(
+        service, region_name=region_name, config=client_config(concurrency)
+    )
+    if instrumentation.is_enabled():
+        instrumentation.instrument_client(client)  # Attach botocore timing hooks
+    return client
+
+
+@timed
+def get_ec2_client(
+    concurrency: int | None = None,
+    region_name: str | None = None,
+    session: boto3.session.Session = None,
+) -> boto3.client:
     """
     Creates and returns an EC2 client using Boto3.
 
+    Args:
+        concurrency (int, optional): Threads that will share the client; sizes
+            the connection pool. Defaults to botocore's pool of 10.
+        region_name (str, optional): The AWS region. Defaults to the configured region.
+        session (boto3.session.Session, optional): Session whose credentials to
+            use, e.g. an assumed role. Defaults to the ambient credentials.
+
     Returns:
         boto3.client: The EC2 client.
     """
-    return boto3.client("ec2")
+    return _new_client("ec2", region_name, concurrency, session)
 
 
-def get_s3_client() -> boto3.client:
+@timed
+def get_s3_client(
+    concurrency: int | None = None,
+    region_name: str | None = None,
+    session: boto3.session.Session = None,
+) -> boto3.client:
     """
     Creates and returns an S3 client using Boto3.
 
+    Args:
+        concurrency (int, optional): Threads that will share the client; sizes
+            the connection pool. Defaults to botocore's pool of 10.
+        region_name (str, optional): The AWS region. Defaults to the configured region.
+        session (boto3.session.Session, optional): Session whose credentials to
+            use, e.g. an assumed role. Defaults to the ambient credentials.
+
     Returns:
         boto3.client: The S3 client.
     """
-    return boto3.client("s3")
+    return _new_client("s3", region_name, concurrency, session)
+
+
+@timed
+def get_ssm_client(region_name: str | None = None) -> boto3.client:
+    """
+    Creates and returns an SSM client using Boto3.
+
+    Args:
+        region_name (str, optional): The AWS region. Defaults to the configured region.
+
+    Returns:
+        boto3.client: The SSM client.
+    """
+    return _new_client("ssm", region_name=region_name)
+
+
+@timed
+def get_service_quotas_client(region_name: str | None = None) -> boto3.client:
+    """
+    Creates and returns a Service Quotas client using Boto3.
+
+    Args:
+        region_name (str, optional): The AWS region. Defaults to the configured region.
+
+    Returns:
+        boto3.client: The Service Quotas client.
+    """
+    return _new_client("service-quotas", region_name=region_name)
 
 
-def describe_instances(client: boto3.client) -> list:
+@timed
+def describe_instances(
+    client: boto3.client, partition_by: str | None = None, fields: tuple | None = None
+) -> list:
     """
     Describes EC2 instances and returns a list of instances.
 
     Args:
         client (boto3.client): The EC2 client used to describe instances.
+        partition_by (str, optional): Page disjoint partitions concurrently
+            instead of one sequential walk; see ``iter_instances_partitioned``.
+        fields (tuple, optional): Keep only these instance fields, parsed
+            straight from the raw response; see ``fast_describe``.
+
+    Concurrent identical calls (same client and arguments) are coalesced
+    into one API round trip through ``listing_flight``.
 
     Returns:
         list: A list of instances.
     """
+    return list(  # Callers get their own list; the instances are shared
+        listing_flight.do(
+            (
+                "describe_instances",
+                client,
+                partition_by,
+                tuple(fields) if fields else None,
+            ),
+            _describe_instances,
+            client,
+            partition_by,
+            fields,
+        )
+    )
+
+
+def _describe_instances(
+    client: boto3.client, partition_by: str | None = None, fields: tuple | None = None
+) -> list:
+    """Uncoalesced body of describe_instances."""
+    if partition_by:
+        return list(iter_instances_partitioned(client, partition_by, fields=fields))
+    if fields:
+        return list(iter_instances(client, fields=fields))
     response = (
         client.describe_instances()
     )  # Call the describe_instances method to get information about EC2 instances
@@ -44,73 +235,453 @@ def describe_instances(client: boto3.client) -> list:
     return instances
 
 
-def create_ubuntu_instance(client: boto3.client) -> None:
+def iter_instances(
+    client: boto3.client,
+    filters: list | None = None,
+    instance_ids: list | None = None,
+    fields: tuple | None = None,
+):
+    """
+    Streams EC2 instances page by page instead of building one big list.
+
+    Args:
+        client (boto3.client): The EC2 client used to describe instances.
+        filters (list, optional): DescribeInstances filters.
+        instance_ids (list, optional): Restrict the stream to these IDs.
+        fields (tuple, optional): Keep only these instance fields (InstanceId
+            is always kept). The raw XML is parsed with ``fast_describe``
+            instead of botocore, which is much cheaper on big fleets.
+
+    Yields:
+        dict: One instance description at a time.
+    """
+    params = {}
+    if filters:
+        params["Filters"] = filters
+    if instance_ids:
+        params["InstanceIds"] = list(instance_ids)
+    if fields:
+        pages = fast_describe.iter_pages(client, fields, **params)
+    else:
+        pages = client.get_paginator("describe_instances").paginate(**params)
+    for page in pages:  # One API call per page
+        for reservation in page["Reservations"]:
+            yield from reservation["Instances"]
+
+
+def instance_partitions(client: boto3.client, partition_by: str) -> list:
+    """
+    Splits the DescribeInstances query space into disjoint filter partitions.
+
+    Args:
+        client (boto3.client): The EC2 client (used to list availability zones).
+        partition_by (str): "availability-zone", "instance-state-name" or
+            "instance-family" (first letter of the instance type). Partitions
+            by state can miss instances that change state mid-listing; see
+            ``iter_instances_partitioned``.
+
+    Returns:
+        list: One DescribeInstances filter per partition.
+
+    Raises:
+        ValueError: If the partition key is unknown.
+    """
+    if partition_by == "availability-zone":
+        zones = client.describe_availability_zones()["AvailabilityZones"]
+        values = [[zone["ZoneName"]] for zone in zones]
+    elif partition_by == "instance-state-name":
+        values = [[state] for state in INSTANCE_STATES]
+    elif partition_by == "instance-family":
+        partition_by = "instance-type"  # Filter values accept '*' wildcards
+        values = [[f"{letter}*"] for letter in INSTANCE_FAMILY_LETTERS]
+    else:
+        raise ValueError(f"Unsupported partition key {partition_by!r}")
+    return [{"Name": partition_by, "Values": value} for value in values]
+
+
+def iter_instances_partitioned(
+    client: boto3.client,
+    partition_by: str = "availability-zone",
+    filters: list | None = None,
+    max_in_flight: int | None = None,
+    fields: tuple | None = None,
+):
+    """
+    Streams instances by paging disjoint partitions concurrently.
+
+    Each partition is paged by one task in the shared "ec2" pool, so the
+    wall-clock time of a large listing drops with the worker count. Results
+    are deduplicated by instance ID in case an instance moves between
+    partitions while the listing runs.
+
+    An instance's availability zone never changes, so zone partitions are
+    stable. Its state (and, while stopped, its type) can: an instance that
+    moves after its new partition was listed but before its old one was is
+    missed entirely. Use "instance-state-name" only when such a gap is
+    acceptable, e.g. for dashboards refreshed periodically.
+
+    Args:
+        client (boto3.client): The EC2 client; size it with
+            ``get_ec2_client(concurrency=executors.pool_size("ec2"))``.
+        partition_by (str, optional): See ``instance_partitions``.
+            Defaults to "availability-zone".
+        filters (list, optional): Extra filters applied to every partition.
+        max_in_flight (int, optional): Partitions listed at once.
+        fields (tuple, optional): Keep only these instance fields; see
+            ``iter_instances``.
+
+    Yields:
+        dict: One instance description at a time, partition by partition.
+    """
+    partitions = instance_partitions(client, partition_by)
+    seen = set()  # Instance IDs already yielded
+    results = executors.map_unordered(
+        lambda partition: list(
+            iter_instances(client, list(filters or []) + [partition], fields=fields)
+        ),
+        partitions,
+        pool="ec2",
+        max_in_flight=max_in_flight,
+    )
+    for _, instances in results:
+        for instance in instances:
+            if instance["InstanceId"] not in seen:
+                seen.add(instance["InstanceId"])
+                yield instance
+
+
+def tag_filters(tags: dict) -> list:
+    """
+    Converts a tag mapping into DescribeInstances filters.
+
+    Args:
+        tags (dict): Tag key -> value, or a list/tuple of accepted values.
+
+    Returns:
+        list: Filters matching instances that carry every tag.
+    """
+    return [
+        {
+            "Name": f"tag:{key}",
+            "Values": list(value) if isinstance(value, (list, tuple)) else [value],
+        }
+        for key, value in tags.items()
+    ]
+
+
+def not_found_instance_ids(error: ClientError) -> list:
+    """
+    Returns the instance IDs an InvalidInstanceID.NotFound error names.
+
+    Args:
+        error (ClientError): The error raised by an EC2 call.
+
+    Returns:
+        list: The IDs quoted in the error message; empty for other errors.
+    """
+    if error.response["Error"]["Code"] != INSTANCE_NOT_FOUND:
+        return []
+    return INSTANCE_ID_PATTERN.findall(error.response["Error"].get("Message", ""))
+
+
+def call_without_unknown_ids(call, instance_ids: list) -> tuple:
+    """
+    Calls ``call(instance_ids)``, retrying without IDs EC2 does not know.
+
+    EC2 rejects a whole request that names an unknown instance and quotes the
+    offending IDs in the error, so those are dropped and the rest retried.
+    When the error names none of the requested IDs, all of them are treated
+    as unknown.
+
+    Args:
+        call (callable): Function of a list of instance IDs, e.g. a lambda
+            around ``describe_instances``.
+        instance_ids (list): The IDs to request.
+
+    Returns:
+        tuple: (response, unknown IDs); response is None if no ID was left.
+
+    Raises:
+        ClientError: For any error other than InvalidInstanceID.NotFound.
+    """
+    remaining, unknown = list(instance_ids), []
+    while remaining:
+        try:
+            return call(remaining), unknown
+        except ClientError as error:
+            if error.response["Error"]["Code"] != INSTANCE_NOT_FOUND:
+                raise
+            missing = set(not_found_instance_ids(error)) & set(remaining)
+            if not missing:
+                return None, unknown + remaining
+            unknown += [i for i in remaining if i in missing]
+            remaining = [i for i in remaining if i not in missing]
+    return None, unknown
+
+
+def _lifecycle_chunk(
+    client: boto3.client, operation: str, instance_ids: list, limiter
+) -> dict:
+    """
+    Runs one lifecycle call and returns per-instance outcomes.
+
+    EC2 rejects the whole request when any ID is bad, so a chunk failing with
+    one of PER_INSTANCE_ERRORS is split in half and retried until the bad IDs
+    are isolated; the good ones still go through with only a few extra calls.
+    Any other error applies to every ID in the chunk and is not retried.
+    """
+    method, response_key, _ = LIFECYCLE_OPERATIONS[operation]
+    limiter.acquire()  # Wait for the shared rate limiter
+    try:
+        response = getattr(client, method)(InstanceIds=instance_ids)
+    except ClientError as error:
+        code = error.response["Error"]["Code"]
+        if len(instance_ids) == 1 or code not in PER_INSTANCE_ERRORS:
+            failure = {
+                "ok": False,
+                "error": code,
+                "message": error.response["Error"].get("Message", ""),
+            }
+            return {instance_id: dict(failure) for instance_id in instance_ids}
+        middle = len(instance_ids) // 2
+        outcomes = _lifecycle_chunk(client, operation, instance_ids[:middle], limiter)
+        outcomes.update(
+            _lifecycle_chunk(client, operation, instance_ids[middle:], limiter)
+        )
+        return outcomes
+    return {
+        change["InstanceId"]: {
+            "ok": True,
+            "previous_state": change["PreviousState"]["Name"],
+            "current_state": change["CurrentState"]["Name"],
+        }
+        for change in response[response_key]
+    }
+
+
+def bulk_instance_operation(
+    client: boto3.client,
+    operation: str,
+    instance_ids: list | None = None,
+    filters: list | None = None,
+    tags: dict | None = None,
+    chunk_size: int = BULK_CHUNK_SIZE,
+    max_in_flight: int | None = None,
+    limiter: rate_limiting.TokenBucket | None = None,
+) -> dict:
+    """
+    Terminates, stops or starts many instances with chunked concurrent calls.
+
+    Instances are selected either by ID or by filters/tags; filter selection
+    streams matching instances through ``iter_instances`` and only picks
+    those in a state the operation applies to.
+
+    Args:
+        client (boto3.client): The EC2 client.
+        operation (str): "terminate", "stop" or "start".
+        instance_ids (list, optional): Explicit instance IDs.
+        filters (list, optional): DescribeInstances filters.
+        tags (dict, optional): Tag key -> value(s) to match.
+        chunk_size (int, optional): IDs per API call. Defaults to BULK_CHUNK_SIZE.
+        max_in_flight (int, optional): Chunks outstanding at once in the shared
+            "ec2" pool. Defaults to the executors default.
+        limiter (TokenBucket, optional): Rate limiter taken before every call.
+            Defaults to rate_limiting.shared_limiter.
+
+    Returns:
+        dict: Instance ID -> outcome. Successful outcomes carry
+              ``previous_state`` and ``current_state``; failed ones carry the
+              EC2 ``error`` code and ``message``. ``ok`` tells them apart.
+
+    Raises:
+        ValueError: If the operation is unknown or no selector is given.
+    """
+    if operation not in LIFECYCLE_OPERATIONS:
+        raise ValueError(f"Unsupported operation {operation!r}")
+    if instance_ids is None and not filters and not tags:
+        raise ValueError("Pass instance_ids, filters or tags to select instances")
+    limiter = limiter or rate_limiting.shared_limiter
+
+    if instance_ids is None:
+        states = LIFECYCLE_OPERATIONS[operation][2]
+        selection = list(filters or []) + tag_filters(tags or {})
+        selection.append({"Name": "instance-state-name", "Values": list(states)})
+        instance_ids = [i["InstanceId"] for i in iter_instances(client, selection)]
+    instance_ids = list(dict.fromkeys(instance_ids))  # Drop duplicates, keep order
+    if not instance_ids:
+        return {}
+
+    chunks = (
+        instance_ids[start : start + chunk_size]
+        for start in range(0, len(instance_ids), chunk_size)
+    )
+    outcomes = {}
+    results = executors.map_unordered(
+        lambda chunk: _lifecycle_chunk(client, operation, chunk, limiter),
+        chunks,
+        pool="ec2",
+        max_in_flight=max_in_flight,
+    )
+    for _, chunk_outcomes in results:
+        outcomes.update(chunk_outcomes)
+    return outcomes
+
+
+@timed
+def terminate_instances(
+    client: boto3.client, instance_ids: list | None = None, **kwargs
+) -> dict:
+    """
+    Terminates instances in bulk. See ``bulk_instance_operation`` for arguments.
+
+    Returns:
+        dict: Instance ID -> outcome.
+    """
+    return bulk_instance_operation(client, "terminate", instance_ids, **kwargs)
+
+
+@timed
+def stop_instances(
+    client: boto3.client, instance_ids: list | None = None, **kwargs
+) -> dict:
+    """
+    Stops instances in bulk. See ``bulk_instance_operation`` for arguments.
+
+    Returns:
+        dict: Instance ID -> outcome.
+    """
+    return bulk_instance_operation(client, "stop", instance_ids, **kwargs)
+
+
+@timed
+def start_instances(
+    client: boto3.client, instance_ids: list | None = None, **kwargs
+) -> dict:
+    """
+    Starts instances in bulk. See ``bulk_instance_operation`` for arguments.
+
+    Returns:
+        dict: Instance ID -> outcome.
+    """
+    return bulk_instance_operation(client, "start", instance_ids, **kwargs)
+
+
+@timed
+def create_ubuntu_instance(
+    client: boto3.client, client_token: str | None = None
+) -> list:
     """
     Creates an Ubuntu EC2 instance.
 
     Args:
         client (boto3.client): The EC2 client used to create the instance.
+        client_token (str, optional): Idempotency token passed to RunInstances.
 
     Returns:
-        None
+        list: The IDs of the launched instances.
     """
-    create_instance(
-        client, "ami-04b70fa74e45c3917"
+    return create_instance(
+        client, UBUNTU_AMI_ID, client_token=client_token
     )  # Call create_instance with the Ubuntu AMI ID
 
 
-def create_amazon_linux_2023_instance(client: boto3.client) -> None:
+@timed
+def create_amazon_linux_2023_instance(
+    client: boto3.client, client_token: str | None = None
+) -> list:
     """
     Creates an Amazon Linux 2023 EC2 instance.
 
     Args:
         client (boto3.client): The EC2 client used to create the instance.
+        client_token (str, optional): Idempotency token passed to RunInstances.
 
     Returns:
-        None
+        list: The IDs of the launched instances.
     """
-    create_instance(
-        client, "ami-08a0d1e16fc3f61ea"
+    return create_instance(
+        client, AMAZON_LINUX_2023_AMI_ID, client_token=client_token
     )  # Call create_instance with the Amazon Linux 2023 AMI ID
 
 
-def create_amazon_linux_2_instance(client: boto3.client) -> None:
+@timed
+def create_amazon_linux_2_instance(
+    client: boto3.client, client_token: str | None = None
+) -> list:
     """
     Creates an Amazon Linux 2 EC2 instance.
 
     Args:
         client (boto3.client): The EC2 client used to create the instance.
+        client_token (str, optional): Idempotency token passed to RunInstances.
 
     Returns:
-        None
+        list: The IDs of the launched instances.
     """
-    create_instance(
-        client, "ami-0eaf7c3456e7b5b68"
+    return create_instance(
+        client, AMAZON_LINUX_2_AMI_ID, client_token=client_token
     )  # Call create_instance with the Amazon Linux 2 AMI ID
 
 
-def create_instance(client: boto3.client, ami: str) -> None:
+def launch_client_token(launch_request_id: str, index: int = 0) -> str:
+    """
+    Derives a deterministic RunInstances ClientToken for one launch slot.
+
+    Retrying the same (launch_request_id, index) pair yields the same token,
+    so EC2 returns the original instance instead of launching a duplicate.
+
+    Args:
+        launch_request_id (str): Caller-chosen ID for the whole launch request.
+        index (int, optional): Position of the instance within the request.
+            Defaults to 0.
+
+    Returns:
+        str: A 64-character token (the RunInstances maximum).
+    """
+    return hashlib.sha256(f"{launch_request_id}:{index}".encode()).hexdigest()
+
+
+@timed
+def create_instance(
+    client: boto3.client,
+    ami: str,
+    client_token: str | None = None,
+    instance_type: str = DEFAULT_INSTANCE_TYPE,
+    key_name: str = DEFAULT_KEY_NAME,
+    security_group_ids: tuple = DEFAULT_SECURITY_GROUP_IDS,
+) -> list:
     """
     Creates an EC2 instance with the specified AMI.
 
     Args:
         client (boto3.client): The EC2 client used to create the instance.
         ami (str): The AMI ID to use for the instance.
+        client_token (str, optional): Idempotency token passed to RunInstances
+            as ClientToken. See ``launch_client_token``.
+        instance_type (str, optional): Defaults to DEFAULT_INSTANCE_TYPE.
+        key_name (str, optional): Defaults to DEFAULT_KEY_NAME.
+        security_group_ids (tuple, optional): Defaults to DEFAULT_SECURITY_GROUP_IDS.
 
     Returns:
-        None
+        list: The IDs of the launched instances.
     """
-    keyName = "private-ec2"  # Key pair name for the instance
-    client.run_instances(
-        MaxCount=1,
-        MinCount=1,
-        ImageId=ami,
-        InstanceType="t2.micro",
-        KeyName=keyName,
-        SecurityGroupIds=["sg-0197b8159a5d886f8"],
-    )  # Run the instance with specified parameters
+    params = {
+        "MaxCount": 1,
+        "MinCount": 1,
+        "ImageId": ami,
+        "InstanceType": instance_type,
+        "KeyName": key_name,
+        "SecurityGroupIds": list(security_group_ids),
+    }
+    if client_token:
+        params["ClientToken"] = client_token  # Makes retries idempotent
+    response = client.run_instances(**params)  # Run the instance
+    return [
+        instance["InstanceId"] for instance in response["Instances"]
+    ]  # Return the IDs so callers can track the launch
 
 
+@timed
 def list_buckets(s3_client: boto3.client) -> list:
     """
     Lists the names of all S3 buckets.
@@ -118,9 +689,19 @@ def list_buckets(s3_client: boto3.client) -> list:
     Args:
         s3_client (boto3.client): The S3 client used to list buckets.
 
+    Concurrent identical calls (same client) are coalesced into one API
+    round trip through ``listing_flight``.
+
     Returns:
         list: A list of bucket names.
     """
+    return list(  # Callers get their own list
+        listing_flight.do(("list_buckets", s3_client), _list_buckets, s3_client)
+    )
+
+
+def _list_buckets(s3_client: boto3.client) -> list:
+    """Uncoalesced body of list_buckets."""
     response = (
         s3_client.list_buckets()
     )  # Call the list_buckets method to get information about S3 buckets
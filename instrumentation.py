@@ -0,0 +1,418 @@
+"""
+In-process instrumentation for the AWS helper functions.
+
+Metrics are collected in a module-level registry and can be read back with
+``snapshot()`` or rendered in the Prometheus text exposition format with
+``prometheus_text()``. Instrumentation is disabled by default; while disabled
+the ``timed`` decorator is a single flag check and no botocore hooks are
+registered on new clients.
+"""
+
+import functools
+import threading
+import time
+
+# Upper bounds (in seconds) for the latency histogram buckets
+LATENCY_BUCKETS: tuple = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Help text for every metric the registry knows how to export
+METRIC_HELP: dict = {
+    "helpers_call_seconds": "Latency of public helpers functions.",
+    "aws_api_call_seconds": "Latency of AWS API calls made through instrumented clients.",
+    "aws_api_retries_total": "Retry attempts reported by botocore per operation.",
+    "aws_api_bytes_received_total": "Response bytes received per operation.",
+    "aws_api_pages_total": "Successful responses (pages) fetched per operation.",
+    "aws_api_errors_total": "AWS API calls that failed (error response or transport).",
+    "executor_queue_seconds": "Time tasks waited in a shared worker pool.",
+    "executor_task_seconds": "Run time of tasks in a shared worker pool.",
+    "singleflight_calls_total": "Coalesced calls that went upstream.",
+    "singleflight_shared_total": "Callers that waited on an identical in-flight call.",
+    "singleflight_cache_hits_total": "Callers served from a single-flight result cache.",
+    "aws_pool_max_connections": "Connection pool size of instrumented clients.",
+    "aws_pool_in_use": "AWS API calls currently holding a pooled connection.",
+    "aws_pool_in_use_peak": "Highest number of concurrent AWS API calls seen.",
+    "aws_pool_saturated_total": "Calls started while a client's pool was full.",
+}
+
+# Prometheus label key per metric, where it is not the default "operation"
+METRIC_LABELS: dict = {
+    "aws_pool_max_connections": "pool",  # Values are "service:region"
+    "aws_pool_in_use": "pool",
+    "aws_pool_in_use_peak": "pool",
+    "aws_pool_saturated_total": "pool",
+}
+
+_enabled: bool = False  # Global switch checked on every instrumented call
+
+
+class Histogram:
+    """A fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: tuple = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last slot is the +Inf bucket
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Records a single observation.
+
+        Args:
+            value (float): The observed value in seconds.
+        """
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.total += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """
+        Returns the histogram as cumulative bucket counts.
+
+        Returns:
+            dict: A dictionary with 'buckets' (upper bound -> cumulative count),
+                  'sum' and 'count'.
+        """
+        cumulative = {}
+        running = 0
+        for bound, bucket_count in zip(self.buckets, self.counts):
+            running += bucket_count
+            cumulative[bound] = running
+        cumulative["+Inf"] = self.count
+        return {"buckets": cumulative, "sum": self.total, "count": self.count}
+
+
+class MetricsRegistry:
+    """Thread-safe store for histograms, counters and gauges keyed by metric and label."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._histograms: dict = {}  # metric -> {label: Histogram}
+        self._counters: dict = {}  # metric -> {label: number}
+        self._gauges: dict = {}  # metric -> {label: number}
+
+    def observe(self, metric: str, label: str, value: float) -> None:
+        """
+        Adds an observation to the histogram for the given metric and label.
+
+        Args:
+            metric (str): The metric name, e.g. 'aws_api_call_seconds'.
+            label (str): The label value, e.g. 'ec2.DescribeInstances'.
+            value (float): The observed value in seconds.
+        """
+        with self._lock:
+            series = self._histograms.setdefault(metric, {})
+            if label not in series:
+                series[label] = Histogram()
+            series[label].observe(value)
+
+    def increment(self, metric: str, label: str, amount: float = 1) -> None:
+        """
+        Increments the counter for the given metric and label.
+
+        Args:
+            metric (str): The metric name, e.g. 'aws_api_retries_total'.
+            label (str): The label value, e.g. 'ec2.DescribeInstances'.
+            amount (float, optional): The amount to add. Defaults to 1.
+        """
+        with self._lock:
+            series = self._counters.setdefault(metric, {})
+            series[label] = series.get(label, 0) + amount
+
+    def set_gauge(self, metric: str, label: str, value: float) -> None:
+        """
+        Sets the gauge for the given metric and label.
+
+        Args:
+            metric (str): The metric name, e.g. 'aws_pool_max_connections'.
+            label (str): The label value, e.g. 'ec2'.
+            value (float): The new value.
+        """
+        with self._lock:
+            self._gauges.setdefault(metric, {})[label] = value
+
+    def add_gauge(
+        self, metric: str, label: str, amount: float, peak_metric: str | None = None
+    ) -> float:
+        """
+        Adds to a gauge, optionally tracking its high-water mark in another gauge.
+
+        Args:
+            metric (str): The metric name, e.g. 'aws_pool_in_use'.
+            label (str): The label value.
+            amount (float): The amount to add (negative to subtract).
+            peak_metric (str, optional): Gauge that keeps the highest value seen.
+
+        Returns:
+            float: The gauge value after the update.
+        """
+        with self._lock:
+            series = self._gauges.setdefault(metric, {})
+            value = series.get(label, 0) + amount
+            series[label] = value
+            if peak_metric is not None:
+                peaks = self._gauges.setdefault(peak_metric, {})
+                peaks[label] = max(peaks.get(label, 0), value)
+            return value
+
+    def snapshot(self) -> dict:
+        """
+        Returns a point-in-time copy of every metric in the registry.
+
+        Returns:
+            dict: A dictionary with 'histograms', 'counters' and 'gauges'
+                  sections, each mapping metric name -> label -> value.
+        """
+        with self._lock:
+            histograms = {
+                metric: {label: hist.snapshot() for label, hist in series.items()}
+                for metric, series in self._histograms.items()
+            }
+            counters = {
+                metric: dict(series) for metric, series in self._counters.items()
+            }
+            gauges = {metric: dict(series) for metric, series in self._gauges.items()}
+        return {"histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def reset(self) -> None:
+        """Removes every recorded metric."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._gauges.clear()
+
+    def to_prometheus(self, label_name: str = "operation") -> str:
+        """
+        Renders the registry in the Prometheus text exposition format.
+
+        Args:
+            label_name (str, optional): The label key used for every series
+                not listed in METRIC_LABELS. Defaults to "operation".
+
+        Returns:
+            str: The metrics as Prometheus text.
+        """
+        data = self.snapshot()
+        lines = []
+        for metric, series in sorted(data["histograms"].items()):
+            key = METRIC_LABELS.get(metric, label_name)
+            lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+            lines.append(f"# TYPE {metric} histogram")
+            for label, hist in sorted(series.items()):
+                for bound, bucket_count in hist["buckets"].items():
+                    lines.append(
+                        f'{metric}_bucket{{{key}="{label}",le="{bound}"}} '
+                        f"{bucket_count}"
+                    )
+                lines.append(f'{metric}_sum{{{key}="{label}"}} {hist["sum"]}')
+                lines.append(f'{metric}_count{{{key}="{label}"}} {hist["count"]}')
+        for kind in ("counter", "gauge"):
+            for metric, series in sorted(data[f"{kind}s"].items()):
+                lines.append(f"# HELP {metric} {METRIC_HELP.get(metric, metric)}")
+                lines.append(f"# TYPE {metric} {kind}")
+                key = METRIC_LABELS.get(metric, label_name)
+                for label, value in sorted(series.items()):
+                    lines.append(f'{metric}{{{key}="{label}"}} {value}')
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+registry = MetricsRegistry()  # The process-wide registry used by helpers
+
+
+def enable() -> None:
+    """Turns instrumentation on for subsequent calls and newly created clients."""
+    global _enabled
+    _enabled = True
+
+
+def disable() -> None:
+    """Turns instrumentation off; already registered hooks become no-ops."""
+    global _enabled
+    _enabled = False
+
+
+def is_enabled() -> bool:
+    """
+    Reports whether instrumentation is currently enabled.
+
+    Returns:
+        bool: True if metrics are being recorded.
+    """
+    return _enabled
+
+
+def snapshot() -> dict:
+    """
+    Returns a copy of every metric recorded so far.
+
+    Returns:
+        dict: See ``MetricsRegistry.snapshot``.
+    """
+    return registry.snapshot()
+
+
+def prometheus_text() -> str:
+    """
+    Returns every metric recorded so far in Prometheus text format.
+
+    Returns:
+        str: See ``MetricsRegistry.to_prometheus``.
+    """
+    return registry.to_prometheus()
+
+
+def _operation_label(model: object) -> str:
+    """Builds a 'service.Operation' label from a botocore operation model."""
+    return f"{model.service_model.service_name}.{model.name}"
+
+
+def _before_call(model: object, context: dict, **kwargs) -> None:
+    """botocore 'before-call' hook that stamps the request start time."""
+    if _enabled:
+        context["instrumentation_start"] = time.perf_counter()
+        # 'after-call-error' is emitted without the model; keep the label here
+        context["instrumentation_label"] = _operation_label(model)
+
+
+def _after_call(
+    model: object, http_response: object, parsed: dict, context: dict, **kwargs
+) -> None:
+    """botocore 'after-call' hook that records latency, retries, bytes and pages."""
+    start = context.get("instrumentation_start")
+    if not _enabled or start is None:
+        return
+    label = _operation_label(model)
+    registry.observe("aws_api_call_seconds", label, time.perf_counter() - start)
+    if http_response.status_code >= 300 or "Error" in parsed:
+        registry.increment("aws_api_errors_total", label)  # Raised as a ClientError
+    else:
+        registry.increment("aws_api_pages_total", label)
+
+    metadata = parsed.get("ResponseMetadata", {})
+    retries = metadata.get("RetryAttempts", 0)
+    if retries:
+        registry.increment("aws_api_retries_total", label, retries)
+
+    # Prefer the Content-Length header so streaming bodies are never read here
+    length = http_response.headers.get("content-length")
+    if length is None and not model.has_streaming_output:
+        length = len(http_response.content or b"")
+    if length:
+        registry.increment("aws_api_bytes_received_total", label, int(length))
+
+
+def _after_call_error(
+    context: dict, exception: Exception | None = None, **kwargs
+) -> None:
+    """botocore 'after-call-error' hook that records calls failed in transport."""
+    start = context.get("instrumentation_start")
+    if not _enabled or start is None:
+        return
+    label = context.get("instrumentation_label", "unknown")
+    registry.observe("aws_api_call_seconds", label, time.perf_counter() - start)
+    registry.increment("aws_api_errors_total", label)
+
+
+class _PoolTracker:
+    """Counts one client's in-flight calls against its connection pool size."""
+
+    def __init__(self, label: str, max_connections: int) -> None:
+        self.label = label  # "service:region", shared by that region's clients
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, context: dict, **kwargs) -> None:
+        """botocore 'before-call' hook: one more call holds a connection."""
+        if not _enabled:
+            return
+        context["instrumentation_pool"] = True  # Pair the release with this call
+        with self._lock:
+            self.in_flight += 1
+            saturated = self.in_flight > self.max_connections
+        registry.add_gauge("aws_pool_in_use", self.label, 1, "aws_pool_in_use_peak")
+        if saturated:
+            registry.increment("aws_pool_saturated_total", self.label)
+
+    def release(
+        self, context: dict, exception: Exception | None = None, **kwargs
+    ) -> None:
+        """botocore 'after-call'/'after-call-error' hook: the call finished."""
+        if not context.pop("instrumentation_pool", False):
+            return
+        with self._lock:
+            self.in_flight -= 1
+        registry.add_gauge("aws_pool_in_use", self.label, -1)
+
+
+def instrument_client(client: object) -> object:
+    """
+    Registers the instrumentation hooks on a boto3 client's event system.
+
+    Besides per-operation latency, the hooks track how many calls are in
+    flight against the client's ``max_pool_connections``, so pool saturation
+    during thread-pool fan-out shows up as ``aws_pool_saturated_total``.
+
+    Pool series are labelled ``service:region``. Clients sharing a label add
+    up in ``aws_pool_in_use`` and its peak, while saturation is judged per
+    client; ``aws_pool_max_connections`` is last-writer-wins and shows the
+    pool size of the most recently instrumented client for that label.
+
+    Args:
+        client (boto3.client): The client to instrument.
+
+    Returns:
+        boto3.client: The same client, for chaining.
+    """
+    events = client.meta.events
+    events.register("before-call", _before_call, unique_id="instrumentation-before")
+    events.register("after-call", _after_call, unique_id="instrumentation-after")
+    events.register(
+        "after-call-error", _after_call_error, unique_id="instrumentation-error"
+    )
+
+    service = client.meta.service_model.service_name
+    label = f"{service}:{client.meta.region_name}"
+    max_connections = client.meta.config.max_pool_connections
+    tracker = _PoolTracker(label, max_connections)
+    registry.set_gauge("aws_pool_max_connections", label, max_connections)
+    events.register(
+        "before-call", tracker.acquire, unique_id="instrumentation-pool-acquire"
+    )
+    events.register(
+        "after-call", tracker.release, unique_id="instrumentation-pool-release"
+    )
+    events.register(
+        "after-call-error", tracker.release, unique_id="instrumentation-pool-error"
+    )
+    return client
+
+
+def timed(func):
+    """
+    Decorator that records the latency of a helpers function while enabled.
+
+    Args:
+        func (callable): The function to wrap.
+
+    Returns:
+        callable: The wrapped function.
+    """
+    label = f"{func.__module__}.{func.__name__}"
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _enabled:
+            return func(*args, **kwargs)  # Fast path: a single global lookup
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            registry.observe("helpers_call_seconds", label, time.perf_counter() - start)
+
+    return wrapper
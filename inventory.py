@@ -0,0 +1,210 @@
+"""
+Tag-indexed, in-memory EC2 inventory.
+
+``Inventory`` keeps the latest description of every instance it has seen plus
+inverted indexes (attribute value -> set of instance IDs) on tags, state,
+instance type, VPC, subnet and AMI. A query such as "Team=red and Env=prod in
+vpc-1" intersects a few small ID sets instead of scanning every instance, and
+new describe results are folded in incrementally with ``update``.
+"""
+
+import boto3
+
+import helpers
+
+# Indexed attribute -> how to read it from a DescribeInstances instance dict
+INDEXED_FIELDS: dict = {
+    "state": lambda instance: instance.get("State", {}).get("Name"),
+    "instance_type": lambda instance: instance.get("InstanceType"),
+    "vpc_id": lambda instance: instance.get("VpcId"),
+    "subnet_id": lambda instance: instance.get("SubnetId"),
+    "image_id": lambda instance: instance.get("ImageId"),
+}
+
+
+def index_keys(instance: dict) -> set:
+    """
+    Returns every index key an instance is filed under.
+
+    Args:
+        instance (dict): One instance from DescribeInstances.
+
+    Returns:
+        set: ("field", value) pairs plus ("tag", key, value) triples.
+    """
+    keys = {
+        (field, read(instance))
+        for field, read in INDEXED_FIELDS.items()
+        if read(instance) is not None
+    }
+    for tag in instance.get("Tags", []):
+        keys.add(("tag", tag["Key"], tag["Value"]))
+        keys.add(("tag_key", tag["Key"]))  # Supports "has tag X" queries
+    return keys
+
+
+class Inventory:
+    """Instances plus inverted indexes for conjunctive queries."""
+
+    def __init__(self, instances=()):
+        """
+        Builds an inventory from any iterable of instance descriptions.
+
+        Args:
+            instances (iterable, optional): Instances, for example the stream
+                from ``helpers.iter_instances``. Defaults to ().
+        """
+        self.instances: dict = {}  # instance ID -> latest description
+        self._keys: dict = {}  # instance ID -> index keys it is filed under
+        self._index: dict = {}  # index key -> set of instance IDs
+        self.update(instances)
+
+    @classmethod
+    def from_client(
+        cls,
+        client: boto3.client,
+        filters: list | None = None,
+        partition_by: str | None = None,
+    ) -> "Inventory":
+        """
+        Builds an inventory by streaming DescribeInstances pages.
+
+        Args:
+            client (boto3.client): The EC2 client.
+            filters (list, optional): DescribeInstances filters.
+            partition_by (str, optional): Page disjoint partitions concurrently;
+                see ``helpers.iter_instances_partitioned``.
+
+        Returns:
+            Inventory: The populated inventory.
+        """
+        if partition_by:
+            return cls(
+                helpers.iter_instances_partitioned(client, partition_by, filters)
+            )
+        return cls(helpers.iter_instances(client, filters))
+
+    def __len__(self) -> int:
+        return len(self.instances)
+
+    def __contains__(self, instance_id: str) -> bool:
+        return instance_id in self.instances
+
+    def add(self, instance: dict) -> None:
+        """
+        Adds an instance, or replaces the stored copy if it is already known.
+
+        Only index entries whose values changed are touched.
+
+        Args:
+            instance (dict): One instance from DescribeInstances.
+        """
+        instance_id = instance["InstanceId"]
+        old_keys = self._keys.get(instance_id, set())
+        new_keys = index_keys(instance)
+        for key in old_keys - new_keys:
+            self._unindex(key, instance_id)
+        for key in new_keys - old_keys:
+            self._index.setdefault(key, set()).add(instance_id)
+        self._keys[instance_id] = new_keys
+        self.instances[instance_id] = instance
+
+    def update(self, instances) -> None:
+        """
+        Adds or refreshes many instances, e.g. a new page of describe results.
+
+        Args:
+            instances (iterable): Instance descriptions.
+        """
+        for instance in instances:
+            self.add(instance)
+
+    def remove(self, instance_id: str) -> bool:
+        """
+        Drops an instance from the inventory and every index.
+
+        Args:
+            instance_id (str): The instance to drop.
+
+        Returns:
+            bool: True if the instance was present.
+        """
+        if instance_id not in self.instances:
+            return False
+        for key in self._keys.pop(instance_id):
+            self._unindex(key, instance_id)
+        del self.instances[instance_id]
+        return True
+
+    def _unindex(self, key: tuple, instance_id: str) -> None:
+        """Removes one ID from one index entry, dropping empty entries."""
+        ids = self._index.get(key)
+        if ids is not None:
+            ids.discard(instance_id)
+            if not ids:
+                del self._index[key]
+
+    def values(self, field: str) -> set:
+        """
+        Returns the distinct indexed values of a field.
+
+        Args:
+            field (str): A key of INDEXED_FIELDS, or "tag_key".
+
+        Returns:
+            set: The values present in the inventory.
+        """
+        return {key[1] for key in self._index if key[0] == field}
+
+    def query_ids(
+        self, tags: dict | None = None, tag_keys: tuple = (), **fields
+    ) -> set:
+        """
+        Returns the IDs of instances matching every condition.
+
+        Args:
+            tags (dict, optional): Tag key -> required value.
+            tag_keys (tuple, optional): Tag keys that must be present.
+            **fields: Any of state, instance_type, vpc_id, subnet_id and image_id.
+
+        Returns:
+            set: The matching instance IDs (all IDs when no condition is given).
+
+        Raises:
+            ValueError: If an unknown field is passed.
+        """
+        unknown = set(fields) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Cannot query on {sorted(unknown)}")
+        keys = [(field, value) for field, value in fields.items() if value is not None]
+        keys += [("tag", key, value) for key, value in (tags or {}).items()]
+        keys += [("tag_key", key) for key in tag_keys]
+        if not keys:
+            return set(self.instances)
+
+        empty: set = set()
+        id_sets = sorted((self._index.get(key, empty) for key in keys), key=len)
+        result = set(id_sets[0])  # Start from the smallest set
+        for ids in id_sets[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def query(self, tags: dict | None = None, tag_keys: tuple = (), **fields) -> list:
+        """
+        Returns the instances matching every condition. See ``query_ids``.
+
+        Returns:
+            list: Instance descriptions, ordered by instance ID.
+        """
+        ids = self.query_ids(tags, tag_keys, **fields)
+        return [self.instances[instance_id] for instance_id in sorted(ids)]
+
+
+if __name__ == "__main__":
+    # Build the inventory once and answer a few queries from memory
+    inventory = Inventory.from_client(helpers.get_ec2_client())
+    print(f"{len(inventory)} instances")
+    for state in sorted(inventory.values("state")):
+        print(f"{state}: {len(inventory.query_ids(state=state))}")
@@ -0,0 +1,244 @@
+"""
+Event-driven inventory updates.
+
+Instead of re-describing every instance every few minutes, ``InventoryUpdater``
+applies EventBridge events to a cached ``Inventory`` and bucket set:
+
+- "EC2 Instance State-change Notification" events update one instance's state,
+- "AWS API Call via CloudTrail" events for S3 CreateBucket/DeleteBucket add or
+  drop one bucket name.
+
+Events may arrive late or out of order, so each instance remembers the time of
+the last event applied to it and older events are ignored. Instances first
+seen through an event are described in one batched call by
+``refresh_pending``. ``reconcile`` runs an occasional full listing and applies
+only the differences (via ``snapshot_diff``), repairing anything events missed.
+The listing's start time becomes a watermark: events from before it are
+already reflected in the listing and are dropped, so a late delivery cannot
+undo it.
+"""
+
+import time
+from dataclasses import dataclass
+
+import boto3
+
+import helpers
+import snapshot_diff
+from inventory import Inventory
+
+EC2_STATE_CHANGE: str = "EC2 Instance State-change Notification"
+CLOUDTRAIL_CALL: str = "AWS API Call via CloudTrail"
+
+# S3 API calls that change the bucket list -> effect on the cached set
+BUCKET_EVENTS: dict = {"CreateBucket": "added", "DeleteBucket": "removed"}
+
+# Seconds between full reconciliations
+DEFAULT_RECONCILE_INTERVAL: float = 6 * 60 * 60
+
+# EventBridge "time" format; string order is chronological order
+EVENT_TIME_FORMAT: str = "%Y-%m-%dT%H:%M:%SZ"
+
+
+@dataclass(frozen=True)
+class InventoryChange:
+    """A parsed event: what changed, to which resource, and when."""
+
+    kind: str  # "instance_state" or "bucket"
+    resource_id: str  # Instance ID or bucket name
+    value: str  # New instance state, or "added"/"removed" for buckets
+    time: str  # Event time (ISO 8601, so it sorts chronologically)
+
+
+def parse_event(event: dict) -> InventoryChange:
+    """
+    Extracts the inventory change from an EventBridge event.
+
+    Args:
+        event (dict): The EventBridge event.
+
+    Returns:
+        InventoryChange: The change, or None if the event does not affect the
+        inventory.
+    """
+    detail_type = event.get("detail-type")
+    detail = event.get("detail") or {}
+    event_time = event.get("time", "")
+    if detail_type == EC2_STATE_CHANGE and event.get("source") == "aws.ec2":
+        return InventoryChange(
+            "instance_state", detail["instance-id"], detail["state"], event_time
+        )
+    if detail_type == CLOUDTRAIL_CALL and event.get("source") == "aws.s3":
+        effect = BUCKET_EVENTS.get(detail.get("eventName"))
+        bucket = (detail.get("requestParameters") or {}).get("bucketName")
+        if effect and bucket and not detail.get("errorCode"):
+            return InventoryChange("bucket", bucket, effect, event_time)
+    return None
+
+
+class InventoryUpdater:
+    """Keeps an Inventory and a bucket set current from events."""
+
+    def __init__(
+        self,
+        inventory: Inventory | None = None,
+        buckets: set | None = None,
+        reconcile_interval: float = DEFAULT_RECONCILE_INTERVAL,
+        clock=time.monotonic,
+        wall_clock=time.time,
+    ):
+        """
+        Creates an updater.
+
+        Args:
+            inventory (Inventory, optional): The instance inventory to update.
+                Defaults to an empty one.
+            buckets (set, optional): Cached bucket names. Defaults to empty.
+            reconcile_interval (float, optional): Seconds between full
+                reconciliations. Defaults to six hours.
+            clock (callable, optional): Monotonic clock, replaceable in tests.
+            wall_clock (callable, optional): Epoch-seconds clock used for the
+                reconcile watermark, replaceable in tests.
+        """
+        self.inventory = inventory if inventory is not None else Inventory()
+        self.buckets = buckets if buckets is not None else set()
+        self.reconcile_interval = reconcile_interval
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.last_reconciled: float = None  # None until the first reconcile
+        self.watermark: str = ""  # Event time the last reconcile started at
+        self.pending_describe: dict = {}  # Ordered set of IDs known only by events
+        self._event_times: dict = {}  # instance ID -> time of last applied event
+
+    def apply(self, event: dict) -> InventoryChange:
+        """
+        Applies one EventBridge event.
+
+        Args:
+            event (dict): The EventBridge event.
+
+        Returns:
+            InventoryChange: The applied change, or None if the event was
+            irrelevant, older than the last reconcile, or older than the last
+            one seen for that instance.
+        """
+        change = parse_event(event)
+        if change is None:
+            return None
+        if change.time and change.time < self.watermark:
+            return None  # The last reconcile already saw its effect
+        if change.kind == "bucket":
+            if change.value == "added":
+                self.buckets.add(change.resource_id)
+            else:
+                self.buckets.discard(change.resource_id)
+            return change
+
+        instance_id = change.resource_id
+        if change.time and self._event_times.get(instance_id, "") > change.time:
+            return None  # A newer event was already applied
+        self._event_times[instance_id] = change.time
+
+        known = self.inventory.instances.get(instance_id)
+        if known is None:
+            known = {"InstanceId": instance_id}
+            self.pending_describe[instance_id] = None  # Fill in details later
+        self.inventory.add(
+            {**known, "State": {**known.get("State", {}), "Name": change.value}}
+        )
+        return change
+
+    def apply_all(self, events) -> list:
+        """
+        Applies many events.
+
+        Args:
+            events (iterable): EventBridge events.
+
+        Returns:
+            list: The changes that were applied.
+        """
+        return [change for change in map(self.apply, events) if change is not None]
+
+    def refresh_pending(self, ec2_client: boto3.client) -> int:
+        """
+        Describes instances known only from events, in one batched call.
+
+        IDs EC2 does not know (yet) are dropped from the batch and from
+        ``pending_describe``; the rest are described anyway, and the next
+        reconcile picks up the dropped ones.
+
+        Args:
+            ec2_client (boto3.client): The EC2 client.
+
+        Returns:
+            int: Number of instances whose full description was loaded.
+        """
+        if not self.pending_describe:
+            return 0
+        described, unknown = helpers.call_without_unknown_ids(
+            lambda ids: list(helpers.iter_instances(ec2_client, instance_ids=ids)),
+            list(self.pending_describe),
+        )
+        for instance_id in unknown:
+            self.pending_describe.pop(instance_id, None)
+        described = described or []
+        for instance in described:
+            self.inventory.add(instance)
+            self.pending_describe.pop(instance["InstanceId"], None)
+        return len(described)
+
+    def needs_reconcile(self) -> bool:
+        """
+        Reports whether a full reconciliation is due.
+
+        Returns:
+            bool: True before the first reconcile and once the interval elapsed.
+        """
+        return (
+            self.last_reconciled is None
+            or self.clock() - self.last_reconciled >= self.reconcile_interval
+        )
+
+    def reconcile(
+        self, ec2_client: boto3.client, s3_client: boto3.client = None
+    ) -> dict:
+        """
+        Runs a full listing and applies only the differences.
+
+        Args:
+            ec2_client (boto3.client): The EC2 client.
+            s3_client (boto3.client, optional): The S3 client; buckets are left
+                alone when omitted.
+
+        Returns:
+            dict: "instances" and, with an S3 client, "buckets" summaries of
+            added/changed/removed counts.
+        """
+        watermark = time.strftime(EVENT_TIME_FORMAT, time.gmtime(self.wall_clock()))
+        current = {i["InstanceId"]: i for i in helpers.iter_instances(ec2_client)}
+        previous = snapshot_diff.Snapshot.build(
+            self.inventory.instances.values(), keep_records=False
+        )
+        summary = {"instances": {"added": 0, "changed": 0, "removed": 0}}
+        for event in snapshot_diff.diff(previous, current.values()):
+            summary["instances"][event.kind] += 1
+            if event.kind == "removed":
+                self.inventory.remove(event.record_id)
+            else:
+                self.inventory.add(current[event.record_id])
+        self.pending_describe.clear()
+
+        if s3_client is not None:
+            names = set(helpers.list_buckets(s3_client))
+            summary["buckets"] = {
+                "added": len(names - self.buckets),
+                "changed": 0,
+                "removed": len(self.buckets - names),
+            }
+            self.buckets.intersection_update(names)
+            self.buckets.update(names)
+
+        self.last_reconciled = self.clock()
+        self.watermark = max(self.watermark, watermark)
+        return summary
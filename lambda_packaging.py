@@ -0,0 +1,193 @@
+"""
+Builds a slim deployment package for the list_buckets Lambda.
+
+The zip contains the function code plus a vendored copy of boto3 and its
+dependencies, with botocore's data directory pruned to the S3 model and the
+few top-level files every client needs (botocore ships hundreds of service
+models). The S3 models are also pre-serialized next to the function (see
+``install_slim_loader`` in the function), so a cold start with
+``SLIM_BOTOCORE=1`` reads one marshal file instead of parsing JSON.
+
+Build with the same Python minor version as the Lambda runtime: the
+pre-serialized models only load on the version that wrote them; otherwise
+the function quietly falls back to the vendored JSON files.
+
+``project_modules`` lists the repository modules a Lambda imports, directly
+or not, which is what a deployment zip of the inventory_events function needs.
+
+Usage::
+
+    python lambda_packaging.py
+"""
+
+import ast
+import importlib.util
+import os
+import tempfile
+import zipfile
+
+import boto3
+
+PROJECT_DIR: str = os.path.dirname(os.path.abspath(__file__))
+FUNCTION_DIR: str = os.path.join(os.path.dirname(__file__), "lambdas", "list_buckets")
+
+# Packages vendored into the slim zip (import names)
+VENDORED_PACKAGES: tuple = (
+    "boto3",
+    "botocore",
+    "s3transfer",
+    "jmespath",
+    "dateutil",
+    "urllib3",
+    "six",
+)
+
+# botocore/data files every client loads, whatever the service
+BOTOCORE_ROOT_DATA: tuple = (
+    "endpoints.json",
+    "partitions.json",
+    "sdk-default-configuration.json",
+    "_retry.json",
+)
+
+
+def keep_file(package: str, relative_path: str, services: tuple) -> bool:
+    """
+    Decides whether a vendored file goes into the slim package.
+
+    Args:
+        package (str): The package the file belongs to.
+        relative_path (str): Path inside the package, with "/" separators.
+        services (tuple): botocore services whose data is kept.
+
+    Returns:
+        bool: True if the file is needed at runtime.
+    """
+    if "__pycache__/" in relative_path or relative_path.endswith(".pyc"):
+        return False
+    if package == "botocore" and relative_path.startswith("data/"):
+        data_path = relative_path[len("data/") :]
+        if "/" not in data_path:
+            return data_path in BOTOCORE_ROOT_DATA
+        return data_path.split("/", 1)[0] in services
+    # boto3's data/ holds resource models; the function only uses clients
+    return not (package == "boto3" and relative_path.startswith("data/"))
+
+
+def _package_files(package: str):
+    """Yields (absolute path, path in package, archive path) for a package."""
+    spec = importlib.util.find_spec(package)
+    if spec is None:
+        return
+    if spec.submodule_search_locations:
+        root = next(iter(spec.submodule_search_locations))
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                relative = os.path.relpath(path, root).replace(os.sep, "/")
+                yield path, relative, f"{package}/{relative}"
+    else:
+        yield spec.origin, os.path.basename(spec.origin), os.path.basename(spec.origin)
+
+
+def project_modules(path: str) -> list:
+    """
+    Lists the top-level repository modules a file imports, transitively.
+
+    Imports inside functions count too, since they run in the Lambda as well.
+
+    Args:
+        path (str): The entry point, e.g. a Lambda's lambda_function.py.
+
+    Returns:
+        list: Sorted file names such as "helpers.py", excluding ``path``.
+    """
+    found, pending = set(), [path]
+    while pending:
+        with open(pending.pop(), encoding="utf-8") as source:
+            tree = ast.parse(source.read())
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and not node.level and node.module:
+                names = [node.module]
+            else:
+                continue
+            for name in names:
+                file_name = name.split(".")[0] + ".py"
+                module_path = os.path.join(PROJECT_DIR, file_name)
+                if file_name not in found and os.path.isfile(module_path):
+                    found.add(file_name)
+                    pending.append(module_path)
+    return sorted(found)
+
+
+def build_slim_model_cache(directory: str, services: tuple = ("s3",)) -> str:
+    """
+    Pre-serializes the models an S3 client needs, as the function would.
+
+    Args:
+        directory (str): Where to write the cache file.
+        services (tuple, optional): Services to serialize. Defaults to S3.
+
+    Returns:
+        str: Path of the written file.
+    """
+    from lambdas.list_buckets import lambda_function
+
+    previous = boto3.DEFAULT_SESSION
+    try:
+        loader = lambda_function.install_slim_loader(services, cache_dirs=(directory,))
+        boto3.client("s3", region_name="us-east-1")  # No API call is made
+        loader.dirty = True  # Write even if an older file was found
+        return lambda_function.save_slim_cache(loader, directory)
+    finally:
+        boto3.DEFAULT_SESSION = previous
+
+
+def build_package(
+    output: str = os.path.join("dist", "list_buckets.zip"),
+    services: tuple = ("s3",),
+    vendor: bool = True,
+) -> dict:
+    """
+    Writes the deployment zip.
+
+    Args:
+        output (str, optional): Zip path. Defaults to dist/list_buckets.zip.
+        services (tuple, optional): botocore services to keep. Defaults to S3.
+        vendor (bool, optional): Include boto3 and its dependencies. Without
+            them the runtime's own boto3 is used. Defaults to True.
+
+    Returns:
+        dict: "files" and "bytes" written (uncompressed).
+    """
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    summary = {"files": 0, "bytes": 0}
+    with zipfile.ZipFile(output, "w", zipfile.ZIP_DEFLATED) as archive:
+
+        def add(path: str, archive_path: str) -> None:
+            archive.write(path, archive_path)
+            summary["files"] += 1
+            summary["bytes"] += os.path.getsize(path)
+
+        add(os.path.join(FUNCTION_DIR, "lambda_function.py"), "lambda_function.py")
+        with tempfile.TemporaryDirectory() as staging:
+            cache_path = build_slim_model_cache(staging, services)
+            add(cache_path, os.path.basename(cache_path))
+        if vendor:
+            for package in VENDORED_PACKAGES:
+                for path, relative, archive_path in _package_files(package):
+                    if keep_file(package, relative, services):
+                        add(path, archive_path)
+    return summary
+
+
+if __name__ == "__main__":
+    # Build dist/list_buckets.zip and report its size
+    summary = build_package()
+    size = os.path.getsize(os.path.join("dist", "list_buckets.zip"))
+    print(
+        f"{summary['files']} files, {summary['bytes'] / 1e6:.1f} MB uncompressed, "
+        f"{size / 1e6:.1f} MB zipped"
+    )
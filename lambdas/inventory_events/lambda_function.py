@@ -0,0 +1,70 @@
+import json
+import os
+
+import boto3  # AWS SDK for Python; used for the occasional full reconciliation
+
+from inventory_events import InventoryUpdater
+
+# Seconds between full reconciliations of the cached inventory
+RECONCILE_INTERVAL_SECONDS: float = float(
+    os.environ.get("RECONCILE_INTERVAL_SECONDS", "21600")
+)
+
+# Warm-container inventory, built on the first invocation
+_updater: InventoryUpdater = None
+
+
+def _get_updater() -> InventoryUpdater:
+    """
+    Returns the warm-container updater, creating it on a cold start.
+
+    Returns:
+        InventoryUpdater: The shared updater.
+    """
+    global _updater
+    if _updater is None:
+        _updater = InventoryUpdater(reconcile_interval=RECONCILE_INTERVAL_SECONDS)
+    return _updater
+
+
+def lambda_handler(event: dict, context: object) -> dict:
+    """
+    AWS Lambda handler that applies EventBridge events to a cached inventory.
+
+    EC2 instance state-change events and CloudTrail S3 CreateBucket/DeleteBucket
+    events update the warm-container inventory in place. A full listing runs
+    only on a cold start and then every RECONCILE_INTERVAL_SECONDS. Events
+    stamped before the latest reconciliation started are ignored, since that
+    listing already reflects them (replayed samples need a current ``time``).
+
+    Args:
+        event (dict): One EventBridge event, or a list of events (for replaying
+                      recorded samples).
+        context (object): AWS Lambda context object (unused).
+
+    Returns:
+        dict: A dictionary with:
+              - 'statusCode' (int): 200.
+              - 'body' (str): JSON with the applied changes, instance and
+                bucket counts, and the reconciliation summary if one ran.
+    """
+    updater = _get_updater()
+    events = event if isinstance(event, list) else [event]
+
+    reconciliation = None
+    if updater.needs_reconcile():
+        reconciliation = updater.reconcile(boto3.client("ec2"), boto3.client("s3"))
+
+    changes = updater.apply_all(events)
+    if updater.pending_describe:
+        updater.refresh_pending(boto3.client("ec2"))
+
+    body = {
+        "applied": [
+            {"kind": c.kind, "id": c.resource_id, "value": c.value} for c in changes
+        ],
+        "instances": len(updater.inventory),
+        "buckets": len(updater.buckets),
+        "reconciliation": reconciliation,
+    }
+    return {"statusCode": 200, "body": json.dumps(body)}
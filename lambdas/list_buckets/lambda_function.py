@@ -1,40 +1,918 @@
+import time
+
+_MODULE_LOAD_START = time.perf_counter()  # Marks the start of container init
+
+import base64
+import bisect
+import functools
+import hashlib
 import json
+import os
+import re
+
+try:
+    from re import _parser  # Python 3.11+
+except ImportError:
+    import sre_parse as _parser
+
 import boto3  # AWS SDK for Python; used here to interact with AWS services
 
+try:
+    import orjson  # Optional faster encoder used for compact responses
+except ImportError:
+    orjson = None
+
+# Namespace used for CloudWatch Embedded Metric Format (EMF) output
+EMF_NAMESPACE: str = os.environ.get("EMF_NAMESPACE", "ListBucketsLambda")
+
+# Upper bound for the 'limit' query parameter, and the page size when it is absent
+MAX_PAGE_SIZE: int = int(os.environ.get("MAX_PAGE_SIZE", "1000"))
+
+# Bodies smaller than this are never gzipped, even if the client accepts it
+GZIP_MIN_BYTES: int = int(os.environ.get("GZIP_MIN_BYTES", "1024"))
+
+# Longest 'regex' filter accepted, to bound the cost of compiling user patterns
+MAX_REGEX_LENGTH: int = 256
+
+# Most quantifiers a 'regex' filter may hold; with nested quantifiers, alternation
+# under a quantifier and backreferences rejected, this bounds backtracking per name
+MAX_REGEX_QUANTIFIERS: int = 4
+
+# Wall-clock budget for matching a 'regex' filter against the whole index
+REGEX_TIME_LIMIT_SECONDS: float = 1.0
+
+# Parser opcodes of quantifiers (possessive ones exist from Python 3.11)
+_REPEAT_OPS: tuple = tuple(
+    getattr(_parser, name)
+    for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(_parser, name)
+)
+
+# Request parameters that change the response body, and so the ETag
+ETAG_PARAMS: tuple = ("format", "limit", "cursor", "prefix", "contains", "regex")
+
+# Services the slim botocore loader serves; every other model is unavailable
+SLIM_SERVICES: tuple = ("s3",)
+
+# Where the slim loader writes its pre-serialized models at runtime
+SLIM_CACHE_DIR: str = os.environ.get("SLIM_BOTOCORE_CACHE_DIR", "/tmp")
+
+# Seconds a warm container reuses its bucket index unless BUCKET_CACHE_TTL_SECONDS
+# says otherwise; bucket lists change rarely and ListBuckets is the slow part
+DEFAULT_CACHE_TTL_SECONDS: float = 300.0
+
+# True until the first invocation in this container has run
+_cold_start: bool = True
+
+# Warm-container cache of the bucket index; BUCKET_CACHE_TTL_SECONDS=0 disables it
+_bucket_cache: dict = {"index": None, "expires_at": 0.0}
+
+
+class BucketIndex:
+    """Sorted, read-only index of bucket names for prefix/substring/regex lookups."""
+
+    def __init__(self, bucket_names: list) -> None:
+        """
+        Builds the index.
+
+        Args:
+            bucket_names (list): The bucket names, in any order.
+        """
+        self.names: list[str] = sorted(bucket_names)
+        self.lowered: list[str] = [name.lower() for name in self.names]
+        # Content hash of the sorted names; cached with the index, feeds the ETag
+        self.digest: bytes = hashlib.blake2b(
+            "\n".join(self.names).encode("utf-8"), digest_size=16
+        ).digest()
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(
+        self,
+        prefix: str | None = None,
+        contains: str | None = None,
+        regex: str | None = None,
+    ) -> list:
+        """
+        Returns the sorted names matching every filter that is given.
+
+        Args:
+            prefix (str, optional): Names must start with this string.
+            contains (str, optional): Names must contain this string
+                (case-insensitive).
+            regex (str, optional): Names must match this regular expression
+                (``re.search`` semantics).
+
+        Returns:
+            list: The matching bucket names, sorted.
+
+        Raises:
+            ValueError: If the regular expression is invalid, too long, may
+                backtrack badly or exceeds REGEX_TIME_LIMIT_SECONDS.
+        """
+        start, end = 0, len(self.names)
+        if prefix:
+            # All names sharing the prefix sit in one contiguous sorted range
+            start = bisect.bisect_left(self.names, prefix)
+            end = bisect.bisect_left(self.names, prefix + "\U0010ffff", lo=start)
+        if not contains and not regex:
+            return self.names[start:end]
+
+        needle = contains.lower() if contains else None
+        if not regex:
+            return [
+                self.names[i] for i in range(start, end) if needle in self.lowered[i]
+            ]
+
+        pattern = _compile_regex(regex)
+        deadline = time.perf_counter() + REGEX_TIME_LIMIT_SECONDS
+        matches = []
+        for i in range(start, end):
+            if time.perf_counter() > deadline:
+                raise ValueError("Invalid regex: too slow to evaluate")
+            if (needle is None or needle in self.lowered[i]) and pattern.search(
+                self.names[i]
+            ):
+                matches.append(self.names[i])
+        return matches
+
+
+def _regex_hazard(items, repeated: bool = False, counter: list | None = None):
+    """
+    Finds constructs that make a parsed pattern backtrack exponentially.
+
+    Args:
+        items (re._parser.SubPattern): The parsed pattern or a part of it.
+        repeated (bool, optional): True inside a quantifier that may repeat.
+        counter (list, optional): One-item list counting repeating quantifiers.
+
+    Returns:
+        str: What was found, or None if the pattern is safe to run.
+    """
+    counter = counter if counter is not None else [0]
+    for op, av in items:
+        if op in _REPEAT_OPS:
+            if repeated:
+                return "nested quantifiers are not supported"
+            _, high, body = av
+            if high > 1:
+                counter[0] += 1
+                if counter[0] > MAX_REGEX_QUANTIFIERS:
+                    return f"more than {MAX_REGEX_QUANTIFIERS} quantifiers"
+            parts = [body]
+            inner = high > 1
+        elif op == _parser.BRANCH:
+            if repeated:
+                return "alternation inside a quantifier is not supported"
+            parts, inner = av[1], False
+        elif op in (_parser.GROUPREF, _parser.GROUPREF_EXISTS):
+            return "backreferences are not supported"
+        elif op == _parser.SUBPATTERN:
+            parts, inner = [av[3]], False
+        elif op in (_parser.ASSERT, _parser.ASSERT_NOT):
+            parts, inner = [av[1]], False
+        elif op == getattr(_parser, "ATOMIC_GROUP", None):
+            parts, inner = [av], False
+        else:
+            continue
+        for part in parts:
+            reason = _regex_hazard(part, repeated or inner, counter)
+            if reason:
+                return reason
+    return None
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_regex(regex: str) -> re.Pattern:
+    """
+    Compiles (and caches) a user-supplied bucket-name pattern.
+
+    Python's regex engine backtracks, so patterns whose matching time can
+    explode (nested quantifiers such as ``(a+)*``, alternation under a
+    quantifier, backreferences) are refused instead of being run.
+
+    Args:
+        regex (str): The pattern.
+
+    Returns:
+        re.Pattern: The compiled pattern.
+
+    Raises:
+        ValueError: If the pattern is invalid (including repeat counts or
+            nesting the parser cannot handle), longer than MAX_REGEX_LENGTH or
+            may backtrack badly.
+    """
+    if len(regex) > MAX_REGEX_LENGTH:
+        raise ValueError(f"Invalid regex: longer than {MAX_REGEX_LENGTH} characters")
+    try:
+        reason = _regex_hazard(_parser.parse(regex))
+        if reason:
+            raise ValueError(f"Invalid regex: {reason}")
+        return re.compile(regex)
+    except re.error as error:
+        raise ValueError(f"Invalid regex: {error}") from error
+    except OverflowError as error:  # e.g. a{99999999999}
+        raise ValueError(f"Invalid regex: {error}") from error
+    except RecursionError as error:  # Nesting too deep for the parser
+        raise ValueError("Invalid regex: nested too deeply") from error
+
+
+def _emf_enabled() -> bool:
+    """
+    Reports whether EMF metric output is switched on for this function.
+
+    Returns:
+        bool: True if the EMF_METRICS_ENABLED environment variable is truthy.
+    """
+    return os.environ.get("EMF_METRICS_ENABLED", "").lower() in ("1", "true", "yes")
+
+
+def _cache_ttl_seconds() -> float:
+    """
+    Reads how long bucket names may be served from the warm-container cache.
+
+    Returns:
+        float: The cache TTL in seconds; 0 disables the cache.
+    """
+    return float(
+        os.environ.get("BUCKET_CACHE_TTL_SECONDS", str(DEFAULT_CACHE_TTL_SECONDS))
+    )
+
+
+def _get_bucket_index() -> tuple:
+    """
+    Returns the bucket index, from the warm cache when it is still fresh.
+
+    Returns:
+        tuple: (index, cache_hit, s3_latency_ms) where index is a BucketIndex
+               and s3_latency_ms is 0.0 on a cache hit.
+    """
+    now = time.monotonic()
+    if _bucket_cache["index"] is not None and now < _bucket_cache["expires_at"]:
+        return _bucket_cache["index"], True, 0.0
+
+    # Create an S3 client using the Lambda's execution role credentials
+    _use_slim_session()
+    s3 = boto3.client("s3")
+    save_slim_cache(_slim_loader)  # First client: persist the models it loaded
+
+    # Retrieve the list of all buckets in the AWS account and time the call
+    call_start = time.perf_counter()
+    response = s3.list_buckets()
+    s3_latency_ms = (time.perf_counter() - call_start) * 1000
+
+    # Keep only the bucket names (each item also has metadata such as CreationDate)
+    bucket_names: list[str] = [bucket["Name"] for bucket in response["Buckets"]]
+    index = BucketIndex(bucket_names)
+
+    ttl = _cache_ttl_seconds()
+    if ttl > 0:
+        _bucket_cache["index"] = index
+        _bucket_cache["expires_at"] = now + ttl
+    return index, False, s3_latency_ms
+
+
+def _slim_enabled() -> bool:
+    """
+    Reports whether the slim botocore loader is switched on.
+
+    Returns:
+        bool: True if the SLIM_BOTOCORE environment variable is truthy.
+    """
+    return os.environ.get("SLIM_BOTOCORE", "").lower() in ("1", "true", "yes")
+
+
+def slim_cache_name() -> str:
+    """
+    Names the pre-serialized model file for this botocore and Python version.
+
+    marshal data is only readable by the Python minor version that wrote it,
+    so both versions are part of the name and a mismatch is simply a miss.
+
+    Returns:
+        str: The file name, e.g. "botocore-slim-1.40.0-py312.marshal".
+    """
+    import sys
+
+    import botocore
+
+    version = f"py{sys.version_info[0]}{sys.version_info[1]}"
+    return f"botocore-slim-{botocore.__version__}-{version}.marshal"
+
+
+def _plain(value):
+    """Converts botocore's OrderedDict trees to plain, marshallable types."""
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return type(value)(_plain(item) for item in value)
+    return value
+
+
+def install_slim_loader(
+    services: tuple = SLIM_SERVICES, cache_dirs: tuple | None = None
+):
+    """
+    Makes boto3's default session load only the given services' models.
+
+    Loaded data files are kept as marshal blobs and written to SLIM_CACHE_DIR
+    by ``save_slim_cache``; later cold starts read them from the function's
+    own directory (where ``lambda_packaging.py`` puts them) or from /tmp
+    instead of parsing botocore's JSON. ``endpoints.json`` is pruned to the
+    allowed services.
+
+    Args:
+        services (tuple, optional): Service names to allow. Defaults to
+            SLIM_SERVICES.
+        cache_dirs (tuple, optional): Directories searched for a cache file.
+            Defaults to this file's directory, then SLIM_CACHE_DIR.
+
+    Returns:
+        botocore.loaders.Loader: The installed loader.
+    """
+    import marshal
+
+    import botocore.session
+    from botocore.exceptions import DataNotFoundError
+    from botocore.loaders import Loader
+
+    class SlimLoader(Loader):
+        """botocore data loader restricted to a few services, with a blob cache."""
+
+        def __init__(self, blobs: dict) -> None:
+            super().__init__()
+            self.blobs = blobs  # data name -> marshal blob (None: not found)
+            self.dirty = False
+
+        def _remember(self, name: str, value) -> None:
+            if value is not None:
+                value = marshal.dumps(_plain(value))
+            self.blobs[name] = value
+            self.dirty = True
+
+        def list_available_services(self, type_name):
+            return list(services)  # Also skips scanning hundreds of directories
+
+        def determine_latest_version(self, service_name, type_name):
+            name = f"latest/{service_name}/{type_name}"
+            if name not in self.blobs:
+                version = super().determine_latest_version(service_name, type_name)
+                self._remember(name, version)
+            return marshal.loads(self.blobs[name])
+
+        def load_data_with_path(self, name):
+            if name not in self.blobs:
+                if "/" in name and name.split("/")[0] not in services:
+                    raise DataNotFoundError(data_path=name)
+                try:
+                    data, path = super().load_data_with_path(name)
+                except DataNotFoundError:
+                    self._remember(name, None)
+                    raise
+                if name == "endpoints":
+                    data = {
+                        **data,
+                        "partitions": [
+                            {
+                                **partition,
+                                "services": {
+                                    key: value
+                                    for key, value in partition["services"].items()
+                                    if key in services
+                                },
+                            }
+                            for partition in data["partitions"]
+                        ],
+                    }
+                self._remember(name, (data, self.is_builtin_path(path)))
+            blob = self.blobs[name]
+            if blob is None:
+                raise DataNotFoundError(data_path=name)
+            data, builtin = marshal.loads(blob)
+            # Only the builtin/custom distinction of the path matters to botocore
+            return data, os.path.join(self.BUILTIN_DATA_PATH if builtin else "", name)
+
+    blobs: dict = {}
+    here = os.path.dirname(os.path.abspath(__file__))
+    for directory in cache_dirs or (here, SLIM_CACHE_DIR):
+        try:
+            with open(os.path.join(directory, slim_cache_name()), "rb") as handle:
+                blobs = marshal.load(handle)
+            break
+        except (OSError, ValueError, EOFError, TypeError):
+            continue  # Missing, unreadable or written by another Python
+
+    session = botocore.session.get_session()
+    loader = SlimLoader(blobs)
+    session.register_component("data_loader", loader)
+    boto3.setup_default_session(botocore_session=session)
+    loader.boto3_session = boto3.DEFAULT_SESSION
+    return loader
+
+
+def _use_slim_session() -> None:
+    """Re-selects the slim session if something replaced boto3's default one."""
+    if _slim_loader is None:
+        return
+    if boto3.DEFAULT_SESSION is not _slim_loader.boto3_session:
+        boto3.DEFAULT_SESSION = _slim_loader.boto3_session
+
+
+def save_slim_cache(loader, directory: str | None = None) -> str:
+    """
+    Writes the slim loader's models to disk if anything new was loaded.
+
+    Args:
+        loader (botocore.loaders.Loader): The loader from install_slim_loader.
+        directory (str, optional): Target directory. Defaults to SLIM_CACHE_DIR.
+
+    Returns:
+        str: The file written, or None if there was nothing new to write.
+    """
+    if loader is None or not getattr(loader, "dirty", False):
+        return None
+    import marshal
+
+    path = os.path.join(directory or SLIM_CACHE_DIR, slim_cache_name())
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as handle:
+            marshal.dump(loader.blobs, handle)
+        os.replace(temp_path, path)  # Atomic: concurrent readers never see half a file
+    except OSError:
+        return None  # A read-only or full /tmp only costs the next cold start
+    loader.dirty = False
+    return path
+
+
+def _get_param(event: dict, name: str) -> str:
+    """
+    Reads a request parameter from a direct invocation or API Gateway event.
+
+    Top-level event keys win over API Gateway ``queryStringParameters``.
+    Integers (e.g. ``"limit": 10`` in a direct invocation) are read as strings.
+
+    Args:
+        event (dict): The Lambda event, which may be None.
+        name (str): The parameter name.
+
+    Returns:
+        str: The parameter value, or None if it was not supplied.
+
+    Raises:
+        ValueError: If the value is neither a string nor an integer.
+    """
+    if not isinstance(event, dict):
+        return None
+    value = event.get(name)
+    if value is None:
+        value = (event.get("queryStringParameters") or {}).get(name)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    raise ValueError(f"Invalid {name}: expected a string")
+
+
+def _get_header(event: dict, name: str) -> str:
+    """
+    Reads an HTTP request header (case-insensitively) from an API Gateway event.
+
+    Args:
+        event (dict): The Lambda event, which may be None.
+        name (str): The header name.
+
+    Returns:
+        str: The header value, or None if it was not supplied.
+    """
+    if not isinstance(event, dict):
+        return None
+    for key, value in (event.get("headers") or {}).items():
+        if key.lower() == name.lower():
+            return value
+    return None
+
+
+def compute_etag(index: BucketIndex, event: dict) -> str:
+    """
+    Builds the ETag of the response an event would receive.
+
+    The tag combines the bucket list's content hash with every parameter that
+    shapes the body, so it changes exactly when the response would. It is weak
+    because the same tag is used for the plain and the gzipped body.
+
+    Args:
+        index (BucketIndex): The current bucket index.
+        event (dict): The Lambda event, which may be None.
+
+    Returns:
+        str: A weak entity tag such as ``W/"3f2a..."``.
+
+    Raises:
+        ValueError: If a request parameter is not a string.
+    """
+    tag = hashlib.blake2b(index.digest, digest_size=16)
+    for name in ETAG_PARAMS:
+        tag.update(f"\0{name}={_get_param(event, name) or ''}".encode())
+    if _get_param(event, "format") is None:  # The default format comes from env
+        tag.update(os.environ.get("RESPONSE_FORMAT", "compact").lower().encode())
+    return f'W/"{tag.hexdigest()}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """
+    Checks an If-None-Match header against an ETag (weak comparison).
+
+    Args:
+        if_none_match (str): The header value, e.g. ``W/"a", "b"`` or ``*``.
+        etag (str): The current entity tag.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def encode_cursor(bucket_name: str) -> str:
+    """
+    Builds the opaque pagination cursor that resumes after a bucket name.
+
+    Args:
+        bucket_name (str): The last bucket name on the current page.
+
+    Returns:
+        str: A URL-safe cursor string.
+    """
+    return base64.urlsafe_b64encode(bucket_name.encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str) -> str:
+    """
+    Reverses ``encode_cursor``.
+
+    Args:
+        cursor (str): A cursor returned by a previous response.
+
+    Returns:
+        str: The bucket name the next page starts after.
+
+    Raises:
+        ValueError: If the cursor is not valid.
+    """
+    try:
+        raw = base64.b64decode(cursor.encode("ascii"), altchars=b"-_", validate=True)
+        return raw.decode("utf-8")
+    except (UnicodeError, ValueError) as error:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from error
+
+
+def _paginate(bucket_names: list, cursor: str, limit: str) -> tuple:
+    """
+    Slices the sorted bucket names into one page.
+
+    Args:
+        bucket_names (list): All bucket names, sorted.
+        cursor (str): The cursor from the previous page, or None.
+        limit (str): The page size, or None for MAX_PAGE_SIZE. Larger values
+                     are clamped to MAX_PAGE_SIZE.
+
+    Returns:
+        tuple: (page, next_cursor) where next_cursor is None on the last page.
+
+    Raises:
+        ValueError: If the cursor or limit is not valid.
+    """
+    start = 0
+    if cursor:
+        start = bisect.bisect_right(bucket_names, decode_cursor(cursor))
+    page_size = MAX_PAGE_SIZE
+    if limit is not None:
+        try:
+            page_size = int(limit)
+        except (TypeError, ValueError) as error:
+            raise ValueError(f"Invalid limit: {limit!r}") from error
+        if page_size < 1:
+            raise ValueError(f"Invalid limit: {limit!r}")
+        page_size = min(page_size, MAX_PAGE_SIZE)
+
+    page = bucket_names[start : start + page_size]
+    has_more = start + page_size < len(bucket_names)
+    return page, encode_cursor(page[-1]) if has_more and page else None
+
+
+def serialize(payload: object, compact: bool) -> str:
+    """
+    Serializes a response payload to JSON.
+
+    Args:
+        payload (object): The JSON-serializable payload.
+        compact (bool): If True, emit no whitespace (using orjson when it is
+                        installed); otherwise indent by 4 spaces.
+
+    Returns:
+        str: The JSON text.
+    """
+    if not compact:
+        return json.dumps(payload, indent=4)
+    if orjson is not None:
+        return orjson.dumps(payload).decode("utf-8")
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def _error_response(status_code: int, message: str) -> dict:
+    """
+    Builds a JSON error response.
+
+    Args:
+        status_code (int): The HTTP status code.
+        message (str): A human-readable error message.
+
+    Returns:
+        dict: The Lambda proxy response.
+    """
+    return {
+        "statusCode": status_code,
+        "headers": {"Content-Type": "application/json"},
+        "body": json.dumps({"error": message}),
+    }
+
+
+def _function_name(context: object) -> str:
+    """
+    Resolves the function name used as the EMF dimension.
+
+    Args:
+        context (object): The Lambda context object, which may be None.
+
+    Returns:
+        str: The function name.
+    """
+    name = getattr(context, "function_name", None)
+    if isinstance(name, str):
+        return name
+    return os.environ.get("AWS_LAMBDA_FUNCTION_NAME", "list_buckets")
+
+
+def _emit_metrics(context: object, metrics: dict) -> None:
+    """
+    Prints a single CloudWatch Embedded Metric Format line to stdout.
+
+    Args:
+        context (object): The Lambda context object, used for the dimension.
+        metrics (dict): Metric name -> (value, unit) pairs to publish.
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [
+                {
+                    "Namespace": EMF_NAMESPACE,
+                    "Dimensions": [["FunctionName"]],
+                    "Metrics": [
+                        {"Name": name, "Unit": unit}
+                        for name, (_, unit) in metrics.items()
+                    ],
+                }
+            ],
+        },
+        "FunctionName": _function_name(context),
+    }
+    for name, (value, _) in metrics.items():
+        record[name] = value
+    print(json.dumps(record, separators=(",", ":")))  # One log line per invocation
+
+
+def _build_response(event: dict, index: BucketIndex, etag: str) -> dict:
+    """
+    Filters, paginates and serializes the bucket names for a 200 response.
+
+    Args:
+        event (dict): The Lambda event, which may be None.
+        index (BucketIndex): The current bucket index.
+        etag (str): The response's entity tag.
+
+    Returns:
+        dict: The Lambda proxy response.
+
+    Raises:
+        ValueError: If a request parameter is not valid.
+    """
+    matches = index.search(
+        prefix=_get_param(event, "prefix"),
+        contains=_get_param(event, "contains"),
+        regex=_get_param(event, "regex"),
+    )
+    page, next_cursor = _paginate(
+        matches,
+        _get_param(event, "cursor"),
+        _get_param(event, "limit"),
+    )
+
+    # Return the bucket names as a JSON-formatted response with status code 200
+    response_format = _get_param(event, "format") or os.environ.get(
+        "RESPONSE_FORMAT", "compact"
+    )
+    body = serialize(page, compact=response_format.lower() != "pretty")
+    response = {
+        "statusCode": 200,
+        "headers": {"Content-Type": "application/json", "ETag": etag},
+        "body": body,
+    }
+    if next_cursor is not None:
+        response["headers"]["X-Next-Cursor"] = next_cursor
+
+    accept_encoding = _get_header(event, "Accept-Encoding") or ""
+    if "gzip" in accept_encoding.lower() and len(body) >= GZIP_MIN_BYTES:
+        import gzip  # Deferred: only compressed responses need it
+
+        compressed = gzip.compress(body.encode("utf-8"))
+        response["body"] = base64.b64encode(compressed).decode("ascii")
+        response["headers"]["Content-Encoding"] = "gzip"
+        response["isBase64Encoded"] = True
+    return response
+
+
+def _serve(event: dict, index: BucketIndex) -> dict:
+    """
+    Answers one query from the bucket index.
+
+    Args:
+        event (dict): The query: a direct or API Gateway event.
+        index (BucketIndex): The current bucket index.
+
+    Returns:
+        dict: The Lambda proxy response (200, 304 or 400).
+    """
+    try:
+        etag = compute_etag(index, event)
+        if etag_matches(_get_header(event, "If-None-Match"), etag):
+            # The client's copy is current: skip filtering and serialization
+            return {"statusCode": 304, "headers": {"ETag": etag}, "body": ""}
+        return _build_response(event, index, etag)
+    except ValueError as error:
+        return _error_response(400, str(error))
+
+
+def _parse_message(body: str) -> dict:
+    """Parses an SQS message body into a query dict, or None if it is not one."""
+    try:
+        query = json.loads(body or "{}")
+    except ValueError:
+        return None
+    return query if isinstance(query, dict) else None
+
+
+def _batch_items(event: dict) -> list:
+    """
+    Extracts the queries of a batch event.
+
+    SQS records carry one JSON query per message body; a ``{"requests": [...]}``
+    envelope carries the queries directly, each with an optional "id".
+
+    Args:
+        event (dict): The Lambda event, which may be None.
+
+    Returns:
+        list: (item identifier, query or None if unreadable) pairs, or None
+        when the event is a single query.
+    """
+    if not isinstance(event, dict):
+        return None
+    records = event.get("Records")
+    if (
+        records  # An empty list is a plain query
+        and isinstance(records, list)
+        and all(
+            isinstance(r, dict) and r.get("eventSource") == "aws:sqs" for r in records
+        )
+    ):
+        return [
+            (record["messageId"], _parse_message(record.get("body")))
+            for record in records
+        ]
+    requests = event.get("requests")
+    if isinstance(requests, list):
+        return [
+            (str(query.get("id", position)), query)
+            if isinstance(query, dict)
+            else (str(position), None)
+            for position, query in enumerate(requests)
+        ]
+    return None
+
+
+def _serve_batch(items: list, index: BucketIndex) -> dict:
+    """
+    Answers every query of a batch from one bucket index.
+
+    Args:
+        items (list): Output of ``_batch_items``.
+        index (BucketIndex): The current bucket index.
+
+    Returns:
+        dict: 'results' (one response per item, tagged with 'itemIdentifier')
+        and 'batchItemFailures' (the items that did not get a 2xx/304, in the
+        format SQS partial-batch responses expect).
+    """
+    results, failures = [], []
+    for identifier, query in items:
+        if query is None:
+            result = _error_response(400, "Invalid request: expected a JSON object")
+        else:
+            result = _serve(query, index)
+        results.append({"itemIdentifier": identifier, **result})
+        if result["statusCode"] >= 400:
+            failures.append({"itemIdentifier": identifier})
+    return {"results": results, "batchItemFailures": failures}
+
 
 def lambda_handler(event: dict, context: object) -> dict:
     """
     AWS Lambda handler that lists all S3 bucket names in the account.
 
+    When EMF_METRICS_ENABLED is set, one CloudWatch Embedded Metric Format line
+    is printed per invocation with cold start, init duration, S3 latency,
+    bucket count, cache hit and response size.
+
     Args:
-        event (dict): Input event data passed by the Lambda runtime.
-                      Not used in this function but required by AWS Lambda.
+        event (dict): Input event data passed by the Lambda runtime. Optional
+                      parameters, read from the top level or from API Gateway
+                      ``queryStringParameters``:
+                      - 'format': "pretty" for JSON indented by 4 spaces
+                        (defaults to the RESPONSE_FORMAT environment variable,
+                        itself "compact" by default).
+                      - 'limit': maximum number of names to return (defaults
+                        to and is capped at MAX_PAGE_SIZE).
+                      - 'cursor': the X-Next-Cursor value of the previous page.
+                      - 'prefix', 'contains', 'regex': return only matching
+                        names (combined with AND; 'contains' ignores case).
+                      An ``Accept-Encoding: gzip`` header enables a gzipped,
+                      base64-encoded body, and an ``If-None-Match`` header
+                      holding the ETag of an earlier response yields a
+                      bodyless 304 while the result is unchanged.
+                      Batches are accepted too: an SQS event whose message
+                      bodies are JSON queries, or ``{"requests": [...]}``
+                      holding query dicts (each with an optional "id").
         context (object): AWS Lambda context object containing metadata about
                           the invocation, function, and execution environment.
-                          Not used here.
+                          Only the function name is read, for metrics.
 
     Returns:
         dict: A dictionary with:
-              - 'statusCode' (int): HTTP status code of the response.
+              - 'statusCode' (int): HTTP status code of the response
+                (304 when the client's copy is current).
+              - 'headers' (dict): Content-Type and ETag, plus X-Next-Cursor
+                when more pages remain and Content-Encoding when gzipped.
               - 'body' (str): A JSON-formatted string containing the list of S3 bucket names.
+              - 'isBase64Encoded' (bool): Present and True for gzipped bodies.
+              For a batch, 'results' holds one such response per query
+              (tagged with 'itemIdentifier') and 'batchItemFailures' lists
+              the queries that failed, for SQS partial-batch retries.
     """
+    global _cold_start
+    cold_start = _cold_start
+    _cold_start = False
 
-    # Create an S3 client using the Lambda's execution role credentials
-    s3 = boto3.client("s3")
+    index, cache_hit, s3_latency_ms = _get_bucket_index()  # Once per batch
 
-    # Retrieve the list of all buckets in the AWS account
-    response = s3.list_buckets()
+    items = _batch_items(event)
+    if items is None:
+        response = _serve(event, index)
+        bodies = [response]
+    else:
+        response = _serve_batch(items, index)
+        bodies = response["results"]
+
+    if _emf_enabled():
+        metrics = {
+            "ColdStart": (int(cold_start), "Count"),
+            "S3CallLatency": (round(s3_latency_ms, 3), "Milliseconds"),
+            "BucketCount": (len(index), "Count"),
+            "CacheHit": (int(cache_hit), "Count"),
+            "ResponseSize": (
+                sum(len(item["body"].encode("utf-8")) for item in bodies),
+                "Bytes",
+            ),
+        }
+        if items is not None:
+            metrics["BatchSize"] = (len(items), "Count")
+        if cold_start:
+            metrics["InitDuration"] = (round(INIT_DURATION_MS, 3), "Milliseconds")
+        _emit_metrics(context, metrics)
 
-    # Extract the bucket list (each item contains metadata such as Name and CreationDate)
-    buckets = response["Buckets"]
+    return response
 
-    # Initialize a list to hold bucket names only
-    bucket_names: list[str] = []
 
-    # Iterate through bucket objects, print the bucket name, and store it in the list
-    for bucket in buckets:
-        print(bucket["Name"])  # Logs bucket name to CloudWatch for observability
-        bucket_names.append(bucket["Name"])
+# Slim botocore loader, installed during init when SLIM_BOTOCORE is set
+_slim_loader = install_slim_loader() if _slim_enabled() else None
 
-    # Return the list of bucket names as a JSON-formatted response with status code 200
-    return {"statusCode": 200, "body": json.dumps(bucket_names, indent=4)}
+# Time spent importing and initialising this module (reported on cold starts)
+INIT_DURATION_MS: float = (time.perf_counter() - _MODULE_LOAD_START) * 1000
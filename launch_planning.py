@@ -0,0 +1,340 @@
+"""
+Go/no-go planning for bulk EC2 launches.
+
+``plan_launch`` answers "will this ``create_instances`` call succeed?" in one
+pass without launching anything. It runs these checks concurrently:
+
+- ``run_instances(DryRun=True)`` for every launch batch (permissions, AMI,
+  instance type and parameter validation),
+- one batched describe each for the key pair and the security groups,
+- remaining On-Demand vCPU quota (Service Quotas, cached) against the vCPUs
+  already running plus the vCPUs the launch would add.
+
+A check whose API call fails (throttling, missing permission, no network) is
+recorded as a failed check rather than raised, so ``plan.problems`` always
+explains a NO-GO.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+
+import boto3
+from botocore.exceptions import BotoCoreError, ClientError
+
+import executors
+import helpers
+from launch_profiles import default_resolver, resolve_ami_type
+
+# Instances per dry-run RunInstances call
+DRY_RUN_BATCH_SIZE: int = 100
+
+# "Running On-Demand Standard (A, C, D, H, I, M, R, T, Z) instances" vCPU quota
+STANDARD_VCPU_QUOTA_CODE: str = "L-1216C47A"
+
+# Instance family -> the On-Demand vCPU quota its instances count against.
+# Families map explicitly because the first letter is not enough: inf, is and
+# im share the letter i but only is/im are standard, hpc is not h, dl is not d.
+# Mac instances run on Dedicated Hosts and have no vCPU quota (None).
+FAMILY_QUOTA_CODES: dict = {
+    **dict.fromkeys(
+        ("a", "c", "d", "h", "i", "im", "is", "m", "r", "t", "z"),
+        STANDARD_VCPU_QUOTA_CODE,
+    ),
+    "dl": "L-6E869C2A",  # DL instances
+    "f": "L-74FC7D96",  # F instances
+    "g": "L-DB2E81BA",  # G and VT instances
+    "gr": "L-DB2E81BA",
+    "vt": "L-DB2E81BA",
+    "hpc": "L-F7808C92",  # HPC instances
+    "inf": "L-1945791B",  # Inf instances
+    "p": "L-417A185B",  # P instances
+    "trn": "L-2C3B7624",  # Trn instances
+    "u": "L-43DA4232",  # High Memory instances
+    "x": "L-7295265B",  # X instances
+    "mac": None,
+}
+_FAMILY_PATTERN = re.compile(r"[a-z]+")
+
+# How long a quota value is reused before asking Service Quotas again
+QUOTA_TTL_SECONDS: float = 300.0
+
+_quota_cache: dict = {}  # (region, quota code) -> (value, expires_at)
+_vcpu_cache: dict = {}  # instance type -> default vCPUs (static data)
+_cache_lock = threading.Lock()
+
+
+@dataclass
+class LaunchPlan:
+    """The outcome of a launch preflight."""
+
+    ami_type: str
+    instance_amount: int
+    launch_params: dict
+    checks: dict = field(default_factory=dict)  # check name -> (ok, detail)
+    vcpus_required: int = 0
+    vcpus_in_use: int = 0
+    vcpu_quota: float | None = None  # None when no vCPU quota applies
+
+    @property
+    def go(self) -> bool:
+        """bool: True if every check passed."""
+        return all(ok for ok, _ in self.checks.values())
+
+    @property
+    def problems(self) -> list:
+        """list: Details of every failed check."""
+        return [
+            f"{name}: {detail}" for name, (ok, detail) in self.checks.items() if not ok
+        ]
+
+
+def instance_family(instance_type: str) -> str:
+    """
+    Returns the family of an instance type ('m5.large' -> 'm', 'inf2.xlarge' -> 'inf').
+
+    Args:
+        instance_type (str): The instance type.
+
+    Returns:
+        str: The lowercase letters before the generation number.
+    """
+    match = _FAMILY_PATTERN.match(instance_type.lower())
+    return match.group() if match else ""
+
+
+def vcpu_quota_code(instance_type: str) -> str | None:
+    """
+    Returns the On-Demand vCPU quota code an instance type counts against.
+
+    Args:
+        instance_type (str): The instance type.
+
+    Returns:
+        str: The Service Quotas code, or None if the type has no vCPU quota or
+            its family is not in FAMILY_QUOTA_CODES.
+    """
+    return FAMILY_QUOTA_CODES.get(instance_family(instance_type))
+
+
+def get_vcpu_counts(ec2_client: boto3.client, instance_types: set) -> dict:
+    """
+    Returns default vCPU counts, describing only types not seen before.
+
+    Args:
+        ec2_client (boto3.client): The EC2 client.
+        instance_types (set): Instance types to look up.
+
+    Returns:
+        dict: Instance type -> vCPU count.
+    """
+    with _cache_lock:
+        missing = sorted(set(instance_types) - set(_vcpu_cache))
+    if missing:
+        paginator = ec2_client.get_paginator("describe_instance_types")
+        for page in paginator.paginate(InstanceTypes=missing):
+            for info in page["InstanceTypes"]:
+                with _cache_lock:
+                    _vcpu_cache[info["InstanceType"]] = info["VCpuInfo"]["DefaultVCpus"]
+    with _cache_lock:
+        return {
+            name: _vcpu_cache[name] for name in instance_types if name in _vcpu_cache
+        }
+
+
+def get_vcpu_quota(
+    quotas_client: boto3.client,
+    region: str,
+    quota_code: str = STANDARD_VCPU_QUOTA_CODE,
+) -> float:
+    """
+    Returns an On-Demand vCPU quota, cached for QUOTA_TTL_SECONDS.
+
+    Args:
+        quotas_client (boto3.client): The Service Quotas client.
+        region (str): Cache key for the client's region.
+        quota_code (str, optional): The quota to read. Defaults to the
+            standard families' quota.
+
+    Returns:
+        float: The quota value in vCPUs.
+    """
+    key = (region, quota_code)
+    now = time.monotonic()
+    with _cache_lock:
+        cached = _quota_cache.get(key)
+    if cached and cached[1] > now:
+        return cached[0]
+    response = quotas_client.get_service_quota(ServiceCode="ec2", QuotaCode=quota_code)
+    value = response["Quota"]["Value"]
+    with _cache_lock:
+        _quota_cache[key] = (value, now + QUOTA_TTL_SECONDS)
+    return value
+
+
+def vcpus_in_use(
+    ec2_client: boto3.client, quota_code: str = STANDARD_VCPU_QUOTA_CODE
+) -> int:
+    """
+    Sums the vCPUs of pending/running instances that count against a quota.
+
+    Args:
+        ec2_client (boto3.client): The EC2 client.
+        quota_code (str, optional): The vCPU quota. Defaults to the standard
+            families' quota.
+
+    Returns:
+        int: vCPUs counted against that On-Demand quota.
+    """
+    type_counts: dict = {}
+    paginator = ec2_client.get_paginator("describe_instances")
+    pages = paginator.paginate(
+        Filters=[{"Name": "instance-state-name", "Values": ["pending", "running"]}]
+    )
+    for page in pages:
+        for reservation in page["Reservations"]:
+            for instance in reservation["Instances"]:
+                instance_type = instance["InstanceType"]
+                if vcpu_quota_code(instance_type) == quota_code:
+                    type_counts[instance_type] = type_counts.get(instance_type, 0) + 1
+    vcpus = get_vcpu_counts(ec2_client, set(type_counts))
+    return sum(vcpus.get(name, 0) * count for name, count in type_counts.items())
+
+
+def _dry_run_batch(ec2_client: boto3.client, launch_params: dict, count: int) -> tuple:
+    """Runs one DryRun RunInstances call; returns (ok, detail)."""
+    try:
+        ec2_client.run_instances(
+            DryRun=True,
+            MinCount=count,
+            MaxCount=count,
+            ImageId=launch_params["ami"],
+            InstanceType=launch_params["instance_type"],
+            KeyName=launch_params["key_name"],
+            SecurityGroupIds=list(launch_params["security_group_ids"]),
+        )
+    except ClientError as error:
+        code = error.response["Error"]["Code"]
+        if code == "DryRunOperation":
+            return True, f"{count} instance(s) would launch"
+        return False, f"{code}: {error.response['Error'].get('Message', '')}"
+    return False, "RunInstances did not report a dry run"
+
+
+def _check_resources(ec2_client: boto3.client, launch_params: dict) -> dict:
+    """Confirms the key pair and security groups exist with one call each."""
+    checks = {}
+    try:
+        ec2_client.describe_key_pairs(KeyNames=[launch_params["key_name"]])
+        checks["key_pair"] = (True, launch_params["key_name"])
+    except ClientError as error:
+        checks["key_pair"] = (False, error.response["Error"]["Code"])
+
+    group_ids = list(launch_params["security_group_ids"])
+    try:
+        ec2_client.describe_security_groups(GroupIds=group_ids)
+        checks["security_groups"] = (True, ", ".join(group_ids))
+    except ClientError as error:
+        checks["security_groups"] = (False, error.response["Error"]["Code"])
+    return checks
+
+
+def plan_launch(
+    ec2_client: boto3.client,
+    ami_type: str = "ubuntu",
+    instance_amount: int = 1,
+    region: str | None = None,
+    quotas_client: boto3.client = None,
+    batch_size: int = DRY_RUN_BATCH_SIZE,
+) -> LaunchPlan:
+    """
+    Checks whether a create_instances call would succeed, without launching.
+
+    Args:
+        ec2_client (boto3.client): The EC2 client the launch would use.
+        ami_type (str, optional): Any alias registered in launch_profiles.
+            Defaults to "ubuntu".
+        instance_amount (int, optional): Number of instances. Defaults to 1.
+        region (str, optional): Region for AMI resolution, as in create_instances.
+        quotas_client (boto3.client, optional): Service Quotas client for the
+            same region. Defaults to one built by helpers.
+        batch_size (int, optional): Instances per dry-run call.
+            Defaults to DRY_RUN_BATCH_SIZE.
+
+    Returns:
+        LaunchPlan: The checks and vCPU figures; ``plan.go`` is the verdict.
+
+    Raises:
+        ValueError: If the AMI type is not registered.
+    """
+    profile = resolve_ami_type(ami_type)
+    launch_params = default_resolver.launch_params(profile.name, region)
+    plan = LaunchPlan(profile.name, instance_amount, launch_params)
+    if quotas_client is None:
+        quotas_client = helpers.get_service_quotas_client(region)
+
+    batches = [
+        min(batch_size, instance_amount - start)
+        for start in range(0, instance_amount, batch_size)
+    ]
+    instance_type = launch_params["instance_type"]
+    quota_code = vcpu_quota_code(instance_type)
+
+    # All checks share the "ec2" pool; Service Quotas gets its own small pool
+    dry_runs = [
+        executors.submit("ec2", _dry_run_batch, ec2_client, launch_params, count)
+        for count in batches
+    ]
+    resources = executors.submit("ec2", _check_resources, ec2_client, launch_params)
+    vcpus = executors.submit("ec2", get_vcpu_counts, ec2_client, {instance_type})
+    if quota_code:
+        quota = executors.submit(
+            "service-quotas",
+            get_vcpu_quota,
+            quotas_client,
+            region or "default",
+            quota_code,
+        )
+        in_use = executors.submit("ec2", vcpus_in_use, ec2_client, quota_code)
+
+    for number, future in enumerate(dry_runs, start=1):
+        try:
+            plan.checks[f"dry_run_batch_{number}"] = future.result()
+        except (BotoCoreError, ClientError) as error:
+            plan.checks[f"dry_run_batch_{number}"] = (False, str(error))
+    try:
+        plan.checks.update(resources.result())
+    except (BotoCoreError, ClientError) as error:
+        plan.checks["resources"] = (False, str(error))
+    try:
+        vcpu_counts = vcpus.result()
+        if quota_code:
+            plan.vcpu_quota = quota.result()
+            plan.vcpus_in_use = in_use.result()
+    except (BotoCoreError, ClientError) as error:
+        plan.checks["vcpu_quota"] = (False, str(error))
+        return plan
+    if instance_type not in vcpu_counts:  # Not passed: the need is unknown
+        plan.checks["vcpu_quota"] = (
+            False,
+            f"vCPU count of {instance_type} unknown, quota not checked",
+        )
+        return plan
+    plan.vcpus_required = vcpu_counts[instance_type] * instance_amount
+    if quota_code:
+        remaining = plan.vcpu_quota - plan.vcpus_in_use
+        plan.checks["vcpu_quota"] = (
+            plan.vcpus_required <= remaining,
+            f"{plan.vcpus_required} vCPUs needed, {remaining:g} remaining",
+        )
+    return plan
+
+
+if __name__ == "__main__":
+    # Preflight a 10-instance Ubuntu launch and print the verdict
+    client = helpers.get_ec2_client(concurrency=executors.pool_size("ec2"))
+    launch_plan = plan_launch(client, "ubuntu", 10)
+    print("GO" if launch_plan.go else "NO-GO")
+    for name, (ok, detail) in launch_plan.checks.items():
+        print(f"  [{'ok' if ok else 'FAIL'}] {name}: {detail}")
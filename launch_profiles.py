@@ -0,0 +1,368 @@
+"""
+Launch profiles and a cached, region-aware AMI resolver.
+
+A ``LaunchProfile`` bundles everything ``helpers.create_instance`` needs to
+launch one kind of instance. Its AMI is looked up per region from an SSM public
+parameter (for example the Amazon Linux "latest" parameters), so the same
+profile works in any region.
+
+Key pairs and security groups are regional too. A profile carries them for
+``helpers.DEFAULT_REGION`` plus any other region registered with
+``register_network``; launching elsewhere fails before any API call.
+
+``AmiResolver`` caches resolved AMI IDs in memory and in a JSON file on disk,
+both with a TTL, and resolves many profiles with as few ``get_parameters``
+calls as possible.
+
+Profiles are registered once with ``register_profile`` together with their
+aliases; ``resolve_ami_type`` then maps any user spelling ("Linux 2023",
+"al2023", ...) to a profile with a single dictionary lookup.
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+import helpers
+
+logger = logging.getLogger(__name__)
+
+# GetParameters accepts at most 10 names per call
+SSM_BATCH_SIZE: int = 10
+
+# How long a resolved AMI ID is trusted before it is looked up again
+DEFAULT_TTL_SECONDS: float = 6 * 60 * 60
+
+# On-disk cache shared by every process on this machine
+DEFAULT_CACHE_PATH: str = os.path.join(
+    os.path.expanduser("~"), ".cache", "luit-launch-profiles", "ami-cache.json"
+)
+
+
+@dataclass(frozen=True)
+class LaunchProfile:
+    """Everything needed to launch one kind of instance in any region."""
+
+    name: str
+    ami_parameter: str  # SSM public parameter whose value is the AMI ID
+    default_ami: str  # AMI used when no region is requested (us-east-1)
+    label: str = ""  # Human-readable name used in progress messages
+    instance_type: str = helpers.DEFAULT_INSTANCE_TYPE
+    key_name: str = helpers.DEFAULT_KEY_NAME  # Key pair in helpers.DEFAULT_REGION
+    security_group_ids: tuple = helpers.DEFAULT_SECURITY_GROUP_IDS  # Ditto
+    # Other region -> (key pair name, security group IDs) in that region
+    regional_network: dict = field(default_factory=dict, hash=False)
+
+    def network(self, region: str | None = None) -> tuple:
+        """
+        Returns the key pair name and security group IDs to use in a region.
+
+        Args:
+            region (str, optional): The AWS region. Defaults to
+                helpers.DEFAULT_REGION.
+
+        Returns:
+            tuple: (key pair name, tuple of security group IDs).
+
+        Raises:
+            ValueError: If nothing is registered for the region.
+        """
+        if region is None or region == helpers.DEFAULT_REGION:
+            return self.key_name, self.security_group_ids
+        if region not in self.regional_network:
+            raise ValueError(
+                f"Profile {self.name!r} has no key pair and security groups for "
+                f"{region}; add them with launch_profiles.register_network"
+            )
+        return self.regional_network[region]
+
+
+# Registered profiles, keyed by profile name
+PROFILES: dict = {}
+
+# Normalized alias -> profile name, filled by register_profile
+ALIASES: dict = {}
+
+
+def normalize_ami_type(ami_type: str) -> str:
+    """
+    Normalizes a user-supplied AMI type for alias lookup.
+
+    Case and every non-alphanumeric character are ignored, so " Linux 2023 ",
+    "linux-2023" and "LINUX2023" all become "linux2023".
+
+    Args:
+        ami_type (str): The AMI type as typed by the user.
+
+    Returns:
+        str: The normalized key.
+    """
+    return re.sub(r"[^a-z0-9]", "", ami_type.lower())
+
+
+def register_profile(profile: LaunchProfile, aliases: tuple = ()) -> None:
+    """
+    Registers a launch profile and the names it can be selected by.
+
+    Args:
+        profile (LaunchProfile): The profile to register.
+        aliases (tuple, optional): Extra names; the profile name is always
+            an alias. Defaults to ().
+
+    Raises:
+        ValueError: If an alias already points at a different profile.
+    """
+    keys = {normalize_ami_type(alias) for alias in (profile.name, *aliases)}
+    for key in keys:
+        if ALIASES.get(key, profile.name) != profile.name:
+            raise ValueError(f"Alias {key!r} is already registered to {ALIASES[key]!r}")
+    PROFILES[profile.name] = profile
+    ALIASES.update(dict.fromkeys(keys, profile.name))
+
+
+def register_network(
+    region: str,
+    key_name: str,
+    security_group_ids: tuple,
+    profile_names: tuple | None = None,
+) -> None:
+    """
+    Registers the key pair and security groups profiles use in a region.
+
+    Args:
+        region (str): The AWS region.
+        key_name (str): Name of a key pair that exists in that region.
+        security_group_ids (tuple): Security group IDs from that region.
+        profile_names (tuple, optional): Profiles to update. Defaults to every
+            registered profile.
+    """
+    for name in profile_names or tuple(PROFILES):
+        profile = PROFILES[name]
+        network = {
+            **profile.regional_network,
+            region: (key_name, tuple(security_group_ids)),
+        }
+        PROFILES[name] = replace(profile, regional_network=network)
+
+
+def resolve_ami_type(ami_type: str) -> LaunchProfile:
+    """
+    Looks up the profile for a user-supplied AMI type.
+
+    Args:
+        ami_type (str): Any registered alias, in any case or spacing.
+
+    Returns:
+        LaunchProfile: The matching profile.
+
+    Raises:
+        ValueError: If no profile is registered under that name.
+    """
+    name = ALIASES.get(normalize_ami_type(ami_type))
+    if name is None:
+        raise ValueError(
+            f"Unsupported AMI type {ami_type!r}; expected one of {sorted(ALIASES)}"
+        )
+    return PROFILES[name]
+
+
+# Built-in profiles
+register_profile(
+    LaunchProfile(
+        name="ubuntu",
+        ami_parameter=(
+            "/aws/service/canonical/ubuntu/server/24.04/stable/current/"
+            "amd64/hvm/ebs-gp3/ami-id"
+        ),
+        default_ami=helpers.UBUNTU_AMI_ID,
+        label="Ubuntu",
+    ),
+    aliases=("ubuntu 24.04", "ubuntu24"),
+)
+register_profile(
+    LaunchProfile(
+        name="linux2023",
+        ami_parameter="/aws/service/ami-amazon-linux-latest/al2023-ami-kernel-default-x86_64",
+        default_ami=helpers.AMAZON_LINUX_2023_AMI_ID,
+        label="Linux 2023",
+    ),
+    aliases=("al2023", "amazon linux 2023"),
+)
+register_profile(
+    LaunchProfile(
+        name="linux2",
+        ami_parameter="/aws/service/ami-amazon-linux-latest/amzn2-ami-hvm-x86_64-gp2",
+        default_ami=helpers.AMAZON_LINUX_2_AMI_ID,
+        label="Linux 2",
+    ),
+    aliases=("al2", "amazon linux 2"),
+)
+
+
+class AmiResolver:
+    """Resolves profile AMI IDs per region through a memory + disk TTL cache."""
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        cache_path: str = DEFAULT_CACHE_PATH,
+        client_factory=helpers.get_ssm_client,
+        clock=time.time,
+    ):
+        """
+        Creates a resolver.
+
+        Args:
+            ttl_seconds (float, optional): Cache lifetime of a resolved AMI.
+                Defaults to six hours.
+            cache_path (str, optional): JSON file used as the on-disk cache, or
+                None to cache in memory only. Defaults to DEFAULT_CACHE_PATH.
+            client_factory (callable, optional): Builds an SSM client for a
+                region name. Defaults to helpers.get_ssm_client.
+            clock (callable, optional): Wall-clock time source, replaceable in tests.
+        """
+        self.ttl_seconds = ttl_seconds
+        self.cache_path = cache_path
+        self.client_factory = client_factory
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._cache: dict = None  # "region|parameter" -> [ami_id, expires_at]
+        self._clients: dict = {}  # region -> SSM client
+
+    def _load(self) -> dict:
+        """Loads the disk cache once, ignoring a missing or corrupt file."""
+        if self._cache is None:
+            self._cache = {}
+            if self.cache_path and os.path.exists(self.cache_path):
+                try:
+                    with open(self.cache_path, encoding="utf-8") as cache_file:
+                        self._cache = json.load(cache_file)
+                except (OSError, ValueError):
+                    self._cache = {}
+        return self._cache
+
+    def _save(self, entries: dict) -> None:
+        """Atomically writes a copy of the cache to disk, if the disk allows."""
+        if not self.cache_path:
+            return
+        try:
+            directory = os.path.dirname(self.cache_path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                json.dump(entries, tmp_file)
+            os.replace(tmp_path, self.cache_path)  # Readers never see a partial file
+        except OSError as error:  # Read-only home in Lambda/containers: memory only
+            logger.warning("Cannot write AMI cache %s: %s", self.cache_path, error)
+
+    def _client(self, region: str) -> object:
+        """Returns a cached SSM client for the region."""
+        if region not in self._clients:
+            self._clients[region] = self.client_factory(region)
+        return self._clients[region]
+
+    def resolve(self, profile_names: list, region: str) -> dict:
+        """
+        Resolves the AMI IDs of several profiles in one region.
+
+        Only parameters missing from the cache (or expired) are fetched, with
+        one get_parameters call per 10 parameters.
+
+        Args:
+            profile_names (list): Keys of PROFILES.
+            region (str): The AWS region to resolve AMIs for.
+
+        Returns:
+            dict: Profile name -> AMI ID.
+
+        Raises:
+            KeyError: If a profile name is unknown.
+            LookupError: If SSM does not know a profile's parameter.
+        """
+        profiles = [PROFILES[name] for name in profile_names]
+        now = self.clock()
+        with self._lock:
+            cache = self._load()
+            missing = sorted(
+                {
+                    profile.ami_parameter
+                    for profile in profiles
+                    if cache.get(f"{region}|{profile.ami_parameter}", [None, 0])[1]
+                    <= now
+                }
+            )
+            client = self._client(region) if missing else None
+
+        # SSM is called without the lock, so other regions are not held up
+        fetched = {}
+        for start in range(0, len(missing), SSM_BATCH_SIZE):
+            batch = missing[start : start + SSM_BATCH_SIZE]
+            response = client.get_parameters(Names=batch)
+            if response.get("InvalidParameters"):
+                raise LookupError(
+                    f"Unknown SSM parameters in {region}: "
+                    f"{response['InvalidParameters']}"
+                )
+            for parameter in response["Parameters"]:
+                fetched[f"{region}|{parameter['Name']}"] = [
+                    parameter["Value"],
+                    now + self.ttl_seconds,
+                ]
+
+        with self._lock:
+            cache.update(fetched)
+            result = {
+                profile.name: cache[f"{region}|{profile.ami_parameter}"][0]
+                for profile in profiles
+            }
+            entries = dict(cache) if fetched else None
+        if entries is not None:
+            self._save(entries)
+        return result
+
+    def resolve_one(self, profile_name: str, region: str) -> str:
+        """
+        Resolves the AMI ID of a single profile.
+
+        Args:
+            profile_name (str): A key of PROFILES.
+            region (str): The AWS region.
+
+        Returns:
+            str: The AMI ID.
+        """
+        return self.resolve([profile_name], region)[profile_name]
+
+    def launch_params(self, profile_name: str, region: str | None = None) -> dict:
+        """
+        Builds the keyword arguments for helpers.create_instance.
+
+        Args:
+            profile_name (str): A key of PROFILES.
+            region (str, optional): The AWS region. If omitted the profile's
+                default (us-east-1) AMI is used without any lookup.
+
+        Returns:
+            dict: 'ami', 'instance_type', 'key_name' and 'security_group_ids'.
+
+        Raises:
+            ValueError: If the profile has no key pair and security groups for
+                the region (checked before any AMI lookup).
+        """
+        profile = PROFILES[profile_name]
+        key_name, security_group_ids = profile.network(region)
+        ami = self.resolve_one(profile_name, region) if region else profile.default_ami
+        return {
+            "ami": ami,
+            "instance_type": profile.instance_type,
+            "key_name": key_name,
+            "security_group_ids": security_group_ids,
+        }
+
+
+default_resolver = AmiResolver()  # Shared resolver used by creating_instances
@@ -0,0 +1,229 @@
+"""
+Non-blocking tracking of freshly launched EC2 instances.
+
+A ``LaunchTracker`` holds the IDs returned by ``helpers.create_instance`` and,
+on each ``poll()``, checks all still-pending instances with one
+``describe_instance_status`` call per chunk of IDs instead of one call per
+instance. ``poll()`` never sleeps, so callers decide how often to poll.
+
+``wait_for_instances`` is the blocking counterpart: it waits for a whole batch
+with chunked ``describe_instances`` calls and an adaptive polling interval.
+"""
+
+import time
+
+import boto3
+
+import helpers
+
+# DescribeInstanceStatus accepts at most 100 explicit instance IDs per call
+STATUS_CHUNK_SIZE: int = 100
+
+# DescribeInstances calls made by the batch waiter carry at most this many IDs
+DESCRIBE_CHUNK_SIZE: int = 1000
+
+# States after which an instance no longer needs to be polled
+READY_STATES: frozenset = frozenset({"running"})
+FAILED_STATES: frozenset = frozenset(
+    {"shutting-down", "terminated", "stopping", "stopped"}
+)
+
+
+def chunked(items: list, size: int):
+    """
+    Yields consecutive slices of at most ``size`` items.
+
+    Args:
+        items (list): The items to split.
+        size (int): The maximum slice length.
+
+    Yields:
+        list: The next slice.
+    """
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+class LaunchTracker:
+    """Tracks the state of many pending instances with batched status calls."""
+
+    def __init__(self, client: boto3.client, chunk_size: int = STATUS_CHUNK_SIZE):
+        """
+        Creates an empty tracker.
+
+        Args:
+            client (boto3.client): The EC2 client used for status calls.
+            chunk_size (int, optional): Instance IDs per describe call.
+                Defaults to STATUS_CHUNK_SIZE.
+        """
+        self.client = client
+        self.chunk_size = min(chunk_size, STATUS_CHUNK_SIZE)
+        self.states: dict = {}  # instance ID -> last known state name
+        self._pending: dict = {}  # insertion-ordered set of IDs still polled
+
+    def track(self, instance_ids: list) -> None:
+        """
+        Starts tracking the given instances.
+
+        Args:
+            instance_ids (list): IDs returned by a launch call.
+        """
+        for instance_id in instance_ids:
+            self.states.setdefault(instance_id, "pending")
+            self._pending[instance_id] = None
+
+    @property
+    def pending(self) -> list:
+        """list: IDs that have not yet reached a ready or failed state."""
+        return list(self._pending)
+
+    @property
+    def ready(self) -> list:
+        """list: IDs that reached a ready state."""
+        return [i for i, state in self.states.items() if state in READY_STATES]
+
+    @property
+    def failed(self) -> list:
+        """list: IDs that stopped or terminated before becoming ready."""
+        return [i for i, state in self.states.items() if state in FAILED_STATES]
+
+    def done(self) -> bool:
+        """
+        Reports whether every tracked instance has settled.
+
+        Returns:
+            bool: True once nothing is pending.
+        """
+        return not self._pending
+
+    def poll(self) -> dict:
+        """
+        Runs one polling cycle over every pending instance.
+
+        Instances that EC2 does not know about yet (eventual consistency right
+        after RunInstances) stay pending until a later cycle; the rest of
+        their chunk is still polled.
+
+        Returns:
+            dict: Instance ID -> new state, for instances whose state changed.
+        """
+        changes = {}
+        for chunk in chunked(self.pending, self.chunk_size):
+            response, _ = helpers.call_without_unknown_ids(
+                lambda ids: self.client.describe_instance_status(
+                    InstanceIds=ids, IncludeAllInstances=True
+                ),
+                chunk,
+            )
+            if response is None:
+                continue  # Nothing in the chunk is visible yet
+
+            for status in response["InstanceStatuses"]:
+                instance_id = status["InstanceId"]
+                state = status["InstanceState"]["Name"]
+                if self.states.get(instance_id) != state:
+                    changes[instance_id] = state
+                self.states[instance_id] = state
+                if state in READY_STATES or state in FAILED_STATES:
+                    self._pending.pop(instance_id, None)
+        return changes
+
+
+class InstanceWaitError(Exception):
+    """Raised when some instances fail or time out while waiting."""
+
+    def __init__(self, message: str, ready: dict, failed: dict, pending: list):
+        super().__init__(message)
+        self.ready = ready  # instance ID -> seconds until ready
+        self.failed = failed  # instance ID -> failure state name
+        self.pending = pending  # IDs still pending at the deadline
+
+
+def wait_for_instances(
+    client: boto3.client,
+    instance_ids: list,
+    timeout: float = 600.0,
+    min_delay: float = 2.0,
+    max_delay: float = 30.0,
+    chunk_size: int = DESCRIBE_CHUNK_SIZE,
+    sleep=time.sleep,
+    clock=time.monotonic,
+) -> dict:
+    """
+    Waits for a batch of instances to reach the running state.
+
+    Each cycle describes only the IDs that are still pending, in chunks of up
+    to ``chunk_size``. IDs EC2 does not know (yet) stay pending and are left
+    out of their chunk's call, so they cannot hide the other instances. The
+    delay between cycles starts at ``min_delay``, grows by half while nothing
+    changes and drops back once instances settle, so a large launch costs a
+    handful of calls per cycle.
+
+    Args:
+        client (boto3.client): The EC2 client used to describe instances.
+        instance_ids (list): The instance IDs to wait for.
+        timeout (float, optional): Seconds to wait before giving up.
+            Defaults to 600.
+        min_delay (float, optional): Shortest delay between cycles in seconds.
+            Defaults to 2.
+        max_delay (float, optional): Longest delay between cycles in seconds.
+            Defaults to 30.
+        chunk_size (int, optional): IDs per describe call. Defaults to 1000.
+        sleep (callable, optional): Sleep function, replaceable in tests.
+        clock (callable, optional): Monotonic clock, replaceable in tests.
+
+    Returns:
+        dict: Instance ID -> seconds from the start of the wait until the
+              instance was first seen running.
+
+    Raises:
+        InstanceWaitError: If any instance enters a failed state or the
+            timeout expires first. The exception carries the partial results.
+    """
+    start = clock()
+    deadline = start + timeout
+    pending = dict.fromkeys(instance_ids)  # Ordered set of IDs still waited on
+    ready: dict = {}
+    failed: dict = {}
+    delay = min_delay
+
+    while pending:
+        settled = 0
+        for chunk in chunked(list(pending), chunk_size):
+            response, _ = helpers.call_without_unknown_ids(
+                lambda ids: client.describe_instances(InstanceIds=ids), chunk
+            )
+            if response is None:
+                continue  # Nothing in the chunk is visible yet
+
+            now = clock() - start
+            for reservation in response["Reservations"]:
+                for instance in reservation["Instances"]:
+                    instance_id = instance["InstanceId"]
+                    state = instance["State"]["Name"]
+                    if instance_id not in pending:
+                        continue
+                    if state in READY_STATES:
+                        ready[instance_id] = now
+                    elif state in FAILED_STATES:
+                        failed[instance_id] = state
+                    else:
+                        continue
+                    del pending[instance_id]  # Drop from the working set
+                    settled += 1
+
+        if not pending or clock() >= deadline:
+            break
+
+        # Poll sooner while instances are settling, back off while idle
+        delay = min_delay if settled else min(delay * 1.5, max_delay)
+        sleep(min(delay, max(deadline - clock(), 0)))
+
+    if failed or pending:
+        raise InstanceWaitError(
+            f"{len(failed)} instance(s) failed and {len(pending)} timed out",
+            ready=ready,
+            failed=failed,
+            pending=list(pending),
+        )
+    return ready
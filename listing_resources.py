@@ -1,9 +1,23 @@
-from typing import List, Dict
+import os
+import time
+from collections.abc import Iterator
+from concurrent.futures import as_completed
+from dataclasses import dataclass
+
+import executors
 from helpers import (
-    list_buckets,
     describe_instances,
     get_ec2_client,
     get_s3_client,
+    list_buckets,
+)
+
+# Sections collected when none are named
+DEFAULT_SECTIONS: tuple = ("buckets", "instances")
+
+# Seconds the script waits for all sections before printing what it has
+DEFAULT_DEADLINE_SECONDS: float = float(
+    os.environ.get("LISTING_DEADLINE_SECONDS", "30")
 )
 
 
@@ -15,7 +29,7 @@ def print_bucket_names(s3_client) -> None:
         s3_client: A boto3 S3 client used to interact with AWS S3.
     """
     # Fetch list of bucket names from AWS S3
-    bucket_names: List[str] = list_buckets(s3_client)
+    bucket_names: list[str] = list_buckets(s3_client)
 
     # Print each bucket name
     for bucket_name in bucket_names:
@@ -30,10 +44,10 @@ def print_instance_ids(ec2_client) -> None:
         ec2_client: A boto3 EC2 client used to interact with AWS EC2.
     """
     # Get list of instance descriptions from AWS EC2
-    instances: List[Dict[str, str]] = describe_instances(ec2_client)
+    instances: list[dict[str, str]] = describe_instances(ec2_client)
 
     # Extract instance IDs into a separate list
-    instance_ids: List[str] = []
+    instance_ids: list[str] = []
     for instance in instances:
         instance_ids.append(instance["InstanceId"])
 
@@ -42,13 +56,154 @@ def print_instance_ids(ec2_client) -> None:
         print(instance_id)
 
 
-if __name__ == "__main__":
-    # Initialize AWS EC2 and S3 clients
-    ec2_client = get_ec2_client()
-    s3_client = get_s3_client()
+def list_vpc_ids(ec2_client) -> list[str]:
+    """
+    Retrieve all VPC IDs for the given client.
+
+    Args:
+        ec2_client: A boto3 EC2 client used to interact with AWS EC2.
+
+    Returns:
+        list[str]: The VPC IDs.
+    """
+    paginator = ec2_client.get_paginator("describe_vpcs")
+    return [vpc["VpcId"] for page in paginator.paginate() for vpc in page["Vpcs"]]
+
+
+def _instance_ids(ec2_client) -> list[str]:
+    """Retrieve all EC2 instance IDs for the given client."""
+    return [instance["InstanceId"] for instance in describe_instances(ec2_client)]
+
+
+# Section name -> (service / executor pool, how to list it with that client)
+SECTIONS: dict[str, tuple] = {
+    "buckets": ("s3", lambda client: list_buckets(client)),
+    "instances": ("ec2", lambda client: _instance_ids(client)),
+    "vpcs": ("ec2", lambda client: list_vpc_ids(client)),
+}
+
+
+@dataclass
+class Section:
+    """The outcome of collecting one kind of resource."""
+
+    name: str
+    items: list = None  # Resource names/IDs; None if the section did not finish
+    error: Exception = None  # Set when listing failed
+    seconds: float = 0.0  # Time spent collecting
+    timed_out: bool = False  # True if the deadline passed first
+
 
-    # Print bucket names
-    print_bucket_names(s3_client)
+def _collect_section(name: str, client) -> Section:
+    """Lists one section, capturing its duration and any error."""
+    started = time.perf_counter()
+    try:
+        items = SECTIONS[name][1](client)
+    except Exception as error:  # noqa: BLE001 - one failure must not hide the rest
+        return Section(name, error=error, seconds=time.perf_counter() - started)
+    return Section(name, items=items, seconds=time.perf_counter() - started)
 
-    # Print instance IDs
-    print_instance_ids(ec2_client)
+
+def collect_resources(
+    sections: tuple = DEFAULT_SECTIONS,
+    deadline_seconds: float | None = None,
+    clients: dict[str, object] | None = None,
+) -> Iterator[Section]:
+    """
+    Lists several kinds of resources concurrently.
+
+    Each section runs in its service's shared executor pool, so the wall time
+    is that of the slowest section rather than the sum.
+
+    At the deadline, sections that have not started are cancelled. A call
+    already in flight cannot be interrupted: it keeps its pool worker until it
+    returns or botocore's connect/read timeouts (``helpers.client_config``)
+    end it, and since pool threads are not daemons, interpreter exit waits for
+    it too. Scripts can call ``executors.shutdown(wait_for_tasks=False)`` to
+    stop waiting on the pools themselves.
+
+    Args:
+        sections (tuple, optional): Keys of SECTIONS. Defaults to buckets
+            and instances.
+        deadline_seconds (float, optional): Stop waiting after this long and
+            report the unfinished sections as timed out. Defaults to no limit.
+        clients (dict, optional): Service name -> client. Missing clients are
+            created here, before any thread starts.
+
+    Yields:
+        Section: One per section, in the order they finish; timed-out
+        sections come last.
+
+    Raises:
+        ValueError: If a section name is unknown.
+    """
+    unknown = set(sections) - set(SECTIONS)
+    if unknown:
+        raise ValueError(f"Unknown sections {sorted(unknown)}")
+    factories = {"s3": get_s3_client, "ec2": get_ec2_client}
+    clients = dict(clients or {})
+    for name in sections:
+        service = SECTIONS[name][0]
+        if service not in clients:
+            # Clients are thread-safe but the session creating them is not,
+            # so every client is made here, before any worker uses it
+            clients[service] = factories[service]()
+
+    futures = {
+        executors.submit(
+            SECTIONS[name][0], _collect_section, name, clients[SECTIONS[name][0]]
+        ): name
+        for name in sections
+    }
+    pending = dict(futures)
+    try:
+        for future in as_completed(futures, timeout=deadline_seconds):
+            del pending[future]
+            yield future.result()
+    except TimeoutError:
+        for future, name in pending.items():
+            future.cancel()  # Drops it if it has not started; see the docstring
+            yield Section(name, seconds=deadline_seconds, timed_out=True)
+
+
+def print_sections(sections) -> dict[str, Section]:
+    """
+    Print each section under its own header as soon as it arrives.
+
+    Args:
+        sections (iterable): Sections, e.g. from ``collect_resources``.
+
+    Returns:
+        dict[str, Section]: The sections by name.
+    """
+    collected: dict[str, Section] = {}
+    for section in sections:
+        collected[section.name] = section
+        if section.timed_out:
+            print(f"== {section.name}: timed out after {section.seconds:.1f}s ==")
+        elif section.error is not None:
+            print(f"== {section.name}: failed ({section.error}) ==")
+        else:
+            print(
+                f"== {section.name} ({len(section.items)} in {section.seconds:.2f}s) =="
+            )
+            for item in section.items:
+                print(item)
+    return collected
+
+
+if __name__ == "__main__":
+    # Collect buckets, instances and VPCs concurrently and print each section
+    # as it arrives; whatever is still running at the deadline is reported
+    try:
+        print_sections(
+            collect_resources(
+                ("buckets", "instances", "vpcs"),
+                deadline_seconds=DEFAULT_DEADLINE_SECONDS,
+            )
+        )
+    finally:
+        # Cancel queued calls; the interpreter still joins the worker threads at
+        # exit, so calls in flight at the deadline delay exit until they return
+        # (each attempt is bounded by the clients' 30 s read timeout)
+        executors.shutdown(wait_for_tasks=False)
@@ -0,0 +1,477 @@
+"""
+Multi-account inventory fan-out.
+
+``CredentialCache`` assumes one IAM role per account through STS and keeps the
+temporary credentials until shortly before they expire; concurrent requests
+for the same role share a single AssumeRole call. ``run_matrix`` then runs
+``describe_instances`` and ``list_buckets`` for every account x region cell in
+the shared "accounts" pool and streams each cell's result as soon as it is
+ready, tagged with its account, region and operation.
+
+For very large sweeps, response parsing (pure Python in botocore) becomes the
+bottleneck and threads stop scaling. ``sweep_instances`` shards the cells over
+worker processes instead; each worker keeps its own credentials and clients
+and returns each cell as one compact columnar batch (msgpack when installed,
+compact JSON otherwise) rather than a pickled tree of dicts.
+
+Example::
+
+    for result in run_matrix(["111111111111", "222222222222"], ["us-east-1"]):
+        print(result.account_id, result.region, result.operation, result.ok)
+"""
+
+import json
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import boto3
+
+try:
+    import msgpack  # Optional, more compact and faster batch encoding
+except ImportError:
+    msgpack = None
+
+import executors
+import helpers
+import singleflight
+
+# Role assumed in every member account unless another name is given
+DEFAULT_ROLE_NAME: str = "OrganizationAccountAccessRole"
+
+# Credentials are renewed this many seconds before they expire
+REFRESH_MARGIN_SECONDS: float = 300.0
+
+# Lifetime requested for assumed-role sessions
+SESSION_DURATION_SECONDS: int = 3600
+
+# Operations run_matrix knows how to run; list_buckets is global, so it runs
+# once per account (in the first region) rather than once per cell
+OPERATIONS: dict = {
+    "describe_instances": (helpers.get_ec2_client, helpers.describe_instances, True),
+    "list_buckets": (helpers.get_s3_client, helpers.list_buckets, False),
+}
+
+# Column name -> how to read it from a DescribeInstances instance dict
+INSTANCE_COLUMNS: dict = {
+    "InstanceId": lambda instance: instance["InstanceId"],
+    "InstanceType": lambda instance: instance.get("InstanceType"),
+    "State": lambda instance: instance.get("State", {}).get("Name"),
+    "AvailabilityZone": lambda instance: instance.get("Placement", {}).get(
+        "AvailabilityZone"
+    ),
+    "VpcId": lambda instance: instance.get("VpcId"),
+    "SubnetId": lambda instance: instance.get("SubnetId"),
+    "ImageId": lambda instance: instance.get("ImageId"),
+    "PrivateIpAddress": lambda instance: instance.get("PrivateIpAddress"),
+    "LaunchTime": lambda instance: (
+        instance["LaunchTime"].timestamp() if "LaunchTime" in instance else None
+    ),
+    "Tags": lambda instance: {t["Key"]: t["Value"] for t in instance.get("Tags", [])},
+}
+
+
+def role_arn(account_id: str, role_name: str = DEFAULT_ROLE_NAME) -> str:
+    """
+    Builds the ARN of a role in another account.
+
+    Args:
+        account_id (str): The 12-digit account ID.
+        role_name (str, optional): The role name. Defaults to DEFAULT_ROLE_NAME.
+
+    Returns:
+        str: The role ARN.
+    """
+    return f"arn:aws:iam::{account_id}:role/{role_name}"
+
+
+class CredentialCache:
+    """Assumed-role sessions per role ARN, renewed shortly before expiry."""
+
+    def __init__(
+        self,
+        sts_client=None,
+        session_name: str = "luit-inventory",
+        refresh_margin: float = REFRESH_MARGIN_SECONDS,
+        duration: int = SESSION_DURATION_SECONDS,
+        clock=time.time,
+    ):
+        """
+        Creates an empty cache.
+
+        Args:
+            sts_client (boto3.client, optional): STS client using the caller's
+                credentials. Created on first use when omitted.
+            session_name (str, optional): RoleSessionName for AssumeRole.
+            refresh_margin (float, optional): Seconds before expiry at which
+                credentials are renewed. Defaults to REFRESH_MARGIN_SECONDS.
+            duration (int, optional): Requested session lifetime in seconds.
+            clock (callable, optional): Wall-clock time source, replaceable in tests.
+        """
+        self._sts = sts_client
+        self.session_name = session_name
+        self.refresh_margin = refresh_margin
+        self.duration = duration
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._sessions: dict = {}  # role ARN -> (boto3 Session, expires_at epoch)
+        self._flight = singleflight.SingleFlight(name="assume_role")
+
+    def _sts_client(self):
+        """Returns the STS client, creating it on first use."""
+        with self._lock:
+            if self._sts is None:
+                self._sts = boto3.client("sts")
+            return self._sts
+
+    def _assume(self, arn: str) -> boto3.session.Session:
+        """Calls AssumeRole and caches the resulting session."""
+        response = self._sts_client().assume_role(
+            RoleArn=arn,
+            RoleSessionName=self.session_name,
+            DurationSeconds=self.duration,
+        )
+        credentials = response["Credentials"]
+        session = boto3.session.Session(
+            aws_access_key_id=credentials["AccessKeyId"],
+            aws_secret_access_key=credentials["SecretAccessKey"],
+            aws_session_token=credentials["SessionToken"],
+        )
+        expiration = credentials["Expiration"]
+        if isinstance(expiration, datetime):
+            expires_at = expiration.replace(tzinfo=expiration.tzinfo or UTC)
+            expires_at = expires_at.timestamp()
+        else:
+            expires_at = self.clock() + self.duration
+        with self._lock:
+            self._sessions[arn] = (session, expires_at)
+        return session
+
+    def session(
+        self, account_id: str, role_name: str = DEFAULT_ROLE_NAME
+    ) -> boto3.session.Session:
+        """
+        Returns a session for the role, assuming it only when needed.
+
+        Args:
+            account_id (str): The account to access.
+            role_name (str, optional): The role to assume. Defaults to
+                DEFAULT_ROLE_NAME.
+
+        Returns:
+            boto3.session.Session: A session with the role's credentials.
+        """
+        arn = role_arn(account_id, role_name)
+        with self._lock:
+            cached = self._sessions.get(arn)
+        if cached is not None and cached[1] - self.refresh_margin > self.clock():
+            return cached[0]
+        return self._flight.do(arn, self._assume, arn)  # One AssumeRole per burst
+
+
+@dataclass
+class AccountResult:
+    """One cell of the account x region matrix."""
+
+    account_id: str
+    region: str
+    operation: str
+    result: list = None  # The helpers function's return value
+    error: Exception = None  # Set instead of result when the cell failed
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the cell succeeded."""
+        return self.error is None
+
+
+def matrix_cells(accounts: list, regions: list, operations: tuple) -> list:
+    """
+    Lists the (account, region, operation) cells to run.
+
+    Args:
+        accounts (list): Account IDs.
+        regions (list): Region names.
+        operations (tuple): Keys of OPERATIONS.
+
+    Returns:
+        list: The cells; global operations appear once per account.
+
+    Raises:
+        ValueError: If an operation is unknown or no region is given.
+    """
+    unknown = set(operations) - set(OPERATIONS)
+    if unknown:
+        raise ValueError(f"Unsupported operations {sorted(unknown)}")
+    if not regions:
+        raise ValueError("At least one region is required")
+    cells = []
+    for account_id in accounts:
+        for operation in operations:
+            regional = OPERATIONS[operation][2]
+            for region in regions if regional else regions[:1]:
+                cells.append((account_id, region, operation))
+    return cells
+
+
+def run_matrix(
+    accounts: list,
+    regions: list,
+    operations: tuple = ("describe_instances", "list_buckets"),
+    role_name: str = DEFAULT_ROLE_NAME,
+    credentials: CredentialCache = None,
+    max_in_flight: int | None = None,
+):
+    """
+    Runs inventory operations across accounts and regions in parallel.
+
+    Args:
+        accounts (list): Account IDs to inventory.
+        regions (list): Regions to inventory in each account.
+        operations (tuple, optional): Keys of OPERATIONS. Defaults to both.
+        role_name (str, optional): Role assumed in each account.
+        credentials (CredentialCache, optional): Credential cache to reuse
+            across runs. Defaults to a new one.
+        max_in_flight (int, optional): Cells running at once. Defaults to the
+            executors default for the "accounts" pool.
+
+    Yields:
+        AccountResult: One per cell, in completion order. Failed cells carry
+        the exception instead of stopping the run.
+    """
+    credentials = credentials or CredentialCache()
+    cells = matrix_cells(accounts, list(regions), tuple(operations))
+
+    def run_cell(cell: tuple) -> list:
+        account_id, region, operation = cell
+        make_client, call, _ = OPERATIONS[operation]
+        session = credentials.session(account_id, role_name)
+        return call(make_client(region_name=region, session=session))
+
+    results = executors.map_unordered(
+        run_cell,
+        cells,
+        pool="accounts",
+        max_in_flight=max_in_flight,
+        return_exceptions=True,
+    )
+    for (account_id, region, operation), outcome in results:
+        if isinstance(outcome, Exception):
+            yield AccountResult(account_id, region, operation, error=outcome)
+        else:
+            yield AccountResult(account_id, region, operation, result=outcome)
+
+
+def to_columns(instances: list) -> dict:
+    """
+    Projects instance descriptions onto INSTANCE_COLUMNS.
+
+    Args:
+        instances (list): Instances from DescribeInstances.
+
+    Returns:
+        dict: Column name -> list of values, one per instance.
+    """
+    return {
+        name: [read(instance) for instance in instances]
+        for name, read in INSTANCE_COLUMNS.items()
+    }
+
+
+def encode_batch(columns: dict) -> bytes:
+    """
+    Serializes a columnar batch for transfer between processes.
+
+    Args:
+        columns (dict): Output of ``to_columns``.
+
+    Returns:
+        bytes: A one-byte format marker followed by the msgpack or JSON payload.
+    """
+    if msgpack is not None:
+        return b"m" + msgpack.packb(columns)
+    return b"j" + json.dumps(columns, separators=(",", ":")).encode()
+
+
+def decode_batch(payload: bytes) -> dict:
+    """
+    Reverses ``encode_batch``; works whichever encoder produced the payload.
+
+    Args:
+        payload (bytes): An encoded batch.
+
+    Returns:
+        dict: Column name -> list of values.
+
+    Raises:
+        ValueError: If the format marker is unknown.
+    """
+    marker, body = payload[:1], payload[1:]
+    if marker == b"m":
+        if msgpack is None:
+            raise ValueError("Batch was encoded with msgpack, which is not installed")
+        return msgpack.unpackb(body)
+    if marker == b"j":
+        return json.loads(body)
+    raise ValueError(f"Unknown batch format {marker!r}")
+
+
+@dataclass
+class InstanceBatch:
+    """The instances of one account x region cell, stored column-wise."""
+
+    account_id: str
+    region: str
+    columns: dict = None  # Column name -> values; None when the cell failed
+    error: str = None  # "ExceptionType: message" from the worker
+
+    @property
+    def ok(self) -> bool:
+        """bool: True if the cell succeeded."""
+        return self.error is None
+
+    def __len__(self) -> int:
+        return len(self.columns["InstanceId"]) if self.columns else 0
+
+    def rows(self):
+        """
+        Rebuilds one flat dict per instance.
+
+        Yields:
+            dict: Column name -> value for one instance.
+        """
+        names = list(self.columns or {})
+        for values in zip(*(self.columns[name] for name in names)):
+            yield dict(zip(names, values))
+
+
+# Per-process state of sweep workers, set up by _init_sweep_worker
+_worker: dict = {}
+
+
+def _init_sweep_worker(role_name: str) -> None:
+    """Gives a worker process its own credential and client caches."""
+    _worker.clear()
+    _worker.update(role_name=role_name, credentials=CredentialCache(), clients={})
+
+
+def _sweep_shard(cells: list) -> list:
+    """
+    Describes the instances of some (account, region) cells in a worker.
+
+    Args:
+        cells (list): (account_id, region) pairs.
+
+    Returns:
+        list: (account_id, region, payload bytes or None, error or None) per cell.
+    """
+    if not _worker:
+        _init_sweep_worker(DEFAULT_ROLE_NAME)  # Called outside a pool
+    results = []
+    for account_id, region in cells:
+        try:
+            client = _worker["clients"].get((account_id, region))
+            if client is None:
+                session = _worker["credentials"].session(
+                    account_id, _worker["role_name"]
+                )
+                client = helpers.get_ec2_client(region_name=region, session=session)
+                _worker["clients"][(account_id, region)] = client
+            instances = helpers.describe_instances(client)
+            results.append(
+                (account_id, region, encode_batch(to_columns(instances)), None)
+            )
+        except Exception as error:  # noqa: BLE001 - per cell; may not pickle
+            results.append(
+                (account_id, region, None, f"{type(error).__name__}: {error}")
+            )
+    return results
+
+
+def shard_cells(accounts: list, regions: list, shards: int) -> list:
+    """
+    Splits the account x region cells into shards, keeping accounts together.
+
+    All cells of one account go to the same shard, so a worker assumes each
+    role only once; accounts are spread evenly over the shards. There are
+    never more shards than accounts.
+
+    Args:
+        accounts (list): Account IDs.
+        regions (list): Region names.
+        shards (int): Desired number of shards.
+
+    Returns:
+        list: Lists of (account_id, region) pairs; never an empty shard.
+    """
+    if not accounts or not regions:
+        return []
+    count = min(max(1, shards), len(accounts))
+    size = -(-len(accounts) // count)  # Accounts per shard, ceiling division
+    return [
+        [
+            (account_id, region)
+            for account_id in accounts[start : start + size]
+            for region in regions
+        ]
+        for start in range(0, len(accounts), size)
+    ]
+
+
+def sweep_instances(
+    accounts: list,
+    regions: list,
+    processes: int | None = None,
+    role_name: str = DEFAULT_ROLE_NAME,
+    shards_per_process: int = 4,
+    executor=None,
+):
+    """
+    Describes instances in every account x region cell using worker processes.
+
+    Args:
+        accounts (list): Account IDs to sweep.
+        regions (list): Regions to sweep in each account.
+        processes (int, optional): Worker processes. Defaults to the CPU count.
+        role_name (str, optional): Role assumed in each account.
+        shards_per_process (int, optional): Shards per worker, for load
+            balancing between fast and slow accounts. Defaults to 4.
+        executor (concurrent.futures.Executor, optional): Executor to use
+            instead of a new ProcessPoolExecutor; it must run
+            ``_init_sweep_worker(role_name)`` in every worker.
+
+    Yields:
+        InstanceBatch: One per cell, in completion order.
+    """
+    processes = processes or os.cpu_count() or 1
+    shards = shard_cells(list(accounts), list(regions), processes * shards_per_process)
+    if not shards:
+        return
+    owned = executor is None
+    if owned:
+        executor = ProcessPoolExecutor(
+            max_workers=min(processes, len(shards)),
+            initializer=_init_sweep_worker,
+            initargs=(role_name,),
+        )
+    try:
+        futures = [executor.submit(_sweep_shard, shard) for shard in shards]
+        for future in as_completed(futures):
+            for account_id, region, payload, error in future.result():
+                columns = decode_batch(payload) if payload is not None else None
+                yield InstanceBatch(account_id, region, columns, error)
+    finally:
+        if owned:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+
+if __name__ == "__main__":
+    # Inventory two accounts in two regions and print a line per cell
+    for cell in run_matrix(
+        ["111111111111", "222222222222"], ["us-east-1", "us-west-2"]
+    ):
+        status = f"{len(cell.result)} items" if cell.ok else f"error: {cell.error}"
+        print(f"{cell.account_id} {cell.region} {cell.operation}: {status}")
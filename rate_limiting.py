@@ -0,0 +1,97 @@
+"""
+Client-side rate limiting for AWS API calls.
+
+EC2 throttles each account with a token bucket per API action. Fanning out
+many concurrent requests without a matching client-side limit just converts
+work into ``RequestLimitExceeded`` retries, so bulk operations take a token
+from ``shared_limiter`` before every call.
+"""
+
+import os
+import threading
+import time
+
+# Sustained calls per second and burst size of the shared limiter
+DEFAULT_RATE: float = float(os.environ.get("AWS_API_RATE_LIMIT", "20"))
+DEFAULT_BURST: int = int(os.environ.get("AWS_API_BURST_LIMIT", "40"))
+
+
+class TokenBucket:
+    """A thread-safe token bucket that blocks callers until a token is free."""
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        burst: int = DEFAULT_BURST,
+        clock=time.monotonic,
+        sleep=time.sleep,
+    ):
+        """
+        Creates a full bucket.
+
+        Args:
+            rate (float, optional): Tokens added per second. Defaults to DEFAULT_RATE.
+            burst (int, optional): Bucket capacity. Defaults to DEFAULT_BURST.
+            clock (callable, optional): Monotonic clock, replaceable in tests.
+            sleep (callable, optional): Sleep function, replaceable in tests.
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1")
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """Adds the tokens earned since the last update (lock held)."""
+        now = self.clock()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: int = 1) -> bool:
+        """
+        Takes tokens if they are available right now.
+
+        Args:
+            tokens (int, optional): Tokens to take. Defaults to 1.
+
+        Returns:
+            bool: True if the tokens were taken.
+        """
+        with self._lock:
+            self._refill()
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: int = 1) -> float:
+        """
+        Takes tokens, sleeping until enough have accumulated.
+
+        Args:
+            tokens (int, optional): Tokens to take. Defaults to 1.
+
+        Returns:
+            float: Seconds spent waiting.
+        """
+        if tokens > self.burst:
+            raise ValueError(
+                f"Cannot take {tokens} tokens from a bucket of {self.burst}"
+            )
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                delay = (tokens - self._tokens) / self.rate
+            self.sleep(delay)  # Sleep outside the lock so others can refill too
+            waited += delay
+
+
+shared_limiter = TokenBucket()  # Shared by every bulk operation in this process
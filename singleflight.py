@@ -0,0 +1,200 @@
+"""
+Request coalescing ("single-flight") for identical concurrent calls.
+
+While a call for a given key is in flight, later callers with the same key
+wait for its result instead of starting their own API round trip. Optionally
+the result is kept for a short TTL so a burst that arrives just after the call
+finished is served from memory too. Errors are shared with the waiting callers
+but never cached.
+
+``SingleFlight`` serves threads; ``AsyncSingleFlight`` does the same for
+coroutines on one event loop. There the shared call runs in its own task, so
+cancelling any one caller, the first included, leaves the others waiting; the
+task is cancelled only once every caller has gone.
+"""
+
+import asyncio
+import functools
+import threading
+import time
+
+import instrumentation
+
+# Expired cache entries are pruned once the cache grows beyond this size
+MAX_CACHE_ENTRIES: int = 1024
+
+
+def _record(name: str, outcome: str) -> None:
+    """Counts a leader call, a shared in-flight result or a cache hit."""
+    if instrumentation.is_enabled():
+        instrumentation.registry.increment(f"singleflight_{outcome}_total", name)
+
+
+class _Call:
+    """One in-flight call that followers wait on."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException = None
+
+
+class _AsyncCall:
+    """One in-flight coroutine call and the number of callers awaiting it."""
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls made from different threads."""
+
+    def __init__(self, ttl: float = 0.0, name: str = "default", clock=time.monotonic):
+        """
+        Creates a group.
+
+        Args:
+            ttl (float, optional): Seconds a result is reused after its call
+                finished; 0 only shares in-flight calls. Defaults to 0.
+            name (str, optional): Label for the instrumentation counters.
+            clock (callable, optional): Monotonic clock, replaceable in tests.
+        """
+        self.ttl = ttl
+        self.name = name
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._calls: dict = {}  # key -> _Call in flight
+        self._cache: dict = {}  # key -> (result, expires_at)
+
+    def _cached(self, key):
+        """Returns (hit, value) for a fresh cache entry (lock held)."""
+        entry = self._cache.get(key)
+        if entry is not None and entry[1] > self.clock():
+            return True, entry[0]
+        return False, None
+
+    def _store(self, key, result) -> None:
+        """Caches a result for the TTL, pruning expired entries (lock held)."""
+        now = self.clock()
+        if len(self._cache) >= MAX_CACHE_ENTRIES:
+            for stale in [
+                k for k, (_, expires) in self._cache.items() if expires <= now
+            ]:
+                del self._cache[stale]
+        self._cache[key] = (result, now + self.ttl)
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        Runs ``func(*args, **kwargs)`` unless an identical call is in flight.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): The call to make.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The result of the single underlying call.
+
+        Raises:
+            Exception: Whatever the underlying call raised.
+        """
+        with self._lock:
+            hit, value = self._cached(key)
+            if hit:
+                _record(self.name, "cache_hits")
+                return value
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+
+        if not leader:
+            _record(self.name, "shared")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        _record(self.name, "calls")
+        try:
+            call.result = func(*args, **kwargs)
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+                if call.error is None and self.ttl > 0:
+                    self._store(key, call.result)
+            call.done.set()  # Release the followers
+        return call.result
+
+    def forget(self, key=None) -> None:
+        """
+        Drops cached results so the next call goes upstream.
+
+        Args:
+            key (hashable, optional): The key to drop; all keys when omitted.
+        """
+        with self._lock:
+            if key is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(key, None)
+
+
+class AsyncSingleFlight(SingleFlight):
+    """Coalesces identical concurrent coroutine calls on one event loop."""
+
+    async def do(self, key, func, *args, **kwargs):
+        """
+        Awaits ``func(*args, **kwargs)`` unless an identical call is in flight.
+
+        Args:
+            key (hashable): Identifies identical calls.
+            func (callable): A coroutine function.
+            *args: Positional arguments for ``func``.
+            **kwargs: Keyword arguments for ``func``.
+
+        Returns:
+            The result of the single underlying call.
+
+        Raises:
+            Exception: Whatever the underlying call raised.
+        """
+        hit, value = self._cached(key)  # Single-threaded loop: no lock needed
+        if hit:
+            _record(self.name, "cache_hits")
+            return value
+        call = self._calls.get(key)
+        if call is None:
+            _record(self.name, "calls")
+            task = asyncio.ensure_future(self._run(key, func, *args, **kwargs))
+            call = self._calls[key] = _AsyncCall(task)
+            task.add_done_callback(functools.partial(self._finish, key, call))
+        else:
+            _record(self.name, "shared")
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)  # Cancels this caller only
+        finally:
+            call.waiters -= 1
+            if not call.waiters and not call.task.done():
+                call.task.cancel()  # Nobody is left to use the result
+
+    async def _run(self, key, func, *args, **kwargs):
+        """Makes the shared call, caching its result when a TTL is set."""
+        result = await func(*args, **kwargs)
+        if self.ttl > 0:
+            self._store(key, result)
+        return result
+
+    def _finish(self, key, call: _AsyncCall, task: asyncio.Task) -> None:
+        """Done callback: lets the next caller start a fresh call."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved when every caller had left
@@ -0,0 +1,232 @@
+"""
+Change-feed diffing between inventory snapshots.
+
+A snapshot maps each record's ID to a digest of its canonical JSON form (and,
+optionally, the record itself). Diffing a new listing against a snapshot is a
+single pass: every new record costs one dictionary lookup and, only when the
+digests differ, a field-level comparison. The diff is a generator, so a new
+listing streamed from ``helpers.iter_instances`` is never held in memory.
+
+Typical periodic sync::
+
+    snapshot = Snapshot.build(helpers.iter_instances(ec2))
+    ...
+    for event in diff(snapshot, helpers.iter_instances(ec2)):
+        handle(event)
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass, field
+
+# Record keys for the repo's two listings
+INSTANCE_KEY: str = "InstanceId"  # helpers.describe_instances / iter_instances
+BUCKET_KEY = None  # helpers.list_buckets returns plain names
+
+
+def normalize_record(record, ignore_fields: tuple = ()):
+    """
+    Returns a copy of a record that compares equal whenever it means the same.
+
+    AWS returns tags as an unordered list of Key/Value pairs; they become a
+    dict so reordering does not count as a change.
+
+    Args:
+        record: A record (dict) or a scalar such as a bucket name.
+        ignore_fields (tuple, optional): Top-level fields to leave out.
+
+    Returns:
+        The normalized record.
+    """
+    if not isinstance(record, dict):
+        return record
+    normalized = {k: v for k, v in record.items() if k not in ignore_fields}
+    tags = normalized.get("Tags")
+    if isinstance(tags, list):
+        normalized["Tags"] = {tag["Key"]: tag["Value"] for tag in tags}
+    return normalized
+
+
+def record_digest(record) -> str:
+    """
+    Hashes a normalized record's canonical JSON.
+
+    Args:
+        record: A normalized record.
+
+    Returns:
+        str: A 32-character hex digest.
+    """
+    canonical = json.dumps(record, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def record_id(record, key):
+    """
+    Extracts a record's ID.
+
+    Args:
+        record: The record.
+        key (str, callable or None): Field name, a function of the record, or
+            None when the record is its own ID (bucket names).
+
+    Returns:
+        The ID.
+    """
+    if key is None:
+        return record
+    if callable(key):
+        return key(record)
+    return record[key]
+
+
+def field_deltas(old, new, prefix: str = "") -> dict:
+    """
+    Lists the fields that differ between two normalized records.
+
+    Nested dicts are compared field by field; anything else is compared whole.
+
+    Args:
+        old: The previous record.
+        new: The current record.
+        prefix (str, optional): Dotted path of the records being compared.
+
+    Returns:
+        dict: Dotted field path -> (old value, new value). Missing values are None.
+    """
+    if not (isinstance(old, dict) and isinstance(new, dict)):
+        return {} if old == new else {prefix or "value": (old, new)}
+    deltas = {}
+    for name in old.keys() | new.keys():
+        path = f"{prefix}.{name}" if prefix else str(name)
+        old_value, new_value = old.get(name), new.get(name)
+        if old_value == new_value:
+            continue
+        if isinstance(old_value, dict) and isinstance(new_value, dict):
+            deltas.update(field_deltas(old_value, new_value, path))
+        else:
+            deltas[path] = (old_value, new_value)
+    return dict(sorted(deltas.items()))
+
+
+@dataclass
+class ChangeEvent:
+    """One entry of the change feed."""
+
+    kind: str  # "added", "removed" or "changed"
+    record_id: object
+    old: object = None  # Normalized previous record, if the snapshot kept it
+    new: object = None  # Normalized current record
+    changes: dict = field(default_factory=dict)  # path -> (old, new) for "changed"
+
+
+class Snapshot:
+    """Digests (and optionally records) of one listing, keyed by record ID."""
+
+    def __init__(self, key=INSTANCE_KEY, ignore_fields: tuple = ()):
+        """
+        Creates an empty snapshot.
+
+        Args:
+            key (str, callable or None, optional): How to read a record's ID.
+                Defaults to INSTANCE_KEY.
+            ignore_fields (tuple, optional): Top-level fields excluded from
+                hashing and diffing.
+        """
+        self.key = key
+        self.ignore_fields = tuple(ignore_fields)
+        self.digests: dict = {}  # record ID -> digest
+        self.records: dict = {}  # record ID -> normalized record (if kept)
+
+    @classmethod
+    def build(
+        cls, records, key=INSTANCE_KEY, ignore_fields: tuple = (), keep_records=True
+    ) -> "Snapshot":
+        """
+        Builds a snapshot from any iterable of records.
+
+        Args:
+            records (iterable): The listing.
+            key (str, callable or None, optional): See ``__init__``.
+            ignore_fields (tuple, optional): See ``__init__``.
+            keep_records (bool, optional): Keep the records for field-level
+                deltas; digests alone are enough to detect changes.
+                Defaults to True.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        snapshot = cls(key, ignore_fields)
+        for record in records:
+            snapshot.add(record, keep_records)
+        return snapshot
+
+    def add(self, record, keep_record: bool = True) -> tuple:
+        """
+        Adds one record.
+
+        Returns:
+            tuple: (record ID, normalized record, digest).
+        """
+        normalized = normalize_record(record, self.ignore_fields)
+        rid = record_id(record, self.key)
+        digest = record_digest(normalized)
+        self.digests[rid] = digest
+        if keep_record:
+            self.records[rid] = normalized
+        return rid, normalized, digest
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+
+def diff(old, new, key=INSTANCE_KEY, ignore_fields: tuple = ()):
+    """
+    Streams added/changed/removed events between two listings in O(n).
+
+    Args:
+        old (Snapshot or iterable): The previous state. An iterable is indexed
+            into a snapshot in one pass.
+        new (iterable): The current listing; consumed lazily.
+        key (str, callable or None, optional): Record ID reader, used when
+            ``old`` is not already a Snapshot. Defaults to INSTANCE_KEY.
+        ignore_fields (tuple, optional): Fields excluded from comparison, used
+            when ``old`` is not already a Snapshot.
+
+    Yields:
+        ChangeEvent: "added" and "changed" events in the order of ``new``,
+        then "removed" events for records ``new`` no longer contains.
+    """
+    if not isinstance(old, Snapshot):
+        old = Snapshot.build(old, key, ignore_fields)
+    current = Snapshot(old.key, old.ignore_fields)
+    for record in new:
+        rid, normalized, digest = current.add(record, keep_record=False)
+        previous_digest = old.digests.get(rid)
+        if previous_digest is None:
+            yield ChangeEvent("added", rid, new=normalized)
+        elif previous_digest != digest:
+            previous = old.records.get(rid)
+            changes = field_deltas(previous, normalized) if previous is not None else {}
+            yield ChangeEvent(
+                "changed", rid, old=previous, new=normalized, changes=changes
+            )
+    for rid in old.digests:
+        if rid not in current.digests:
+            yield ChangeEvent("removed", rid, old=old.records.get(rid))
+
+
+def summarize(events) -> dict:
+    """
+    Counts events by kind.
+
+    Args:
+        events (iterable): ChangeEvents.
+
+    Returns:
+        dict: Kind -> count, always with "added", "changed" and "removed".
+    """
+    counts = {"added": 0, "changed": 0, "removed": 0}
+    for event in events:
+        counts[event.kind] += 1
+    return counts
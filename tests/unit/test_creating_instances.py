@@ -14,6 +14,19 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
 import creating_instances
+import helpers
+
+
+def launch_call(client, ami, client_token=None):
+    """Build the create_instance call expected for a default-profile launch."""
+    return call(
+        client,
+        client_token=client_token,
+        ami=ami,
+        instance_type=helpers.DEFAULT_INSTANCE_TYPE,
+        key_name=helpers.DEFAULT_KEY_NAME,
+        security_group_ids=helpers.DEFAULT_SECURITY_GROUP_IDS,
+    )
 
 
 class TestCreatingInstances(unittest.TestCase):
@@ -24,108 +37,202 @@ class TestCreatingInstances(unittest.TestCase):
         self.mock_ec2_client = Mock()
 
     @patch("builtins.print")
-    @patch("creating_instances.create_ubuntu_instance")
-    def test_create_instances_ubuntu_single(self, mock_create_ubuntu, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_ubuntu_single(self, mock_create, mock_print):
         """Test creating a single Ubuntu instance."""
         creating_instances.create_instances(self.mock_ec2_client, "Ubuntu", 1)
 
-        mock_create_ubuntu.assert_called_once_with(self.mock_ec2_client)
+        self.assertEqual(
+            mock_create.call_args_list,
+            [launch_call(self.mock_ec2_client, helpers.UBUNTU_AMI_ID)],
+        )
         mock_print.assert_called_with("Ubuntu Created")
 
     @patch("builtins.print")
-    @patch("creating_instances.create_ubuntu_instance")
-    def test_create_instances_ubuntu_multiple(self, mock_create_ubuntu, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_ubuntu_multiple(self, mock_create, mock_print):
         """Test creating multiple Ubuntu instances."""
         creating_instances.create_instances(self.mock_ec2_client, "Ubuntu", 3)
 
-        self.assertEqual(mock_create_ubuntu.call_count, 3)
-        expected_calls = [call(self.mock_ec2_client)] * 3
-        mock_create_ubuntu.assert_has_calls(expected_calls)
+        self.assertEqual(mock_create.call_count, 3)
+        expected_calls = [launch_call(self.mock_ec2_client, helpers.UBUNTU_AMI_ID)] * 3
+        mock_create.assert_has_calls(expected_calls)
 
         # Check that "Ubuntu Created" was printed 3 times
         ubuntu_calls = [call("Ubuntu Created")] * 3
         mock_print.assert_has_calls(ubuntu_calls)
 
     @patch("builtins.print")
-    @patch("creating_instances.create_amazon_linux_2023_instance")
-    def test_create_instances_linux2023(self, mock_create_linux2023, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_linux2023(self, mock_create, mock_print):
         """Test creating Linux 2023 instances."""
         creating_instances.create_instances(self.mock_ec2_client, "Linux2023", 2)
 
-        self.assertEqual(mock_create_linux2023.call_count, 2)
-        expected_calls = [call(self.mock_ec2_client)] * 2
-        mock_create_linux2023.assert_has_calls(expected_calls)
+        self.assertEqual(mock_create.call_count, 2)
+        expected_calls = [
+            launch_call(self.mock_ec2_client, helpers.AMAZON_LINUX_2023_AMI_ID)
+        ] * 2
+        mock_create.assert_has_calls(expected_calls)
 
         linux_calls = [call("Linux 2023 Created")] * 2
         mock_print.assert_has_calls(linux_calls)
 
     @patch("builtins.print")
-    @patch("creating_instances.create_amazon_linux_2_instance")
-    def test_create_instances_linux2(self, mock_create_linux2, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_linux2(self, mock_create, mock_print):
         """Test creating Linux 2 instances."""
         creating_instances.create_instances(self.mock_ec2_client, "Linux2", 1)
 
-        mock_create_linux2.assert_called_once_with(self.mock_ec2_client)
+        self.assertEqual(
+            mock_create.call_args_list,
+            [launch_call(self.mock_ec2_client, helpers.AMAZON_LINUX_2_AMI_ID)],
+        )
         mock_print.assert_called_with("Linux 2 Created")
 
     @patch("builtins.print")
-    def test_create_instances_unsupported_ami(self, mock_print):
-        """Test handling unsupported AMI types."""
-        creating_instances.create_instances(self.mock_ec2_client, "Windows", 1)
+    @patch("creating_instances.create_instance")
+    def test_create_instances_returns_ids_with_tokens(self, mock_create, _):
+        """Test that launched IDs are returned and tokens derive from the request ID."""
+        tokens = [creating_instances.launch_client_token("req-1", i) for i in range(2)]
+        # Launches run concurrently, so answer by token rather than by call order
+        mock_create.side_effect = lambda client, client_token, **_: [
+            f"i-{tokens.index(client_token) + 1}"
+        ]
+
+        result = creating_instances.create_instances(
+            self.mock_ec2_client, "Ubuntu", 2, launch_request_id="req-1"
+        )
+
+        self.assertEqual(result, ["i-1", "i-2"])
+        expected_calls = [
+            launch_call(
+                self.mock_ec2_client,
+                helpers.UBUNTU_AMI_ID,
+                creating_instances.launch_client_token("req-1", i),
+            )
+            for i in range(2)
+        ]
+        mock_create.assert_has_calls(expected_calls, any_order=True)
+
+    @patch("builtins.print")
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    @patch("creating_instances.default_resolver")
+    def test_create_instances_in_region(self, mock_resolver, mock_create, _):
+        """Test that a regional launch resolves the AMI once for all instances."""
+        params = {
+            "ami": "ami-regional",
+            "instance_type": "t2.micro",
+            "key_name": "private-ec2",
+            "security_group_ids": ("sg-1",),
+        }
+        mock_resolver.launch_params.return_value = params
+
+        result = creating_instances.create_instances(
+            self.mock_ec2_client, "Linux 2023", 3, region="eu-west-1"
+        )
+
+        mock_resolver.launch_params.assert_called_once_with("linux2023", "eu-west-1")
+        self.assertEqual(mock_create.call_count, 3)
+        mock_create.assert_called_with(
+            self.mock_ec2_client, client_token=None, **params
+        )
+        self.assertEqual(result, ["i-0"] * 3)
+
+    @patch("builtins.print")
+    @patch("creating_instances.create_instance")
+    def test_create_instances_unsupported_ami(self, mock_create, mock_print):
+        """Test that unsupported AMI types fail fast before any launch."""
+        with self.assertRaises(ValueError) as context:
+            creating_instances.create_instances(self.mock_ec2_client, "Windows", 5)
 
-        mock_print.assert_called_with("Unsupported AMI")
+        self.assertIn("Unsupported AMI", str(context.exception))
+        mock_create.assert_not_called()
+        mock_print.assert_not_called()
 
     @patch("builtins.print")
-    @patch("creating_instances.create_ubuntu_instance")
-    def test_create_instances_case_insensitive(self, mock_create_ubuntu, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_aliases(self, mock_create, mock_print):
+        """Test that registered aliases resolve to the same profile."""
+        for ami_type in ("al2023", "Amazon Linux 2023", "linux-2023"):
+            with self.subTest(ami_type=ami_type):
+                mock_create.reset_mock()
+
+                creating_instances.create_instances(self.mock_ec2_client, ami_type, 1)
+
+                self.assertEqual(
+                    mock_create.call_args,
+                    launch_call(self.mock_ec2_client, helpers.AMAZON_LINUX_2023_AMI_ID),
+                )
+
+    @patch("builtins.print")
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_case_insensitive(self, mock_create, mock_print):
         """Test that AMI type matching is case insensitive."""
         creating_instances.create_instances(self.mock_ec2_client, "ubuNtu", 1)
 
-        mock_create_ubuntu.assert_called_once_with(self.mock_ec2_client)
+        self.assertEqual(
+            mock_create.call_args_list,
+            [launch_call(self.mock_ec2_client, helpers.UBUNTU_AMI_ID)],
+        )
         mock_print.assert_called_with("Ubuntu Created")
 
     @patch("builtins.print")
-    @patch("creating_instances.create_amazon_linux_2_instance")
-    def test_create_instances_whitespace_handling(self, mock_create_linux2, mock_print):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_whitespace_handling(self, mock_create, mock_print):
         """Test that whitespace in AMI type is handled correctly."""
         creating_instances.create_instances(self.mock_ec2_client, "  Linux 2", 1)
 
-        mock_create_linux2.assert_called_once_with(self.mock_ec2_client)
+        self.assertEqual(
+            mock_create.call_args_list,
+            [launch_call(self.mock_ec2_client, helpers.AMAZON_LINUX_2_AMI_ID)],
+        )
         mock_print.assert_called_with("Linux 2 Created")
 
     @patch("builtins.print")
-    @patch("creating_instances.create_amazon_linux_2023_instance")
-    def test_create_instances_linux2023_variations(
-        self, mock_create_linux2023, mock_print
-    ):
+    @patch("creating_instances.create_instance", return_value=["i-0"])
+    def test_create_instances_linux2023_variations(self, mock_create, mock_print):
         """Test different variations of Linux 2023 AMI type."""
         test_cases = ["Linux2023", "linux2023", "LINUX2023"]
 
         for ami_type in test_cases:
             with self.subTest(ami_type=ami_type):
-                mock_create_linux2023.reset_mock()
+                mock_create.reset_mock()
                 mock_print.reset_mock()
 
                 creating_instances.create_instances(self.mock_ec2_client, ami_type, 1)
 
-                mock_create_linux2023.assert_called_once_with(self.mock_ec2_client)
+                self.assertEqual(
+                    mock_create.call_args_list,
+                    [
+                        launch_call(
+                            self.mock_ec2_client, helpers.AMAZON_LINUX_2023_AMI_ID
+                        )
+                    ],
+                )
                 mock_print.assert_called_with("Linux 2023 Created")
 
     def test_create_instances_default_parameters(self):
         """Test create_instances with default parameters."""
-        with patch("creating_instances.create_ubuntu_instance") as mock_create_ubuntu:
+        with patch(
+            "creating_instances.create_instance", return_value=["i-0"]
+        ) as mock_create:
             with patch("builtins.print"):
                 creating_instances.create_instances(self.mock_ec2_client)
 
-                mock_create_ubuntu.assert_called_once_with(self.mock_ec2_client)
+                self.assertEqual(
+                    mock_create.call_args_list,
+                    [launch_call(self.mock_ec2_client, helpers.UBUNTU_AMI_ID)],
+                )
 
     def test_create_instances_zero_amount(self):
         """Test create_instances with zero amount."""
-        with patch("creating_instances.create_ubuntu_instance") as mock_create_ubuntu:
+        with patch(
+            "creating_instances.create_instance", return_value=["i-0"]
+        ) as mock_create:
             with patch("builtins.print") as mock_print:
                 creating_instances.create_instances(self.mock_ec2_client, "Ubuntu", 0)
 
-                mock_create_ubuntu.assert_not_called()
+                mock_create.assert_not_called()
                 mock_print.assert_not_called()
 
     @patch("creating_instances.get_ec2_client")
@@ -196,7 +303,7 @@ class TestCreatingInstances(unittest.TestCase):
         for input_ami, expected_normalized in test_cases:
             with self.subTest(input_ami=input_ami):
                 # Test the normalization logic
-                normalized = input_ami.lower().strip().replace(" ", "")
+                normalized = creating_instances.resolve_ami_type(input_ami).name
                 self.assertEqual(normalized, expected_normalized)
 
 
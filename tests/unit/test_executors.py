@@ -0,0 +1,131 @@
+"""
+Unit tests for executors.py module.
+
+This module contains tests for the shared worker pools and map_unordered.
+"""
+
+import os
+import sys
+import threading
+import time
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import executors
+import instrumentation
+
+
+class TestExecutors(unittest.TestCase):
+    """Test cases for executors.py."""
+
+    def setUp(self):
+        """Start every test with fresh pools and a clean registry."""
+        executors.shutdown()
+        self.addCleanup(executors.shutdown)
+        instrumentation.registry.reset()
+        self.addCleanup(instrumentation.disable)
+        self.addCleanup(instrumentation.registry.reset)
+
+    def test_pools_are_shared_and_sized(self):
+        """Test that a name always maps to the same bounded pool."""
+        self.assertIs(executors.get_pool("ec2"), executors.get_pool("ec2"))
+        self.assertIsNot(executors.get_pool("ec2"), executors.get_pool("s3"))
+        self.assertEqual(executors.pool_size("ec2"), executors.POOL_SIZES["ec2"])
+        self.assertEqual(
+            executors.pool_size("unknown"), executors.POOL_SIZES["default"]
+        )
+
+    def test_map_unordered_returns_every_item(self):
+        """Test that every item is processed exactly once."""
+        result = dict(executors.map_unordered(lambda x: x * x, range(50)))
+
+        self.assertEqual(result, {x: x * x for x in range(50)})
+
+    def test_in_flight_is_bounded(self):
+        """Test that the input iterator is consumed lazily."""
+        pulled = []
+
+        def items():
+            for i in range(100):
+                pulled.append(i)
+                yield i
+
+        results = executors.map_unordered(
+            lambda x: x, items(), pool="default", max_in_flight=3
+        )
+        next(results)
+
+        self.assertLessEqual(len(pulled), 4)
+        results.close()
+
+    def test_exception_propagates(self):
+        """Test that the first task error is raised."""
+
+        def task(x):
+            if x == 3:
+                raise RuntimeError("boom")
+            return x
+
+        with self.assertRaises(RuntimeError):
+            list(executors.map_unordered(task, range(10)))
+
+    def test_return_exceptions(self):
+        """Test that errors can be yielded as results instead."""
+
+        def task(x):
+            if x == 3:
+                raise RuntimeError("boom")
+            return x
+
+        result = dict(executors.map_unordered(task, range(5), return_exceptions=True))
+
+        self.assertIsInstance(result[3], RuntimeError)
+        self.assertEqual(result[4], 4)
+
+    def test_cancel_event_stops_submission(self):
+        """Test graceful cancellation: running tasks finish, the rest never start."""
+        cancel = threading.Event()
+        started = []
+
+        def task(x):
+            started.append(x)
+            time.sleep(0.01)
+            return x
+
+        results = []
+        for item, _ in executors.map_unordered(
+            task, range(1000), pool="default", max_in_flight=4, cancel_event=cancel
+        ):
+            results.append(item)
+            cancel.set()
+
+        self.assertLess(len(started), 1000)
+        self.assertEqual(sorted(results), sorted(set(results)))
+
+    def test_nested_fan_out_runs_inline(self):
+        """Test that a task fanning out to its own pool cannot deadlock."""
+        os.environ["EXECUTOR_TINY_WORKERS"] = "1"
+        self.addCleanup(os.environ.pop, "EXECUTOR_TINY_WORKERS")
+
+        def outer(x):
+            return sum(r for _, r in executors.map_unordered(abs, [-x, x], pool="tiny"))
+
+        result = dict(executors.map_unordered(outer, [1, 2], pool="tiny"))
+
+        self.assertEqual(result, {1: 2, 2: 4})
+
+    def test_task_timing_is_recorded(self):
+        """Test that queue and run time are recorded while instrumented."""
+        instrumentation.enable()
+
+        executors.submit("s3", time.sleep, 0).result()
+
+        histograms = instrumentation.snapshot()["histograms"]
+        self.assertEqual(histograms["executor_task_seconds"]["s3"]["count"], 1)
+        self.assertEqual(histograms["executor_queue_seconds"]["s3"]["count"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
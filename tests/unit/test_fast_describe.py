@@ -0,0 +1,147 @@
+"""
+Unit tests for fast_describe.py module.
+
+This module checks that the raw-XML fast path returns exactly what botocore
+would for the requested fields, using moto so no real AWS API calls are made.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+import boto3
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import fast_describe
+import helpers
+
+FIELDS = ("InstanceId", "State", "InstanceType", "Tags", "LaunchTime", "Placement")
+
+PAGED_BODY = b"""<?xml version="1.0" encoding="UTF-8"?>
+<DescribeInstancesResponse xmlns="http://ec2.amazonaws.com/doc/2016-11-15/">
+  <requestId>req-1</requestId>
+  <reservationSet>
+    <item>
+      <reservationId>r-1</reservationId>
+      <ownerId>123456789012</ownerId>
+      <groupSet><item><groupId>sg-1</groupId><groupName>web</groupName></item></groupSet>
+      <instancesSet>
+        <item>
+          <instanceId>i-1</instanceId>
+          <instanceState><code>80</code><name>stopped</name></instanceState>
+          <blockDeviceMapping><item><deviceName>/dev/xvda</deviceName></item></blockDeviceMapping>
+          <tagSet><item><key>Team</key><value>red</value></item></tagSet>
+        </item>
+      </instancesSet>
+    </item>
+  </reservationSet>
+  <nextToken>token-2</nextToken>
+</DescribeInstancesResponse>"""
+
+
+@patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+class TestFastDescribe(unittest.TestCase):
+    """Test cases for the fast DescribeInstances path."""
+
+    def output_shape(self):
+        """Return the DescribeInstances output shape of the EC2 model."""
+        client = boto3.client("ec2", region_name="us-east-1")
+        return client.meta.service_model.operation_model(
+            "DescribeInstances"
+        ).output_shape
+
+    @mock_aws
+    def test_matches_normal_path(self):
+        """Test that kept fields are identical to botocore's parse."""
+        ec2 = boto3.client("ec2")
+        ec2.run_instances(
+            ImageId="ami-12c6146b",
+            MinCount=4,
+            MaxCount=4,
+            TagSpecifications=[
+                {"ResourceType": "instance", "Tags": [{"Key": "Team", "Value": "red"}]}
+            ],
+        )
+        ec2.run_instances(ImageId="ami-12c6146b", MinCount=1, MaxCount=1)
+
+        normal = list(helpers.iter_instances(ec2))
+        fast = list(helpers.iter_instances(ec2, fields=FIELDS))
+
+        self.assertEqual(len(fast), 5)
+        expected = [{k: i[k] for k in FIELDS if k in i} for i in normal]
+        self.assertEqual(fast, expected)
+
+    @mock_aws
+    def test_describe_instances_fields(self):
+        """Test that describe_instances passes fields through and keeps InstanceId."""
+        ec2 = boto3.client("ec2")
+        ec2.run_instances(ImageId="ami-12c6146b", MinCount=2, MaxCount=2)
+
+        instances = helpers.describe_instances(ec2, fields=("State",))
+
+        self.assertEqual(len(instances), 2)
+        self.assertEqual(set(instances[0]), {"InstanceId", "State"})
+
+    @mock_aws
+    def test_hook_is_inactive_outside_fast_requests(self):
+        """Test that a client with the hook still parses normal calls fully."""
+        ec2 = boto3.client("ec2")
+        ec2.run_instances(ImageId="ami-12c6146b", MinCount=1, MaxCount=1)
+        list(helpers.iter_instances(ec2, fields=("State",)))
+
+        instance = ec2.describe_instances()["Reservations"][0]["Instances"][0]
+
+        self.assertIn("ImageId", instance)
+
+    @mock_aws
+    def test_errors_take_the_normal_path(self):
+        """Test that error responses still raise ClientError."""
+        ec2 = boto3.client("ec2")
+
+        with self.assertRaises(ClientError):
+            list(helpers.iter_instances(ec2, instance_ids=["i-0"], fields=FIELDS))
+
+    def test_parse_paged_body(self):
+        """Test next token, request ID and nested lists in a raw body.
+
+        The reservation-level groupSet <item> sits at the same depth as an
+        instance <item> and must not be taken for one.
+        """
+        members = fast_describe.instance_members(
+            self.output_shape(), ("InstanceId", "State", "Tags")
+        )
+
+        reservations, next_token, request_id = fast_describe.parse_instances(
+            PAGED_BODY, members
+        )
+
+        self.assertEqual(next_token, "token-2")
+        self.assertEqual(request_id, "req-1")
+        self.assertEqual(
+            reservations,
+            [
+                {
+                    "Instances": [
+                        {
+                            "InstanceId": "i-1",
+                            "State": {"Code": 80, "Name": "stopped"},
+                            "Tags": [{"Key": "Team", "Value": "red"}],
+                        }
+                    ]
+                }
+            ],
+        )
+
+    def test_unknown_field(self):
+        """Test that fields outside the Instance shape are rejected."""
+        with self.assertRaises(ValueError):
+            fast_describe.instance_members(self.output_shape(), ("Colour",))
+
+
+if __name__ == "__main__":
+    unittest.main()
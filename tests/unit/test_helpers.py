@@ -13,7 +13,11 @@ import os
 # Add the project root to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
 import helpers
+import rate_limiting
 
 
 class TestHelpers(unittest.TestCase):
@@ -27,7 +31,9 @@ class TestHelpers(unittest.TestCase):
 
         result = helpers.get_ec2_client()
 
-        mock_boto3.client.assert_called_once_with("ec2")
+        mock_boto3.client.assert_called_once_with(
+            "ec2", region_name=None, config=unittest.mock.ANY
+        )
         self.assertEqual(result, mock_client)
 
     @patch("helpers.boto3")
@@ -38,9 +44,41 @@ class TestHelpers(unittest.TestCase):
 
         result = helpers.get_s3_client()
 
-        mock_boto3.client.assert_called_once_with("s3")
+        mock_boto3.client.assert_called_once_with(
+            "s3", region_name=None, config=unittest.mock.ANY
+        )
         self.assertEqual(result, mock_client)
 
+    @patch("helpers.boto3")
+    def test_get_ssm_client(self, mock_boto3):
+        """Test regional SSM client creation."""
+        mock_client = Mock()
+        mock_boto3.client.return_value = mock_client
+
+        result = helpers.get_ssm_client("eu-west-1")
+
+        mock_boto3.client.assert_called_once_with(
+            "ssm", region_name="eu-west-1", config=unittest.mock.ANY
+        )
+        self.assertEqual(result, mock_client)
+
+    def test_client_config_defaults(self):
+        """Test keep-alive, timeouts and the default pool size."""
+        config = helpers.client_config()
+
+        self.assertEqual(config.max_pool_connections, 10)
+        self.assertTrue(config.tcp_keepalive)
+        self.assertEqual(config.connect_timeout, helpers.CONNECT_TIMEOUT_SECONDS)
+        self.assertEqual(config.read_timeout, helpers.READ_TIMEOUT_SECONDS)
+
+    @patch("helpers.boto3")
+    def test_concurrency_hint_sizes_pool(self, mock_boto3):
+        """Test that the concurrency hint sizes the connection pool."""
+        helpers.get_ec2_client(concurrency=64)
+
+        config = mock_boto3.client.call_args.kwargs["config"]
+        self.assertEqual(config.max_pool_connections, 64)
+
     def test_describe_instances(self):
         """Test describe_instances function."""
         # Mock EC2 client
@@ -99,40 +137,52 @@ class TestHelpers(unittest.TestCase):
         """Test Ubuntu instance creation."""
         mock_client = Mock()
 
-        helpers.create_ubuntu_instance(mock_client)
+        mock_create_instance.return_value = ["i-0"]
+
+        result = helpers.create_ubuntu_instance(mock_client)
 
         mock_create_instance.assert_called_once_with(
-            mock_client, "ami-04b70fa74e45c3917"
+            mock_client, "ami-04b70fa74e45c3917", client_token=None
         )
+        self.assertEqual(result, ["i-0"])
 
     @patch("helpers.create_instance")
     def test_create_amazon_linux_2023_instance(self, mock_create_instance):
         """Test Amazon Linux 2023 instance creation."""
         mock_client = Mock()
 
-        helpers.create_amazon_linux_2023_instance(mock_client)
+        mock_create_instance.return_value = ["i-0"]
+
+        result = helpers.create_amazon_linux_2023_instance(mock_client)
 
         mock_create_instance.assert_called_once_with(
-            mock_client, "ami-08a0d1e16fc3f61ea"
+            mock_client, "ami-08a0d1e16fc3f61ea", client_token=None
         )
+        self.assertEqual(result, ["i-0"])
 
     @patch("helpers.create_instance")
     def test_create_amazon_linux_2_instance(self, mock_create_instance):
         """Test Amazon Linux 2 instance creation."""
         mock_client = Mock()
 
-        helpers.create_amazon_linux_2_instance(mock_client)
+        mock_create_instance.return_value = ["i-0"]
+
+        result = helpers.create_amazon_linux_2_instance(mock_client)
 
         mock_create_instance.assert_called_once_with(
-            mock_client, "ami-0eaf7c3456e7b5b68"
+            mock_client, "ami-0eaf7c3456e7b5b68", client_token=None
         )
+        self.assertEqual(result, ["i-0"])
 
     def test_create_instance(self):
         """Test generic instance creation."""
         mock_client = Mock()
         test_ami = "ami-12345678"
+        mock_client.run_instances.return_value = {
+            "Instances": [{"InstanceId": "i-1234567890abcdef0"}]
+        }
 
-        helpers.create_instance(mock_client, test_ami)
+        result = helpers.create_instance(mock_client, test_ami)
 
         mock_client.run_instances.assert_called_once_with(
             MaxCount=1,
@@ -142,6 +192,27 @@ class TestHelpers(unittest.TestCase):
             KeyName="private-ec2",
             SecurityGroupIds=["sg-0197b8159a5d886f8"],
         )
+        self.assertEqual(result, ["i-1234567890abcdef0"])
+
+    def test_create_instance_with_client_token(self):
+        """Test that a client token is forwarded as the RunInstances ClientToken."""
+        mock_client = Mock()
+        mock_client.run_instances.return_value = {"Instances": []}
+
+        helpers.create_instance(mock_client, "ami-12345678", client_token="token-1")
+
+        self.assertEqual(
+            mock_client.run_instances.call_args.kwargs["ClientToken"], "token-1"
+        )
+
+    def test_launch_client_token(self):
+        """Test that tokens are deterministic, distinct per slot and within limits."""
+        first = helpers.launch_client_token("launch-42", 0)
+
+        self.assertEqual(first, helpers.launch_client_token("launch-42", 0))
+        self.assertNotEqual(first, helpers.launch_client_token("launch-42", 1))
+        self.assertNotEqual(first, helpers.launch_client_token("launch-43", 0))
+        self.assertLessEqual(len(first), 64)
 
     def test_list_buckets(self):
         """Test S3 bucket listing."""
@@ -209,5 +280,178 @@ class TestHelpers(unittest.TestCase):
         mock_print.assert_called_with(mock_response)
 
 
+class TestPartitionedListing(unittest.TestCase):
+    """Test cases for partitioned instance listing."""
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_partitioned_listing_matches_sequential(self):
+        """Test that every partition key returns the same fleet as one walk."""
+        client = helpers.get_ec2_client()
+        for zone in ("us-east-1a", "us-east-1b", "us-east-1c"):
+            client.run_instances(
+                ImageId="ami-12c6146b",
+                MinCount=3,
+                MaxCount=3,
+                Placement={"AvailabilityZone": zone},
+            )
+        stopped = client.describe_instances()["Reservations"][0]["Instances"][0]
+        client.stop_instances(InstanceIds=[stopped["InstanceId"]])
+        expected = {i["InstanceId"] for i in helpers.iter_instances(client)}
+
+        for partition_by in ("availability-zone", "instance-state-name"):
+            with self.subTest(partition_by=partition_by):
+                result = helpers.describe_instances(client, partition_by=partition_by)
+                ids = [instance["InstanceId"] for instance in result]
+                self.assertEqual(len(ids), len(set(ids)))
+                self.assertEqual(set(ids), expected)
+
+    def test_duplicates_across_partitions_are_dropped(self):
+        """Test that an instance seen in two partitions is yielded once."""
+        mock_client = Mock()
+        paginator = mock_client.get_paginator.return_value
+        paginator.paginate.return_value = [
+            {"Reservations": [{"Instances": [{"InstanceId": "i-moving"}]}]}
+        ]
+
+        result = list(
+            helpers.iter_instances_partitioned(mock_client, "instance-state-name")
+        )
+
+        self.assertEqual(result, [{"InstanceId": "i-moving"}])
+        self.assertEqual(paginator.paginate.call_count, len(helpers.INSTANCE_STATES))
+
+    def test_instance_family_partitions(self):
+        """Test that family partitions use disjoint instance-type wildcards."""
+        partitions = helpers.instance_partitions(Mock(), "instance-family")
+
+        self.assertEqual(len(partitions), 26)
+        self.assertEqual(partitions[0], {"Name": "instance-type", "Values": ["a*"]})
+
+    def test_unknown_partition_key(self):
+        """Test that an unsupported partition key is rejected."""
+        with self.assertRaises(ValueError):
+            helpers.instance_partitions(Mock(), "vpc-id")
+
+
+class TestBulkInstanceOperations(unittest.TestCase):
+    """Test cases for the bulk terminate/stop/start helpers."""
+
+    def setUp(self):
+        """Use an unlimited rate limiter so tests never wait."""
+        self.limiter = rate_limiting.TokenBucket(rate=1000, burst=1000)
+
+    def launch(self, client, count, tags=None):
+        """Launch instances in moto and return their IDs."""
+        params = {"ImageId": "ami-12c6146b", "MinCount": count, "MaxCount": count}
+        if tags:
+            params["TagSpecifications"] = [
+                {
+                    "ResourceType": "instance",
+                    "Tags": [{"Key": k, "Value": v} for k, v in tags.items()],
+                }
+            ]
+        response = client.run_instances(**params)
+        return [instance["InstanceId"] for instance in response["Instances"]]
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_terminate_by_ids_in_chunks(self):
+        """Test that IDs are chunked and every instance gets an outcome."""
+        client = helpers.get_ec2_client()
+        ids = self.launch(client, 5)
+
+        result = helpers.terminate_instances(
+            client, ids, chunk_size=2, limiter=self.limiter
+        )
+
+        self.assertEqual(set(result), set(ids))
+        for outcome in result.values():
+            self.assertTrue(outcome["ok"])
+            self.assertEqual(outcome["previous_state"], "running")
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_stop_and_start_by_tag(self):
+        """Test tag selection, including the per-operation state filter."""
+        client = helpers.get_ec2_client()
+        fleet = self.launch(client, 3, tags={"Team": "red"})
+        self.launch(client, 2, tags={"Team": "blue"})
+
+        stopped = helpers.stop_instances(
+            client, tags={"Team": "red"}, limiter=self.limiter
+        )
+        started = helpers.start_instances(
+            client, tags={"Team": ["red", "blue"]}, limiter=self.limiter
+        )
+
+        self.assertEqual(set(stopped), set(fleet))
+        self.assertEqual(set(started), set(fleet))  # Blue instances never stopped
+
+    def test_bad_id_is_isolated(self):
+        """Test that one bad ID does not fail the rest of its chunk."""
+        mock_client = Mock()
+
+        def terminate(InstanceIds):
+            if "i-bad" in InstanceIds:
+                raise ClientError(
+                    {"Error": {"Code": "InvalidInstanceID.NotFound", "Message": "x"}},
+                    "TerminateInstances",
+                )
+            return {
+                "TerminatingInstances": [
+                    {
+                        "InstanceId": instance_id,
+                        "PreviousState": {"Name": "running"},
+                        "CurrentState": {"Name": "shutting-down"},
+                    }
+                    for instance_id in InstanceIds
+                ]
+            }
+
+        mock_client.terminate_instances.side_effect = terminate
+
+        result = helpers.terminate_instances(
+            mock_client, ["i-1", "i-bad", "i-2", "i-3"], limiter=self.limiter
+        )
+
+        self.assertFalse(result["i-bad"]["ok"])
+        self.assertEqual(result["i-bad"]["error"], "InvalidInstanceID.NotFound")
+        self.assertTrue(all(result[i]["ok"] for i in ("i-1", "i-2", "i-3")))
+
+    def test_request_wide_error_is_not_bisected(self):
+        """Test that an error unrelated to the IDs fails the chunk in one call."""
+        mock_client = Mock()
+        mock_client.terminate_instances.side_effect = ClientError(
+            {"Error": {"Code": "UnauthorizedOperation", "Message": "denied"}},
+            "TerminateInstances",
+        )
+        instance_ids = [f"i-{n}" for n in range(8)]
+
+        result = helpers.terminate_instances(
+            mock_client, instance_ids, limiter=self.limiter
+        )
+
+        mock_client.terminate_instances.assert_called_once()
+        self.assertEqual(set(result), set(instance_ids))
+        for outcome in result.values():
+            self.assertFalse(outcome["ok"])
+            self.assertEqual(outcome["error"], "UnauthorizedOperation")
+
+    def test_requires_a_selector(self):
+        """Test that a bulk call without IDs, filters or tags is refused."""
+        with self.assertRaises(ValueError):
+            helpers.terminate_instances(Mock())
+        with self.assertRaises(ValueError):
+            helpers.bulk_instance_operation(Mock(), "reboot", ["i-1"])
+
+    def test_empty_selection(self):
+        """Test that an empty ID list makes no API calls."""
+        mock_client = Mock()
+
+        self.assertEqual(helpers.stop_instances(mock_client, []), {})
+        mock_client.stop_instances.assert_not_called()
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,213 @@
+"""
+Unit tests for instrumentation.py module.
+
+This module contains tests for the metrics registry, the helpers decorator and
+the botocore hooks, using moto so no real AWS API calls are made.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from botocore.exceptions import ClientError
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import helpers
+import instrumentation
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test cases for instrumentation.py metrics collection."""
+
+    def setUp(self):
+        """Reset the shared registry and make sure instrumentation is off."""
+        instrumentation.registry.reset()
+        instrumentation.disable()
+        self.addCleanup(instrumentation.disable)
+        self.addCleanup(instrumentation.registry.reset)
+
+    def test_histogram_cumulative_buckets(self):
+        """Test that histogram buckets are cumulative and end with +Inf."""
+        histogram = instrumentation.Histogram(buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 5.0):
+            histogram.observe(value)
+
+        result = histogram.snapshot()
+
+        self.assertEqual(result["buckets"], {0.1: 1, 1.0: 3, "+Inf": 4})
+        self.assertEqual(result["count"], 4)
+        self.assertAlmostEqual(result["sum"], 6.05)
+
+    def test_timed_is_passthrough_when_disabled(self):
+        """Test that the decorator records nothing while disabled."""
+        helpers.list_buckets(
+            unittest.mock.Mock(list_buckets=lambda: {"Buckets": [{"Name": "b"}]})
+        )
+
+        self.assertEqual(instrumentation.snapshot()["histograms"], {})
+
+    def test_timed_records_when_enabled(self):
+        """Test that the decorator records helpers latency once enabled."""
+        instrumentation.enable()
+
+        helpers.list_buckets(
+            unittest.mock.Mock(list_buckets=lambda: {"Buckets": [{"Name": "b"}]})
+        )
+
+        series = instrumentation.snapshot()["histograms"]["helpers_call_seconds"]
+        self.assertEqual(series["helpers.list_buckets"]["count"], 1)
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_client_hooks_record_operation_metrics(self):
+        """Test that instrumented clients record latency, pages and bytes."""
+        instrumentation.enable()
+        s3_client = helpers.get_s3_client()
+        s3_client.create_bucket(Bucket="metrics-bucket")
+
+        helpers.list_buckets(s3_client)
+        helpers.list_buckets(s3_client)
+
+        result = instrumentation.snapshot()
+        latency = result["histograms"]["aws_api_call_seconds"]
+        self.assertEqual(latency["s3.ListBuckets"]["count"], 2)
+        self.assertEqual(result["counters"]["aws_api_pages_total"]["s3.ListBuckets"], 2)
+        self.assertGreater(
+            result["counters"]["aws_api_bytes_received_total"]["s3.ListBuckets"], 0
+        )
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_client_hooks_count_errors(self):
+        """Test that error responses and transport failures count as errors."""
+        instrumentation.enable()
+        s3_client = helpers.get_s3_client()
+
+        with self.assertRaises(ClientError):
+            s3_client.head_bucket(Bucket="missing-bucket")
+
+        def reset(**kwargs):
+            raise ConnectionError("connection reset by peer")
+
+        s3_client.meta.events.register_first("before-send.s3.ListBuckets", reset)
+        with self.assertRaises(ConnectionError):  # Not a TypeError from a hook
+            s3_client.list_buckets()
+
+        counters = instrumentation.snapshot()["counters"]
+        self.assertEqual(counters["aws_api_errors_total"]["s3.HeadBucket"], 1)
+        self.assertEqual(counters["aws_api_errors_total"]["s3.ListBuckets"], 1)
+        self.assertNotIn("aws_api_pages_total", counters)
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_client_not_instrumented_when_disabled(self):
+        """Test that clients created while disabled record no API metrics."""
+        s3_client = helpers.get_s3_client()
+        instrumentation.enable()
+
+        s3_client.list_buckets()
+
+        self.assertNotIn(
+            "aws_api_call_seconds", instrumentation.snapshot()["histograms"]
+        )
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_pool_utilization_metrics(self):
+        """Test pool size, in-flight and peak gauges of an instrumented client."""
+        instrumentation.enable()
+        s3_client = helpers.get_s3_client(concurrency=32)
+        helpers.get_ec2_client(region_name="eu-west-1", concurrency=16)
+
+        s3_client.list_buckets()
+
+        gauges = instrumentation.snapshot()["gauges"]
+        self.assertEqual(gauges["aws_pool_max_connections"]["s3:us-east-1"], 32)
+        self.assertEqual(gauges["aws_pool_max_connections"]["ec2:eu-west-1"], 16)
+        self.assertEqual(gauges["aws_pool_in_use"]["s3:us-east-1"], 0)
+        self.assertEqual(gauges["aws_pool_in_use_peak"]["s3:us-east-1"], 1)
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_pool_is_released_after_connection_failure(self):
+        """Test that a call failed in transport gives its connection back."""
+        instrumentation.enable()
+        s3_client = helpers.get_s3_client()
+
+        def reset(**kwargs):
+            raise ConnectionError("connection reset")
+
+        s3_client.meta.events.register_first("before-send.s3.ListBuckets", reset)
+        with self.assertRaises(ConnectionError):
+            s3_client.list_buckets()
+
+        gauges = instrumentation.snapshot()["gauges"]
+        self.assertEqual(gauges["aws_pool_in_use"]["s3:us-east-1"], 0)
+        self.assertEqual(gauges["aws_pool_in_use_peak"]["s3:us-east-1"], 1)
+
+    def test_pool_saturation_is_counted(self):
+        """Test that calls beyond the pool size count as saturated."""
+        instrumentation.enable()
+        tracker = instrumentation._PoolTracker("ec2", max_connections=1)
+        contexts = [{}, {}]
+
+        for context in contexts:
+            tracker.acquire(context)
+        for context in contexts:
+            tracker.release(context)
+
+        result = instrumentation.snapshot()
+        self.assertEqual(result["counters"]["aws_pool_saturated_total"]["ec2"], 1)
+        self.assertEqual(result["gauges"]["aws_pool_in_use_peak"]["ec2"], 2)
+        self.assertEqual(result["gauges"]["aws_pool_in_use"]["ec2"], 0)
+
+    def test_prometheus_text_format(self):
+        """Test the Prometheus exposition output."""
+        instrumentation.registry.observe("aws_api_call_seconds", "ec2.Describe", 0.2)
+        instrumentation.registry.increment("aws_api_retries_total", "ec2.Describe", 2)
+
+        text = instrumentation.prometheus_text()
+
+        self.assertIn("# TYPE aws_api_call_seconds histogram", text)
+        self.assertIn(
+            'aws_api_call_seconds_bucket{operation="ec2.Describe",le="0.25"} 1', text
+        )
+        self.assertIn(
+            'aws_api_call_seconds_bucket{operation="ec2.Describe",le="+Inf"} 1', text
+        )
+        self.assertIn('aws_api_call_seconds_count{operation="ec2.Describe"} 1', text)
+        self.assertIn("# TYPE aws_api_retries_total counter", text)
+        self.assertIn('aws_api_retries_total{operation="ec2.Describe"} 2', text)
+
+    def test_prometheus_text_gauges(self):
+        """Test that gauges are exported with the gauge type."""
+        instrumentation.registry.set_gauge(
+            "aws_pool_max_connections", "ec2:us-east-1", 64
+        )
+
+        text = instrumentation.prometheus_text()
+
+        self.assertIn("# TYPE aws_pool_max_connections gauge", text)
+        self.assertIn('aws_pool_max_connections{pool="ec2:us-east-1"} 64', text)
+
+    def test_prometheus_text_pool_counter_label(self):
+        """Test that pool counters are labelled by pool, others by operation."""
+        instrumentation.registry.increment("aws_pool_saturated_total", "s3:eu-west-1")
+        instrumentation.registry.increment("aws_api_retries_total", "s3.ListBuckets")
+
+        text = instrumentation.prometheus_text()
+
+        self.assertIn('aws_pool_saturated_total{pool="s3:eu-west-1"} 1', text)
+        self.assertIn('aws_api_retries_total{operation="s3.ListBuckets"} 1', text)
+
+    def test_prometheus_text_empty(self):
+        """Test that an empty registry renders as an empty string."""
+        self.assertEqual(instrumentation.prometheus_text(), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
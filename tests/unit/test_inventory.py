@@ -0,0 +1,117 @@
+"""
+Unit tests for inventory.py module.
+
+This module contains tests for the tag-indexed inventory, using plain instance
+dicts and moto so no real AWS API calls are made.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import patch
+
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import helpers
+import inventory
+
+
+def make_instance(instance_id, state="running", vpc="vpc-1", **tags):
+    """Build a minimal DescribeInstances instance dict."""
+    return {
+        "InstanceId": instance_id,
+        "State": {"Name": state},
+        "InstanceType": "t2.micro",
+        "VpcId": vpc,
+        "SubnetId": f"subnet-{vpc}",
+        "ImageId": "ami-1",
+        "Tags": [{"Key": key, "Value": value} for key, value in tags.items()],
+    }
+
+
+class TestInventory(unittest.TestCase):
+    """Test cases for Inventory indexing and queries."""
+
+    def setUp(self):
+        """Build a small inventory across two teams and two VPCs."""
+        self.inventory = inventory.Inventory(
+            [
+                make_instance("i-1", Team="red", Env="prod"),
+                make_instance("i-2", Team="red", Env="dev"),
+                make_instance("i-3", vpc="vpc-2", Team="red", Env="prod"),
+                make_instance("i-4", state="stopped", Team="blue", Env="prod"),
+            ]
+        )
+
+    def test_conjunctive_query(self):
+        """Test that every condition must match."""
+        result = self.inventory.query_ids(
+            tags={"Team": "red", "Env": "prod"}, vpc_id="vpc-1"
+        )
+
+        self.assertEqual(result, {"i-1"})
+
+    def test_query_returns_sorted_instances(self):
+        """Test that query returns descriptions ordered by ID."""
+        result = self.inventory.query(tags={"Env": "prod"}, state="running")
+
+        self.assertEqual([i["InstanceId"] for i in result], ["i-1", "i-3"])
+
+    def test_query_without_conditions_returns_everything(self):
+        """Test that an empty query matches all instances."""
+        self.assertEqual(len(self.inventory.query_ids()), 4)
+
+    def test_query_unknown_value_is_empty(self):
+        """Test that a value nobody has yields no results."""
+        self.assertEqual(self.inventory.query_ids(tags={"Team": "green"}), set())
+        self.assertEqual(self.inventory.query_ids(tag_keys=("Owner",)), set())
+
+    def test_query_unknown_field(self):
+        """Test that a typo in a field name is reported."""
+        with self.assertRaises(ValueError):
+            self.inventory.query_ids(vpc="vpc-1")
+
+    def test_update_moves_index_entries(self):
+        """Test that re-adding an instance reindexes only what changed."""
+        self.inventory.add(make_instance("i-1", state="stopped", Team="red"))
+
+        self.assertEqual(self.inventory.query_ids(state="stopped"), {"i-1", "i-4"})
+        self.assertNotIn("i-1", self.inventory.query_ids(tags={"Env": "prod"}))
+        self.assertEqual(len(self.inventory), 4)
+
+    def test_remove(self):
+        """Test that removed instances leave every index."""
+        self.assertTrue(self.inventory.remove("i-4"))
+        self.assertFalse(self.inventory.remove("i-4"))
+
+        self.assertNotIn("i-4", self.inventory)
+        self.assertEqual(self.inventory.values("state"), {"running"})
+        self.assertEqual(self.inventory.query_ids(tags={"Team": "blue"}), set())
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_from_client(self):
+        """Test building the inventory from the describe stream."""
+        client = helpers.get_ec2_client()
+        client.run_instances(
+            ImageId="ami-12c6146b",
+            MinCount=3,
+            MaxCount=3,
+            TagSpecifications=[
+                {"ResourceType": "instance", "Tags": [{"Key": "Team", "Value": "red"}]}
+            ],
+        )
+
+        result = inventory.Inventory.from_client(client)
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(
+            len(result.query_ids(tags={"Team": "red"}, state="running")), 3
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,209 @@
+"""
+Unit tests for inventory_events.py module.
+
+This module contains tests for applying recorded EventBridge sample events to
+the cached inventory, using moto for the reconciliation paths.
+"""
+
+import calendar
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import helpers
+import inventory_events
+from inventory import Inventory
+
+EVENTS_DIR = os.path.join(
+    os.path.dirname(__file__), "..", "..", "lambdas", "inventory_events", "events"
+)
+
+
+def load_event(name: str) -> dict:
+    """Load a recorded sample event shipped with the Lambda."""
+    with open(os.path.join(EVENTS_DIR, name), encoding="utf-8") as event_file:
+        return json.load(event_file)
+
+
+class TestParseEvent(unittest.TestCase):
+    """Test cases for parse_event."""
+
+    def test_ec2_state_change(self):
+        """Test parsing an EC2 state-change notification."""
+        change = inventory_events.parse_event(load_event("ec2_instance_running.json"))
+
+        self.assertEqual(change.kind, "instance_state")
+        self.assertEqual(change.resource_id, "i-0abcdef1234567890")
+        self.assertEqual(change.value, "running")
+
+    def test_s3_bucket_calls(self):
+        """Test parsing CloudTrail CreateBucket/DeleteBucket events."""
+        created = inventory_events.parse_event(load_event("s3_create_bucket.json"))
+        deleted = inventory_events.parse_event(load_event("s3_delete_bucket.json"))
+
+        self.assertEqual((created.kind, created.value), ("bucket", "added"))
+        self.assertEqual(
+            (deleted.resource_id, deleted.value), (created.resource_id, "removed")
+        )
+
+    def test_irrelevant_and_failed_events(self):
+        """Test that unrelated or failed API calls are ignored."""
+        failed = load_event("s3_create_bucket.json")
+        failed["detail"]["errorCode"] = "BucketAlreadyExists"
+
+        self.assertIsNone(inventory_events.parse_event(failed))
+        self.assertIsNone(
+            inventory_events.parse_event({"detail-type": "Scheduled Event"})
+        )
+
+
+class TestInventoryUpdater(unittest.TestCase):
+    """Test cases for InventoryUpdater."""
+
+    def setUp(self):
+        """Create an updater around an inventory with one known instance."""
+        self.inventory = Inventory(
+            [
+                {
+                    "InstanceId": "i-0abcdef1234567890",
+                    "State": {"Code": 0, "Name": "pending"},
+                    "InstanceType": "t2.micro",
+                    "Tags": [{"Key": "Team", "Value": "red"}],
+                }
+            ]
+        )
+        self.updater = inventory_events.InventoryUpdater(self.inventory)
+
+    def test_state_change_updates_index(self):
+        """Test that a state change keeps the rest of the description."""
+        self.updater.apply(load_event("ec2_instance_running.json"))
+
+        (instance,) = self.inventory.query(state="running", tags={"Team": "red"})
+        self.assertEqual(instance["InstanceType"], "t2.micro")
+        self.assertEqual(instance["State"], {"Code": 0, "Name": "running"})
+
+    def test_out_of_order_events_are_ignored(self):
+        """Test that an older event does not undo a newer one."""
+        applied = self.updater.apply_all(
+            [
+                load_event("ec2_instance_running.json"),
+                load_event("ec2_instance_pending.json"),  # Delivered late
+            ]
+        )
+
+        self.assertEqual(len(applied), 1)
+        self.assertEqual(
+            self.inventory.query_ids(state="running"), {"i-0abcdef1234567890"}
+        )
+
+    def test_bucket_events(self):
+        """Test that bucket events add and remove names."""
+        self.updater.apply(load_event("s3_create_bucket.json"))
+        self.assertIn("red-cohort-artifacts", self.updater.buckets)
+
+        self.updater.apply(load_event("s3_delete_bucket.json"))
+        self.assertNotIn("red-cohort-artifacts", self.updater.buckets)
+
+    def test_unknown_instance_is_queued_for_describe(self):
+        """Test that instances first seen by event are described later."""
+        event = load_event("ec2_instance_running.json")
+        event["detail"]["instance-id"] = "i-new"
+
+        self.updater.apply(event)
+
+        self.assertIn("i-new", self.updater.pending_describe)
+        self.assertEqual(self.inventory.query_ids(state="running"), {"i-new"})
+
+    def test_needs_reconcile(self):
+        """Test the reconciliation schedule."""
+        now = [0.0]
+        updater = inventory_events.InventoryUpdater(
+            reconcile_interval=60, clock=lambda: now[0]
+        )
+        self.assertTrue(updater.needs_reconcile())
+
+        updater.last_reconciled = 0.0
+        now[0] = 59.0
+        self.assertFalse(updater.needs_reconcile())
+        now[0] = 60.0
+        self.assertTrue(updater.needs_reconcile())
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_reconcile_and_refresh_pending(self):
+        """Test reconciliation and batched describes against moto."""
+        ec2 = helpers.get_ec2_client()
+        s3 = helpers.get_s3_client()
+        s3.create_bucket(Bucket="kept")
+        response = ec2.run_instances(ImageId="ami-12c6146b", MinCount=2, MaxCount=2)
+        ids = [instance["InstanceId"] for instance in response["Instances"]]
+        updater = inventory_events.InventoryUpdater(buckets={"gone"})
+
+        summary = updater.reconcile(ec2, s3)
+
+        self.assertEqual(summary["instances"]["added"], 2)
+        self.assertEqual(summary["instances"]["removed"], 0)
+        self.assertEqual(summary["buckets"], {"added": 1, "changed": 0, "removed": 1})
+        self.assertEqual(updater.buckets, {"kept"})
+        self.assertFalse(updater.needs_reconcile())
+
+        updater.inventory.remove(ids[0])
+        event = load_event("ec2_instance_running.json")
+        event["detail"]["instance-id"] = ids[0]
+        event["time"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        updater.apply(event)
+
+        self.assertEqual(updater.refresh_pending(ec2), 1)
+        self.assertEqual(updater.pending_describe, {})
+        self.assertEqual(updater.inventory.instances[ids[0]]["ImageId"], "ami-12c6146b")
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_events_before_reconcile_are_dropped(self):
+        """Test that a late event cannot undo what the full listing saw."""
+        listed_at = calendar.timegm(
+            time.strptime("2025-09-15T14:02:00Z", "%Y-%m-%dT%H:%M:%SZ")
+        )
+        updater = inventory_events.InventoryUpdater(
+            self.inventory, wall_clock=lambda: listed_at
+        )
+        updater.reconcile(helpers.get_ec2_client())
+
+        stale = updater.apply(load_event("ec2_instance_pending.json"))  # 14:01:47
+        fresh = load_event("ec2_instance_running.json")  # 14:02:11
+        fresh["detail"]["instance-id"] = "i-new"
+
+        self.assertIsNone(stale)
+        self.assertIsNotNone(updater.apply(fresh))
+        self.assertEqual(updater.watermark, "2025-09-15T14:02:00Z")
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_refresh_pending_skips_unknown_ids(self):
+        """Test that one ID EC2 does not know does not block the rest."""
+        ec2 = helpers.get_ec2_client()
+        instance_id = ec2.run_instances(ImageId="ami-12c6146b", MinCount=1, MaxCount=1)[
+            "Instances"
+        ][0]["InstanceId"]
+        for pending_id in ("i-00000000000000000", instance_id):
+            event = load_event("ec2_instance_running.json")
+            event["detail"]["instance-id"] = pending_id
+            self.updater.apply(event)
+
+        self.assertEqual(self.updater.refresh_pending(ec2), 1)
+        self.assertEqual(self.updater.pending_describe, {})
+        self.assertEqual(
+            self.inventory.instances[instance_id]["ImageId"], "ami-12c6146b"
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+"""
+Unit tests for lambdas/inventory_events/lambda_function.py module.
+
+This module replays the recorded sample events through the handler, using moto
+so no real AWS API calls are made.
+"""
+
+import json
+import os
+import sys
+import time
+import unittest
+from unittest.mock import patch
+
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from lambdas.inventory_events import lambda_function
+from tests.unit.test_inventory_events import load_event
+
+
+def load_event_after_listing(name: str, seconds: float) -> dict:
+    """Loads a sample event restamped ``seconds`` after the current time."""
+    event = load_event(name)
+    event["time"] = time.strftime(
+        "%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + seconds)
+    )
+    return event
+
+
+@mock_aws
+@patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+class TestInventoryEventsLambda(unittest.TestCase):
+    """Test cases for the inventory events Lambda handler."""
+
+    def setUp(self):
+        """Start every test from a cold container."""
+        lambda_function._updater = None
+        self.addCleanup(setattr, lambda_function, "_updater", None)
+
+    def test_cold_start_reconciles_then_applies(self):
+        """Test that the first invocation lists everything once."""
+        event = load_event_after_listing("s3_create_bucket.json", 60)
+
+        result = lambda_function.lambda_handler(event, None)
+
+        body = json.loads(result["body"])
+        self.assertEqual(result["statusCode"], 200)
+        self.assertIsNotNone(body["reconciliation"])
+        self.assertEqual(body["buckets"], 1)
+        self.assertEqual(body["applied"][0]["id"], "red-cohort-artifacts")
+
+    def test_cold_start_drops_events_the_listing_covers(self):
+        """Test that an event older than the cold-start listing is not applied."""
+        result = lambda_function.lambda_handler(
+            load_event("s3_create_bucket.json"),
+            None,  # Recorded in 2025
+        )
+
+        body = json.loads(result["body"])
+        self.assertEqual(body["applied"], [])
+        self.assertEqual(body["buckets"], 0)
+
+    def test_warm_invocations_skip_reconciliation(self):
+        """Test that warm invocations apply their events without listing."""
+        cold = lambda_function.lambda_handler([], None)
+        self.assertEqual(json.loads(cold["body"])["buckets"], 0)
+
+        with patch.object(lambda_function, "boto3") as mock_boto3:
+            created = lambda_function.lambda_handler(
+                [load_event_after_listing("s3_create_bucket.json", 60)], None
+            )
+            deleted = lambda_function.lambda_handler(
+                [load_event_after_listing("s3_delete_bucket.json", 120)], None
+            )
+
+        created_body = json.loads(created["body"])
+        self.assertIsNone(created_body["reconciliation"])
+        self.assertEqual(created_body["applied"][0]["id"], "red-cohort-artifacts")
+        self.assertEqual(created_body["buckets"], 1)
+        deleted_body = json.loads(deleted["body"])
+        self.assertIsNone(deleted_body["reconciliation"])
+        self.assertEqual(deleted_body["applied"][0]["id"], "red-cohort-artifacts")
+        self.assertEqual(deleted_body["buckets"], 0)
+        mock_boto3.client.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -7,9 +7,14 @@ to avoid actual AWS API calls during testing.
 
 import unittest
 from unittest.mock import patch, Mock
+import base64
+import contextlib
+import gzip
+import io
 import json
 import sys
 import os
+import time
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -18,6 +23,17 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
 from lambdas.list_buckets import lambda_function
 
 
+def reset_lambda_state(test_case: unittest.TestCase) -> None:
+    """Clear warm-container state and metric/cache settings for a test."""
+    lambda_function._cold_start = True
+    lambda_function._bucket_cache.update({"index": None, "expires_at": 0.0})
+    env = patch.dict(
+        os.environ, {"EMF_METRICS_ENABLED": "", "BUCKET_CACHE_TTL_SECONDS": "0"}
+    )
+    env.start()
+    test_case.addCleanup(env.stop)
+
+
 class TestLambdaFunction(unittest.TestCase):
     """Test cases for lambda_function.py AWS Lambda handler."""
 
@@ -25,6 +41,7 @@ class TestLambdaFunction(unittest.TestCase):
         """Set up test fixtures."""
         self.test_event = {}
         self.test_context = Mock()
+        reset_lambda_state(self)
 
     @patch("lambdas.list_buckets.lambda_function.boto3")
     @patch("builtins.print")
@@ -52,13 +69,8 @@ class TestLambdaFunction(unittest.TestCase):
         # Verify list_buckets was called
         mock_s3_client.list_buckets.assert_called_once()
 
-        # Verify print statements for each bucket
-        expected_print_calls = [
-            unittest.mock.call("bucket1"),
-            unittest.mock.call("bucket2"),
-            unittest.mock.call("bucket3"),
-        ]
-        mock_print.assert_has_calls(expected_print_calls)
+        # Verify bucket names are no longer logged one line at a time
+        mock_print.assert_not_called()
 
         # Verify the response structure
         self.assertEqual(result["statusCode"], 200)
@@ -110,8 +122,8 @@ class TestLambdaFunction(unittest.TestCase):
         # Call the lambda handler
         result = lambda_function.lambda_handler(self.test_event, self.test_context)
 
-        # Verify print was called once
-        mock_print.assert_called_once_with("single-bucket")
+        # Verify nothing is logged while EMF metrics are disabled
+        mock_print.assert_not_called()
 
         # Verify the response
         self.assertEqual(result["statusCode"], 200)
@@ -168,7 +180,7 @@ class TestLambdaFunction(unittest.TestCase):
 
     @patch("lambdas.list_buckets.lambda_function.boto3")
     def test_lambda_handler_json_formatting(self, mock_boto3):
-        """Test that the JSON response is properly formatted with indentation."""
+        """Test that format=pretty indents the JSON response."""
         # Mock S3 client and response
         mock_s3_client = Mock()
         mock_boto3.client.return_value = mock_s3_client
@@ -181,7 +193,7 @@ class TestLambdaFunction(unittest.TestCase):
         }
         mock_s3_client.list_buckets.return_value = mock_response
 
-        result = lambda_function.lambda_handler({}, None)
+        result = lambda_function.lambda_handler({"format": "pretty"}, None)
 
         # Verify that the JSON is formatted with indentation
         expected_json = json.dumps(["bucket1", "bucket2"], indent=4)
@@ -230,5 +242,575 @@ class TestLambdaFunction(unittest.TestCase):
         self.assertEqual(response_body, ["bucket1", "bucket2"])
 
 
+class TestLambdaMetrics(unittest.TestCase):
+    """Test cases for the Embedded Metric Format output and warm cache."""
+
+    def setUp(self):
+        """Set up test fixtures with EMF output switched on."""
+        reset_lambda_state(self)
+        os.environ["EMF_METRICS_ENABLED"] = "true"
+        self.context = Mock(function_name="list-buckets")
+
+    def invoke(self, mock_boto3, buckets):
+        """Invoke the handler and return (result, captured stdout lines)."""
+        mock_s3_client = Mock()
+        mock_boto3.client.return_value = mock_s3_client
+        mock_s3_client.list_buckets.return_value = {
+            "Buckets": [{"Name": name} for name in buckets]
+        }
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            result = lambda_function.lambda_handler({}, self.context)
+        return result, stdout.getvalue().splitlines()
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_emf_single_line_per_invocation(self, mock_boto3):
+        """Test that one EMF JSON line is written with the expected metrics."""
+        result, lines = self.invoke(mock_boto3, ["bucket1", "bucket2"])
+
+        self.assertEqual(len(lines), 1)
+        record = json.loads(lines[0])
+        directive = record["_aws"]["CloudWatchMetrics"][0]
+        metric_names = {metric["Name"] for metric in directive["Metrics"]}
+        self.assertEqual(directive["Dimensions"], [["FunctionName"]])
+        self.assertEqual(
+            metric_names,
+            {
+                "ColdStart",
+                "InitDuration",
+                "S3CallLatency",
+                "BucketCount",
+                "CacheHit",
+                "ResponseSize",
+            },
+        )
+        self.assertEqual(record["FunctionName"], "list-buckets")
+        self.assertEqual(record["ColdStart"], 1)
+        self.assertEqual(record["BucketCount"], 2)
+        self.assertEqual(record["CacheHit"], 0)
+        self.assertEqual(record["ResponseSize"], len(result["body"].encode("utf-8")))
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_emf_warm_invocation(self, mock_boto3):
+        """Test that the second invocation is reported as warm without init time."""
+        self.invoke(mock_boto3, ["bucket1"])
+        _, lines = self.invoke(mock_boto3, ["bucket1"])
+
+        record = json.loads(lines[0])
+        self.assertEqual(record["ColdStart"], 0)
+        self.assertNotIn("InitDuration", record)
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_emf_for_invalid_requests(self, mock_boto3):
+        """Test that a 400 response is still reported, with its init duration."""
+        mock_boto3.client.return_value.list_buckets.return_value = {"Buckets": []}
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            result = lambda_function.lambda_handler({"limit": "abc"}, self.context)
+
+        self.assertEqual(result["statusCode"], 400)
+        record = json.loads(stdout.getvalue().splitlines()[-1])
+        self.assertEqual(record["ColdStart"], 1)
+        self.assertIn("InitDuration", record)
+        self.assertEqual(record["ResponseSize"], len(result["body"].encode("utf-8")))
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_warm_cache_on_by_default(self, mock_boto3):
+        """Test that the index is reused by default, without a TTL setting."""
+        del os.environ["BUCKET_CACHE_TTL_SECONDS"]
+
+        self.invoke(mock_boto3, ["bucket1"])
+        _, lines = self.invoke(mock_boto3, ["bucket1"])
+
+        self.assertEqual(json.loads(lines[0])["CacheHit"], 1)
+        mock_boto3.client.assert_called_once_with("s3")
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_warm_cache_hit(self, mock_boto3):
+        """Test that a positive cache TTL serves repeat calls from memory."""
+        os.environ["BUCKET_CACHE_TTL_SECONDS"] = "60"
+
+        self.invoke(mock_boto3, ["bucket1"])
+        result, lines = self.invoke(mock_boto3, ["bucket1"])
+
+        record = json.loads(lines[0])
+        self.assertEqual(record["CacheHit"], 1)
+        self.assertEqual(record["S3CallLatency"], 0.0)
+        self.assertEqual(json.loads(result["body"]), ["bucket1"])
+        mock_boto3.client.assert_called_once_with("s3")
+
+
+class TestLambdaResponseFormat(unittest.TestCase):
+    """Test cases for compact output, gzip and cursor pagination."""
+
+    def setUp(self):
+        """Set up test fixtures with a mocked S3 client."""
+        reset_lambda_state(self)
+        patcher = patch("lambdas.list_buckets.lambda_function.boto3")
+        mock_boto3 = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.names = [f"bucket-{i:03d}" for i in range(25)]
+        mock_boto3.client.return_value.list_buckets.return_value = {
+            "Buckets": [{"Name": name} for name in reversed(self.names)]
+        }
+
+    def test_compact_format(self):
+        """Test that the default format has no whitespace in the body."""
+        result = lambda_function.lambda_handler({}, None)
+
+        self.assertNotIn(" ", result["body"])
+        self.assertNotIn("\n", result["body"])
+        self.assertEqual(json.loads(result["body"]), self.names)
+
+    def test_compact_format_from_query_string(self):
+        """Test that API Gateway query string parameters are honoured."""
+        event = {"queryStringParameters": {"format": "compact", "limit": "2"}}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.assertEqual(result["body"], '["bucket-000","bucket-001"]')
+
+    def test_pagination_walks_all_pages(self):
+        """Test that following X-Next-Cursor returns every name exactly once."""
+        collected = []
+        cursor = None
+        pages = 0
+        while True:
+            event = {"limit": 10}
+            if cursor:
+                event["cursor"] = cursor
+            result = lambda_function.lambda_handler(event, None)
+            collected.extend(json.loads(result["body"]))
+            pages += 1
+            cursor = result["headers"].get("X-Next-Cursor")
+            if cursor is None:
+                break
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(collected, self.names)
+
+    def test_default_page_size_is_max_page_size(self):
+        """Test that a request without a limit is paginated too."""
+        with patch.object(lambda_function, "MAX_PAGE_SIZE", 20):
+            first = lambda_function.lambda_handler({}, None)
+            cursor = first["headers"]["X-Next-Cursor"]
+            second = lambda_function.lambda_handler({"cursor": cursor}, None)
+
+        self.assertEqual(json.loads(first["body"]), self.names[:20])
+        self.assertEqual(json.loads(second["body"]), self.names[20:])
+        self.assertNotIn("X-Next-Cursor", second["headers"])
+
+    def test_invalid_limit_returns_400(self):
+        """Test that a non-numeric or non-positive limit is rejected."""
+        for limit in ("abc", "0", "-5"):
+            with self.subTest(limit=limit):
+                result = lambda_function.lambda_handler({"limit": limit}, None)
+                self.assertEqual(result["statusCode"], 400)
+                self.assertIn("Invalid limit", json.loads(result["body"])["error"])
+
+    def test_non_string_params_return_400(self):
+        """Test that non-string parameters of a direct invocation are rejected."""
+        for event in ({"format": ["compact"]}, {"prefix": {"a": 1}}, {"regex": 1.5}):
+            with self.subTest(event=event):
+                result = lambda_function.lambda_handler(event, None)
+                self.assertEqual(result["statusCode"], 400)
+                self.assertIn("expected a string", json.loads(result["body"])["error"])
+
+    def test_invalid_cursor_returns_400(self):
+        """Test that a malformed cursor is rejected."""
+        result = lambda_function.lambda_handler({"cursor": "%%%"}, None)
+
+        self.assertEqual(result["statusCode"], 400)
+
+    def test_gzip_when_accepted(self):
+        """Test gzip + base64 encoding when the client sends Accept-Encoding."""
+        event = {"headers": {"accept-encoding": "gzip, deflate"}}
+
+        with patch.object(lambda_function, "GZIP_MIN_BYTES", 0):
+            result = lambda_function.lambda_handler(event, None)
+
+        self.assertTrue(result["isBase64Encoded"])
+        self.assertEqual(result["headers"]["Content-Encoding"], "gzip")
+        body = gzip.decompress(base64.b64decode(result["body"]))
+        self.assertEqual(json.loads(body), self.names)
+
+    def test_no_gzip_for_small_bodies(self):
+        """Test that bodies under GZIP_MIN_BYTES are sent uncompressed."""
+        event = {"headers": {"Accept-Encoding": "gzip"}, "limit": 1}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.assertNotIn("isBase64Encoded", result)
+        self.assertEqual(json.loads(result["body"]), ["bucket-000"])
+
+
+class TestBucketIndex(unittest.TestCase):
+    """Test cases for the BucketIndex lookups and the search parameters."""
+
+    def setUp(self):
+        """Set up an index over a small set of bucket names."""
+        reset_lambda_state(self)
+        self.names = [
+            "prod-logs",
+            "dev-data",
+            "prod-data",
+            "prod-assets",
+            "staging-logs",
+            "productivity",
+        ]
+        self.index = lambda_function.BucketIndex(self.names)
+
+    def test_prefix(self):
+        """Test that prefix lookups return the contiguous sorted range."""
+        self.assertEqual(
+            self.index.search(prefix="prod-"),
+            ["prod-assets", "prod-data", "prod-logs"],
+        )
+        self.assertEqual(self.index.search(prefix="zzz"), [])
+
+    def test_contains_is_case_insensitive(self):
+        """Test substring lookups against the precomputed lowercase names."""
+        self.assertEqual(
+            self.index.search(contains="LOGS"), ["prod-logs", "staging-logs"]
+        )
+
+    def test_regex(self):
+        """Test regular expression lookups."""
+        self.assertEqual(self.index.search(regex=r"-data$"), ["dev-data", "prod-data"])
+
+    def test_filters_combine(self):
+        """Test that all given filters must match."""
+        self.assertEqual(
+            self.index.search(prefix="prod", contains="a", regex="s$"),
+            ["prod-assets"],
+        )
+
+    def test_no_filters_returns_everything_sorted(self):
+        """Test that an empty search returns all names in sorted order."""
+        self.assertEqual(self.index.search(), sorted(self.names))
+
+    def test_invalid_regex(self):
+        """Test that invalid or oversized patterns raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.index.search(regex="(")
+        with self.assertRaises(ValueError):
+            self.index.search(regex="a" * (lambda_function.MAX_REGEX_LENGTH + 1))
+
+    def test_huge_repeat_count_is_rejected(self):
+        """Test that a repeat count the parser cannot hold is a ValueError."""
+        with self.assertRaises(ValueError):
+            self.index.search(regex="a{99999999999}")
+
+    def test_parser_recursion_is_rejected(self):
+        """Test that a pattern nested too deeply to parse is a ValueError."""
+        with (
+            patch.object(lambda_function._parser, "parse", side_effect=RecursionError),
+            self.assertRaises(ValueError),
+        ):
+            self.index.search(regex="((a))")
+
+    def test_pathological_regex_is_rejected(self):
+        """Test that patterns that backtrack exponentially are never run."""
+        index = lambda_function.BucketIndex(["a" * 29])
+        for regex in (r"^([a-z]+-?)*\.$", r"(a|aa)+$", r"(a)\1", r"a*a*a*a*a*x"):
+            with self.subTest(regex=regex):
+                started = time.perf_counter()
+                with self.assertRaises(ValueError):
+                    index.search(regex=regex)
+                self.assertLess(time.perf_counter() - started, 0.5)
+
+    def test_common_patterns_are_accepted(self):
+        """Test that ordinary anchored patterns with a few quantifiers work."""
+        self.assertEqual(
+            self.index.search(regex=r"^(prod|dev)-[a-z]+$"),
+            ["dev-data", "prod-assets", "prod-data", "prod-logs"],
+        )
+
+    def test_regex_time_limit(self):
+        """Test that a search over budget is cut short with a ValueError."""
+        with (
+            patch.object(lambda_function, "REGEX_TIME_LIMIT_SECONDS", -1.0),
+            self.assertRaises(ValueError),
+        ):
+            self.index.search(regex="data")
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_handler_search_parameters(self, mock_boto3):
+        """Test that the handler applies filters before paginating."""
+        mock_boto3.client.return_value.list_buckets.return_value = {
+            "Buckets": [{"Name": name} for name in self.names]
+        }
+        event = {"queryStringParameters": {"prefix": "prod-", "limit": "2"}}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.assertEqual(json.loads(result["body"]), ["prod-assets", "prod-data"])
+        self.assertIn("X-Next-Cursor", result["headers"])
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_handler_invalid_regex_returns_400(self, mock_boto3):
+        """Test that a bad regex is reported as a client error."""
+        mock_boto3.client.return_value.list_buckets.return_value = {"Buckets": []}
+
+        result = lambda_function.lambda_handler({"regex": "["}, None)
+
+        self.assertEqual(result["statusCode"], 400)
+        self.assertIn("Invalid regex", json.loads(result["body"])["error"])
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_handler_regex_overflow_returns_400(self, mock_boto3):
+        """Test that an oversized repeat count is a client error, not a crash."""
+        mock_boto3.client.return_value.list_buckets.return_value = {"Buckets": []}
+        event = {"queryStringParameters": {"regex": "a{99999999999}"}}
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.assertEqual(result["statusCode"], 400)
+        self.assertIn("Invalid regex", json.loads(result["body"])["error"])
+
+    @patch("lambdas.list_buckets.lambda_function.boto3")
+    def test_index_reused_from_warm_cache(self, mock_boto3):
+        """Test that the index is built once while the warm cache is fresh."""
+        os.environ["BUCKET_CACHE_TTL_SECONDS"] = "60"
+        mock_boto3.client.return_value.list_buckets.return_value = {
+            "Buckets": [{"Name": name} for name in self.names]
+        }
+
+        with patch.object(
+            lambda_function, "BucketIndex", wraps=lambda_function.BucketIndex
+        ) as mock_index:
+            lambda_function.lambda_handler({"prefix": "dev"}, None)
+            result = lambda_function.lambda_handler({"contains": "staging"}, None)
+
+        mock_index.assert_called_once()
+        self.assertEqual(json.loads(result["body"]), ["staging-logs"])
+
+
+class TestLambdaConditionalRequests(unittest.TestCase):
+    """Test cases for ETag and If-None-Match handling."""
+
+    def setUp(self):
+        """Set up test fixtures with a mocked S3 client."""
+        reset_lambda_state(self)
+        patcher = patch("lambdas.list_buckets.lambda_function.boto3")
+        self.mock_boto3 = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.set_buckets(["alpha", "beta"])
+
+    def set_buckets(self, names):
+        """Make the mocked S3 client return these bucket names."""
+        self.mock_boto3.client.return_value.list_buckets.return_value = {
+            "Buckets": [{"Name": name} for name in names]
+        }
+
+    def test_etag_is_stable_across_bucket_order(self):
+        """Test that the ETag depends on the sorted content only."""
+        first = lambda_function.lambda_handler({}, None)
+        self.set_buckets(["beta", "alpha"])
+        second = lambda_function.lambda_handler({}, None)
+
+        self.assertTrue(first["headers"]["ETag"].startswith('W/"'))
+        self.assertEqual(first["headers"]["ETag"], second["headers"]["ETag"])
+
+    def test_unchanged_poll_returns_304(self):
+        """Test that a matching If-None-Match yields a bodyless 304."""
+        etag = lambda_function.lambda_handler({}, None)["headers"]["ETag"]
+
+        with patch.object(lambda_function, "serialize") as mock_serialize:
+            result = lambda_function.lambda_handler(
+                {"headers": {"if-none-match": etag}}, None
+            )
+
+        self.assertEqual(
+            result, {"statusCode": 304, "headers": {"ETag": etag}, "body": ""}
+        )
+        mock_serialize.assert_not_called()
+
+    def test_changed_buckets_return_200(self):
+        """Test that a stale ETag gets the new list."""
+        etag = lambda_function.lambda_handler({}, None)["headers"]["ETag"]
+        self.set_buckets(["alpha", "beta", "gamma"])
+
+        result = lambda_function.lambda_handler(
+            {"headers": {"If-None-Match": etag}}, None
+        )
+
+        self.assertEqual(result["statusCode"], 200)
+        self.assertNotEqual(result["headers"]["ETag"], etag)
+        self.assertEqual(json.loads(result["body"]), ["alpha", "beta", "gamma"])
+
+    def test_parameters_change_the_etag(self):
+        """Test that filtered, paged and formatted responses have their own ETag."""
+        etags = {
+            lambda_function.lambda_handler(event, None)["headers"]["ETag"]
+            for event in ({}, {"prefix": "a"}, {"limit": "1"}, {"format": "compact"})
+        }
+
+        self.assertEqual(len(etags), 4)
+
+    def test_if_none_match_lists(self):
+        """Test weak comparison, lists of tags and the wildcard."""
+        etag = 'W/"abc"'
+
+        self.assertTrue(lambda_function.etag_matches('"x", "abc"', etag))
+        self.assertTrue(lambda_function.etag_matches("*", etag))
+        self.assertFalse(lambda_function.etag_matches('"x"', etag))
+        self.assertFalse(lambda_function.etag_matches(None, etag))
+
+
+class TestLambdaBatchMode(unittest.TestCase):
+    """Test cases for SQS batches and the requests envelope."""
+
+    def setUp(self):
+        """Set up test fixtures with a mocked S3 client."""
+        reset_lambda_state(self)
+        patcher = patch("lambdas.list_buckets.lambda_function.boto3")
+        self.mock_boto3 = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.s3 = self.mock_boto3.client.return_value
+        self.s3.list_buckets.return_value = {
+            "Buckets": [{"Name": n} for n in ("dev-logs", "prod-data", "prod-logs")]
+        }
+
+    def sqs_event(self, *bodies):
+        """Build an SQS event with one message per body."""
+        return {
+            "Records": [
+                {"messageId": f"m{i}", "eventSource": "aws:sqs", "body": body}
+                for i, body in enumerate(bodies)
+            ]
+        }
+
+    def test_sqs_batch_uses_one_listing(self):
+        """Test that every record is answered from a single S3 call."""
+        event = self.sqs_event(
+            json.dumps({"prefix": "prod"}), json.dumps({"contains": "LOGS"})
+        )
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.s3.list_buckets.assert_called_once()
+        self.assertEqual(result["batchItemFailures"], [])
+        bodies = {r["itemIdentifier"]: json.loads(r["body"]) for r in result["results"]}
+        self.assertEqual(bodies["m0"], ["prod-data", "prod-logs"])
+        self.assertEqual(bodies["m1"], ["dev-logs", "prod-logs"])
+
+    def test_sqs_partial_batch_failures(self):
+        """Test that only the bad records are reported for retry."""
+        event = self.sqs_event(
+            json.dumps({"prefix": "dev"}),
+            "not json",
+            json.dumps({"regex": "["}),
+            json.dumps(["not", "an", "object"]),
+        )
+
+        result = lambda_function.lambda_handler(event, None)
+
+        self.assertEqual(
+            result["batchItemFailures"],
+            [
+                {"itemIdentifier": "m1"},
+                {"itemIdentifier": "m2"},
+                {"itemIdentifier": "m3"},
+            ],
+        )
+        self.assertEqual(
+            [r["statusCode"] for r in result["results"]], [200, 400, 400, 400]
+        )
+
+    def test_requests_envelope(self):
+        """Test ids, default positions and conditional requests in an envelope."""
+        first = lambda_function.lambda_handler({"prefix": "prod"}, None)
+        event = {
+            "requests": [
+                {
+                    "id": "a",
+                    "prefix": "prod",
+                    "headers": {"If-None-Match": first["headers"]["ETag"]},
+                },
+                {"limit": "1", "format": "compact"},
+                "bogus",
+            ]
+        }
+
+        result = lambda_function.lambda_handler(event, None)
+
+        identifiers = [r["itemIdentifier"] for r in result["results"]]
+        self.assertEqual(identifiers, ["a", "1", "2"])
+        self.assertEqual(result["results"][0]["statusCode"], 304)
+        self.assertEqual(result["results"][1]["body"], '["dev-logs"]')
+        self.assertEqual(result["batchItemFailures"], [{"itemIdentifier": "2"}])
+
+    def test_batch_metrics(self):
+        """Test that a batch writes one EMF line with its size."""
+        os.environ["EMF_METRICS_ENABLED"] = "true"
+        stdout = io.StringIO()
+
+        with contextlib.redirect_stdout(stdout):
+            lambda_function.lambda_handler({"requests": [{}, {}, {}]}, None)
+
+        lines = stdout.getvalue().splitlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0])["BatchSize"], 3)
+
+
+class TestSlimLoader(unittest.TestCase):
+    """Test cases for the slim botocore loader and its model cache."""
+
+    def setUp(self):
+        """Use a temporary cache directory and restore boto3's session after."""
+        import tempfile
+
+        import boto3
+
+        self.boto3 = boto3
+        previous = boto3.DEFAULT_SESSION
+        self.addCleanup(setattr, boto3, "DEFAULT_SESSION", previous)
+        cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(cache_dir.cleanup)
+        self.cache_dir = cache_dir.name
+
+    def test_only_allowed_services_load(self):
+        """Test that S3 clients work and other services are unknown."""
+        from botocore.exceptions import UnknownServiceError
+
+        lambda_function.install_slim_loader(cache_dirs=(self.cache_dir,))
+
+        client = self.boto3.client("s3", region_name="us-east-1")
+
+        self.assertEqual(client.meta.service_model.service_name, "s3")
+        with self.assertRaises(UnknownServiceError):
+            self.boto3.client("ec2", region_name="us-east-1")
+
+    def test_cached_models_skip_botocore_data_files(self):
+        """Test that a saved cache serves the next cold start on its own."""
+        loader = lambda_function.install_slim_loader(cache_dirs=(self.cache_dir,))
+        self.boto3.client("s3", region_name="us-east-1")
+        path = lambda_function.save_slim_cache(loader, self.cache_dir)
+
+        self.assertTrue(os.path.exists(path))
+        self.assertIsNone(lambda_function.save_slim_cache(loader, self.cache_dir))
+
+        lambda_function.install_slim_loader(cache_dirs=(self.cache_dir,))
+        with patch(
+            "botocore.loaders.Loader.load_data_with_path",
+            side_effect=AssertionError("read from botocore/data"),
+        ):
+            client = self.boto3.client("s3", region_name="eu-west-1")
+
+        self.assertEqual(client.meta.region_name, "eu-west-1")
+
+    def test_unreadable_cache_is_ignored(self):
+        """Test that a corrupt cache file falls back to botocore's data."""
+        path = os.path.join(self.cache_dir, lambda_function.slim_cache_name())
+        with open(path, "wb") as handle:
+            handle.write(b"not marshal data")
+
+        loader = lambda_function.install_slim_loader(cache_dirs=(self.cache_dir,))
+
+        self.assertEqual(loader.blobs, {})
+        self.boto3.client("s3", region_name="us-east-1")
+
+
 if __name__ == "__main__":
     unittest.main()
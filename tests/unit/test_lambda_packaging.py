@@ -0,0 +1,108 @@
+"""
+Unit tests for lambda_packaging.py module.
+
+This module checks which files go into the slim Lambda package.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import zipfile
+from unittest.mock import patch
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import lambda_packaging
+
+
+class TestLambdaPackaging(unittest.TestCase):
+    """Test cases for the slim package builder."""
+
+    def test_keep_file(self):
+        """Test that botocore data is pruned to the kept services."""
+        keep = lambda_packaging.keep_file
+        services = ("s3",)
+
+        self.assertTrue(keep("botocore", "data/endpoints.json", services))
+        self.assertTrue(
+            keep("botocore", "data/s3/2006-03-01/service-2.json.gz", services)
+        )
+        self.assertFalse(
+            keep("botocore", "data/ec2/2016-11-15/service-2.json.gz", services)
+        )
+        self.assertFalse(keep("botocore", "data/ec2/2016-11-15", services))
+        self.assertFalse(keep("boto3", "data/s3/2006-03-01/resources-1.json", services))
+        self.assertFalse(
+            keep("botocore", "__pycache__/client.cpython-311.pyc", services)
+        )
+        self.assertTrue(keep("botocore", "client.py", services))
+
+    def test_build_package_without_vendoring(self):
+        """Test that the zip holds the function and its pre-serialized models."""
+        entry = os.path.join(lambda_packaging.FUNCTION_DIR, "lambda_function.py")
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "function.zip")
+
+            summary = lambda_packaging.build_package(output, vendor=False)
+
+            with zipfile.ZipFile(output) as archive:
+                names = archive.namelist()
+
+        self.assertEqual(summary["files"], 2)
+        self.assertEqual(len(names), 2)
+        self.assertIn("lambda_function.py", names)
+        self.assertTrue(any(name.endswith(".marshal") for name in names))
+        # Everything the function imports from the repository is in the zip
+        self.assertLessEqual(set(lambda_packaging.project_modules(entry)), set(names))
+
+    def test_project_modules(self):
+        """Test that the slim function needs no repository modules."""
+        entry = os.path.join(lambda_packaging.FUNCTION_DIR, "lambda_function.py")
+
+        self.assertEqual(lambda_packaging.project_modules(entry), [])
+
+    def test_project_modules_follows_imports(self):
+        """Test that imports are followed transitively, nested ones included."""
+        sources = {
+            "entry.py": "import json\nimport alpha\n\ndef handler():\n"
+            "    from beta import run\n",
+            "alpha.py": "from gamma.sub import thing\n",
+            "beta.py": "from . import alpha\n",
+            "gamma.py": "import alpha\n",
+            "unused.py": "",
+        }
+        with tempfile.TemporaryDirectory() as directory:
+            for name, source in sources.items():
+                with open(os.path.join(directory, name), "w") as source_file:
+                    source_file.write(source)
+            entry = os.path.join(directory, "entry.py")
+
+            with patch.object(lambda_packaging, "PROJECT_DIR", directory):
+                modules = lambda_packaging.project_modules(entry)
+
+        self.assertEqual(modules, ["alpha.py", "beta.py", "gamma.py"])
+
+    def test_project_modules_of_inventory_events_lambda(self):
+        """Test that the event-driven Lambda's modules are repository files."""
+        entry = os.path.join(
+            lambda_packaging.PROJECT_DIR,
+            "lambdas",
+            "inventory_events",
+            "lambda_function.py",
+        )
+
+        modules = lambda_packaging.project_modules(entry)
+
+        self.assertIn("inventory_events.py", modules)
+        self.assertIn("helpers.py", modules)
+        self.assertNotIn("lambda_packaging.py", modules)
+        for module in modules:
+            with self.subTest(module=module):
+                path = os.path.join(lambda_packaging.PROJECT_DIR, module)
+                self.assertTrue(os.path.isfile(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+"""
+Unit tests for launch_planning.py module.
+
+This module contains tests for the launch preflight, using moto for EC2 and a
+mocked Service Quotas client so no real AWS resources are touched.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock, patch
+
+import boto3
+from botocore.exceptions import ClientError, EndpointConnectionError
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import launch_planning
+
+
+@mock_aws
+class TestPlanLaunch(unittest.TestCase):
+    """Test cases for plan_launch against a moto EC2 backend."""
+
+    def setUp(self):
+        """Create the key pair and security group the default profile uses."""
+        env = patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+        env.start()
+        self.addCleanup(env.stop)
+        launch_planning._quota_cache.clear()
+        launch_planning._vcpu_cache.clear()
+
+        self.ec2 = boto3.client("ec2", region_name="us-east-1")
+        self.ec2.create_key_pair(KeyName="plan-key")
+        group_id = self.ec2.create_security_group(
+            GroupName="plan-sg", Description="plan"
+        )["GroupId"]
+        self.ami = self.ec2.describe_images(
+            Filters=[{"Name": "name", "Values": ["amzn2-ami-hvm-*"]}], Owners=["amazon"]
+        )["Images"][0]["ImageId"]
+        params = {
+            "ami": self.ami,
+            "instance_type": "t2.micro",
+            "key_name": "plan-key",
+            "security_group_ids": (group_id,),
+        }
+        resolver = patch.object(
+            launch_planning.default_resolver, "launch_params", return_value=params
+        )
+        resolver.start()
+        self.addCleanup(resolver.stop)
+
+        self.quotas = Mock()
+        self.quotas.get_service_quota.return_value = {"Quota": {"Value": 32.0}}
+
+    def test_go_when_everything_checks_out(self):
+        """Test a launch that fits the quota and has valid resources."""
+        self.quotas.get_service_quota.return_value = {"Quota": {"Value": 512.0}}
+
+        plan = launch_planning.plan_launch(
+            self.ec2, "ubuntu", 250, quotas_client=self.quotas
+        )
+
+        self.assertTrue(plan.go, plan.problems)
+        dry_runs = [name for name in plan.checks if name.startswith("dry_run")]
+        self.assertEqual(len(dry_runs), 3)
+        self.assertEqual(plan.vcpus_required, 250)
+        self.assertEqual(plan.vcpu_quota, 512.0)
+
+    def test_no_go_when_quota_is_exceeded(self):
+        """Test that running instances count against the remaining quota."""
+        self.ec2.run_instances(
+            ImageId=self.ami, InstanceType="m5.xlarge", MinCount=7, MaxCount=7
+        )
+
+        plan = launch_planning.plan_launch(
+            self.ec2, "ubuntu", 5, quotas_client=self.quotas
+        )
+
+        self.assertFalse(plan.go)
+        self.assertEqual(plan.vcpus_in_use, 28)
+        self.assertFalse(plan.checks["vcpu_quota"][0])
+
+    def test_no_go_when_key_pair_is_missing(self):
+        """Test that a missing key pair fails the resource check."""
+        self.ec2.delete_key_pair(KeyName="plan-key")
+
+        plan = launch_planning.plan_launch(
+            self.ec2, "ubuntu", 1, quotas_client=self.quotas
+        )
+
+        self.assertFalse(plan.go)
+        self.assertFalse(plan.checks["key_pair"][0])
+        self.assertTrue(plan.checks["security_groups"][0])
+
+    def test_quota_lookup_is_cached(self):
+        """Test that repeated plans reuse the cached quota value."""
+        for _ in range(3):
+            launch_planning.plan_launch(
+                self.ec2, "ubuntu", 1, quotas_client=self.quotas
+            )
+
+        self.quotas.get_service_quota.assert_called_once_with(
+            ServiceCode="ec2", QuotaCode=launch_planning.STANDARD_VCPU_QUOTA_CODE
+        )
+
+    def test_failed_quota_lookup_is_a_failed_check(self):
+        """Test that a Service Quotas error is reported instead of raised."""
+        self.quotas.get_service_quota.side_effect = ClientError(
+            {"Error": {"Code": "AccessDeniedException", "Message": "denied"}},
+            "GetServiceQuota",
+        )
+
+        plan = launch_planning.plan_launch(
+            self.ec2, "ubuntu", 1, quotas_client=self.quotas
+        )
+
+        self.assertFalse(plan.go)
+        self.assertFalse(plan.checks["vcpu_quota"][0])
+        self.assertIn("AccessDeniedException", plan.checks["vcpu_quota"][1])
+        self.assertTrue(plan.checks["key_pair"][0])
+
+    def test_failed_vcpu_lookup_is_a_failed_check(self):
+        """Test that a connection error while counting vCPUs is reported."""
+        error = EndpointConnectionError(endpoint_url="https://ec2.example")
+        with patch.object(launch_planning, "vcpus_in_use", side_effect=error):
+            plan = launch_planning.plan_launch(
+                self.ec2, "ubuntu", 1, quotas_client=self.quotas
+            )
+
+        self.assertFalse(plan.go)
+        self.assertIn("ec2.example", plan.checks["vcpu_quota"][1])
+
+    def test_unknown_vcpu_count_is_a_failed_check(self):
+        """Test that a type missing from the vCPU table does not pass the quota."""
+        with patch.object(launch_planning, "get_vcpu_counts", return_value={}):
+            plan = launch_planning.plan_launch(
+                self.ec2, "ubuntu", 1, quotas_client=self.quotas
+            )
+
+        self.assertFalse(plan.go)
+        self.assertFalse(plan.checks["vcpu_quota"][0])
+        self.assertIn("unknown", plan.checks["vcpu_quota"][1])
+        self.assertEqual(plan.vcpus_required, 0)
+
+
+class TestLaunchPlanHelpers(unittest.TestCase):
+    """Test cases for the small launch_planning helpers."""
+
+    def test_instance_family(self):
+        """Test family extraction from instance type names."""
+        self.assertEqual(launch_planning.instance_family("m5.large"), "m")
+        self.assertEqual(launch_planning.instance_family("G4dn.xlarge"), "g")
+        self.assertEqual(launch_planning.instance_family("inf2.xlarge"), "inf")
+        self.assertEqual(launch_planning.instance_family("u-6tb1.metal"), "u")
+
+    def test_vcpu_quota_code(self):
+        """Test that multi-letter families are not taken for standard ones."""
+        standard = launch_planning.STANDARD_VCPU_QUOTA_CODE
+        cases = {
+            "m5.large": standard,
+            "im4gn.large": standard,
+            "hpc7g.4xlarge": "L-F7808C92",
+            "inf2.xlarge": "L-1945791B",
+            "trn1.2xlarge": "L-2C3B7624",
+            "dl1.24xlarge": "L-6E869C2A",
+            "vt1.3xlarge": "L-DB2E81BA",
+            "mac2.metal": None,
+            "zz9.large": None,
+        }
+        for instance_type, code in cases.items():
+            with self.subTest(instance_type=instance_type):
+                self.assertEqual(launch_planning.vcpu_quota_code(instance_type), code)
+
+    def test_dry_run_failure_is_reported(self):
+        """Test that dry-run errors other than DryRunOperation fail the batch."""
+        client = Mock()
+        client.run_instances.side_effect = ClientError(
+            {"Error": {"Code": "UnauthorizedOperation", "Message": "denied"}},
+            "RunInstances",
+        )
+        params = {
+            "ami": "ami-1",
+            "instance_type": "t2.micro",
+            "key_name": "k",
+            "security_group_ids": ("sg-1",),
+        }
+
+        ok, detail = launch_planning._dry_run_batch(client, params, 3)
+
+        self.assertFalse(ok)
+        self.assertIn("UnauthorizedOperation", detail)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,252 @@
+"""
+Unit tests for launch_profiles.py module.
+
+This module contains tests for the cached AMI resolver with proper mocking
+to avoid actual AWS API calls during testing.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import launch_profiles
+
+
+def ssm_response(names: list) -> dict:
+    """Build a get_parameters response that maps each name to a fake AMI."""
+    return {
+        "Parameters": [
+            {"Name": name, "Value": f"ami-{abs(hash(name)) % 10**8:08d}"}
+            for name in names
+        ],
+        "InvalidParameters": [],
+    }
+
+
+class TestAmiResolver(unittest.TestCase):
+    """Test cases for AmiResolver caching and batching."""
+
+    def setUp(self):
+        """Set up a resolver with a temporary disk cache and mocked SSM."""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+        self.cache_path = os.path.join(self.tmp_dir.name, "ami-cache.json")
+        self.mock_ssm = Mock()
+        self.mock_ssm.get_parameters.side_effect = lambda Names: ssm_response(Names)
+        self.factory = Mock(return_value=self.mock_ssm)
+        self.now = 1000.0
+        self.resolver = self.make_resolver()
+
+    def make_resolver(self):
+        """Create a resolver sharing this test's cache file and clock."""
+        return launch_profiles.AmiResolver(
+            ttl_seconds=60,
+            cache_path=self.cache_path,
+            client_factory=self.factory,
+            clock=lambda: self.now,
+        )
+
+    def test_resolve_batches_profiles_into_one_call(self):
+        """Test that all built-in profiles resolve with a single call."""
+        result = self.resolver.resolve(list(launch_profiles.PROFILES), "eu-west-1")
+
+        self.assertEqual(set(result), set(launch_profiles.PROFILES))
+        self.mock_ssm.get_parameters.assert_called_once()
+        self.factory.assert_called_once_with("eu-west-1")
+
+    def test_resolve_chunks_more_than_ten_parameters(self):
+        """Test that more than 10 parameters are split across calls."""
+        extra = {
+            f"p{n}": launch_profiles.LaunchProfile(
+                name=f"p{n}", ami_parameter=f"/param/{n}", default_ami="ami-0"
+            )
+            for n in range(12)
+        }
+        with patch.dict(launch_profiles.PROFILES, extra):
+            self.resolver.resolve(list(extra), "us-east-1")
+
+        sizes = [
+            len(c.kwargs["Names"]) for c in self.mock_ssm.get_parameters.call_args_list
+        ]
+        self.assertEqual(sizes, [10, 2])
+
+    def test_memory_cache_avoids_repeat_calls(self):
+        """Test that a second lookup within the TTL makes no API call."""
+        first = self.resolver.resolve_one("ubuntu", "us-west-2")
+        second = self.resolver.resolve_one("ubuntu", "us-west-2")
+
+        self.assertEqual(first, second)
+        self.mock_ssm.get_parameters.assert_called_once()
+
+    def test_disk_cache_is_shared_between_resolvers(self):
+        """Test that a fresh resolver reads AMIs persisted by another."""
+        first = self.resolver.resolve_one("linux2", "us-west-2")
+
+        second = self.make_resolver().resolve_one("linux2", "us-west-2")
+
+        self.assertEqual(first, second)
+        self.mock_ssm.get_parameters.assert_called_once()
+
+    def test_regions_are_cached_separately(self):
+        """Test that each region triggers its own lookup."""
+        self.resolver.resolve_one("linux2023", "us-east-1")
+        self.resolver.resolve_one("linux2023", "ap-south-1")
+
+        self.assertEqual(self.mock_ssm.get_parameters.call_count, 2)
+
+    def test_expired_entries_are_refreshed(self):
+        """Test that entries older than the TTL are fetched again."""
+        self.resolver.resolve_one("ubuntu", "us-east-1")
+        self.now += 61
+
+        self.resolver.resolve_one("ubuntu", "us-east-1")
+
+        self.assertEqual(self.mock_ssm.get_parameters.call_count, 2)
+
+    def test_invalid_parameters_raise(self):
+        """Test that parameters unknown to SSM raise LookupError."""
+        self.mock_ssm.get_parameters.side_effect = None
+        self.mock_ssm.get_parameters.return_value = {
+            "Parameters": [],
+            "InvalidParameters": ["/aws/service/missing"],
+        }
+
+        with self.assertRaises(LookupError):
+            self.resolver.resolve_one("ubuntu", "us-east-1")
+
+    def test_launch_params_without_region_uses_default_ami(self):
+        """Test that no lookup happens when no region is requested."""
+        params = self.resolver.launch_params("ubuntu")
+
+        self.assertEqual(params["ami"], launch_profiles.PROFILES["ubuntu"].default_ami)
+        self.assertEqual(params["key_name"], "private-ec2")
+        self.factory.assert_not_called()
+
+    def test_corrupt_disk_cache_is_ignored(self):
+        """Test that an unreadable cache file falls back to a lookup."""
+        with open(self.cache_path, "w", encoding="utf-8") as cache_file:
+            cache_file.write("{not json")
+
+        self.make_resolver().resolve_one("ubuntu", "us-east-1")
+
+        self.mock_ssm.get_parameters.assert_called_once()
+
+    def test_unwritable_disk_cache_is_logged(self):
+        """Test that a cache that cannot be written keeps working from memory."""
+        with open(self.cache_path, "w", encoding="utf-8"):
+            pass
+        self.cache_path = os.path.join(
+            self.cache_path, "ami-cache.json"
+        )  # Under a file
+        resolver = self.make_resolver()
+
+        with self.assertLogs("launch_profiles", level="WARNING"):
+            first = resolver.resolve_one("ubuntu", "us-east-1")
+        second = resolver.resolve_one("ubuntu", "us-east-1")
+
+        self.assertEqual(first, second)
+        self.mock_ssm.get_parameters.assert_called_once()
+
+    def test_ssm_is_called_without_the_lock(self):
+        """Test that a slow SSM call does not block other lookups."""
+
+        def get_parameters(Names):
+            self.assertFalse(self.resolver._lock.locked())
+            return ssm_response(Names)
+
+        self.mock_ssm.get_parameters.side_effect = get_parameters
+
+        self.resolver.resolve_one("ubuntu", "us-east-1")
+
+        self.mock_ssm.get_parameters.assert_called_once()
+
+    def test_launch_params_in_unregistered_region_raises(self):
+        """Test that us-east-1 key pairs and groups are never used elsewhere."""
+        with self.assertRaises(ValueError):
+            self.resolver.launch_params("ubuntu", "eu-west-1")
+
+        self.factory.assert_not_called()
+
+
+class TestProfileRegistry(unittest.TestCase):
+    """Test cases for profile registration and alias resolution."""
+
+    def setUp(self):
+        """Restore the registry after each test."""
+        for registry in (launch_profiles.PROFILES, launch_profiles.ALIASES):
+            patcher = patch.dict(registry, registry)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_normalize_ami_type(self):
+        """Test that case and punctuation are ignored."""
+        for raw in (" Linux 2023 ", "linux-2023", "LINUX2023", "linux_2023"):
+            with self.subTest(raw=raw):
+                self.assertEqual(launch_profiles.normalize_ami_type(raw), "linux2023")
+
+    def test_resolve_builtin_aliases(self):
+        """Test that built-in aliases map to their profiles."""
+        self.assertEqual(launch_profiles.resolve_ami_type("AL2").name, "linux2")
+        self.assertEqual(
+            launch_profiles.resolve_ami_type("Amazon Linux 2023").name, "linux2023"
+        )
+
+    def test_resolve_unknown_raises(self):
+        """Test that unknown AMI types raise ValueError."""
+        with self.assertRaises(ValueError):
+            launch_profiles.resolve_ami_type("windows")
+
+    def test_register_new_profile(self):
+        """Test that new profiles are usable without touching creating_instances."""
+        profile = launch_profiles.LaunchProfile(
+            name="debian12",
+            ami_parameter="/aws/service/debian/release/12/latest/amd64",
+            default_ami="ami-debian",
+            label="Debian 12",
+        )
+
+        launch_profiles.register_profile(profile, aliases=("bookworm",))
+
+        self.assertIs(launch_profiles.resolve_ami_type("Bookworm"), profile)
+
+    def test_conflicting_alias_raises(self):
+        """Test that an alias cannot be claimed by two profiles."""
+        profile = launch_profiles.LaunchProfile(
+            name="other", ami_parameter="/p", default_ami="ami-0"
+        )
+
+        with self.assertRaises(ValueError):
+            launch_profiles.register_profile(profile, aliases=("al2",))
+
+    def test_register_network(self):
+        """Test that a region's key pair and groups are used in that region."""
+        launch_profiles.register_network("eu-west-1", "eu-key", ["sg-eu"])
+
+        for profile in launch_profiles.PROFILES.values():
+            with self.subTest(profile=profile.name):
+                self.assertEqual(profile.network("eu-west-1"), ("eu-key", ("sg-eu",)))
+                self.assertEqual(profile.network()[0], "private-ec2")
+        self.assertIs(
+            launch_profiles.resolve_ami_type("al2"), launch_profiles.PROFILES["linux2"]
+        )
+
+    def test_register_network_for_some_profiles(self):
+        """Test that only the named profiles are updated."""
+        launch_profiles.register_network(
+            "ap-south-1", "ap-key", ("sg-ap",), profile_names=("ubuntu",)
+        )
+
+        self.assertEqual(
+            launch_profiles.PROFILES["ubuntu"].network("ap-south-1")[0], "ap-key"
+        )
+        with self.assertRaises(ValueError):
+            launch_profiles.PROFILES["linux2"].network("ap-south-1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,276 @@
+"""
+Unit tests for launch_tracking.py module.
+
+This module contains tests for the batched launch tracker with proper mocking
+to avoid actual AWS API calls during testing.
+"""
+
+import os
+import sys
+import unittest
+from unittest.mock import Mock
+
+from botocore.exceptions import ClientError
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import launch_tracking
+
+
+def status_response(states: dict) -> dict:
+    """Build a describe_instance_status response from an ID -> state map."""
+    return {
+        "InstanceStatuses": [
+            {"InstanceId": instance_id, "InstanceState": {"Name": state}}
+            for instance_id, state in states.items()
+        ]
+    }
+
+
+class TestLaunchTracker(unittest.TestCase):
+    """Test cases for LaunchTracker polling."""
+
+    def setUp(self):
+        """Set up a tracker with a mocked EC2 client."""
+        self.mock_client = Mock()
+        self.tracker = launch_tracking.LaunchTracker(self.mock_client)
+
+    def test_chunked(self):
+        """Test that IDs are split into fixed-size chunks."""
+        chunks = list(launch_tracking.chunked(list(range(7)), 3))
+
+        self.assertEqual(chunks, [[0, 1, 2], [3, 4, 5], [6]])
+
+    def test_poll_batches_ids_into_chunks(self):
+        """Test that 250 pending IDs cost three status calls per cycle."""
+        instance_ids = [f"i-{n:04d}" for n in range(250)]
+        self.tracker.track(instance_ids)
+        self.mock_client.describe_instance_status.return_value = {
+            "InstanceStatuses": []
+        }
+
+        self.tracker.poll()
+
+        calls = self.mock_client.describe_instance_status.call_args_list
+        self.assertEqual([len(c.kwargs["InstanceIds"]) for c in calls], [100, 100, 50])
+        self.assertTrue(all(c.kwargs["IncludeAllInstances"] for c in calls))
+
+    def test_poll_settles_instances(self):
+        """Test that running and terminated instances stop being polled."""
+        self.tracker.track(["i-1", "i-2", "i-3"])
+        self.mock_client.describe_instance_status.return_value = status_response(
+            {"i-1": "running", "i-2": "pending", "i-3": "terminated"}
+        )
+
+        changes = self.tracker.poll()
+
+        self.assertEqual(changes, {"i-1": "running", "i-3": "terminated"})
+        self.assertEqual(self.tracker.pending, ["i-2"])
+        self.assertEqual(self.tracker.ready, ["i-1"])
+        self.assertEqual(self.tracker.failed, ["i-3"])
+        self.assertFalse(self.tracker.done())
+
+        self.mock_client.describe_instance_status.return_value = status_response(
+            {"i-2": "running"}
+        )
+        self.tracker.poll()
+
+        self.mock_client.describe_instance_status.assert_called_with(
+            InstanceIds=["i-2"], IncludeAllInstances=True
+        )
+        self.assertTrue(self.tracker.done())
+
+    def test_poll_tolerates_not_yet_visible_instances(self):
+        """Test that InvalidInstanceID.NotFound leaves the chunk pending."""
+        self.tracker.track(["i-new"])
+        self.mock_client.describe_instance_status.side_effect = ClientError(
+            {"Error": {"Code": "InvalidInstanceID.NotFound", "Message": "x"}},
+            "DescribeInstanceStatus",
+        )
+
+        self.assertEqual(self.tracker.poll(), {})
+        self.assertEqual(self.tracker.pending, ["i-new"])
+
+    def test_poll_skips_unknown_ids_but_polls_the_rest(self):
+        """Test that one unknown ID does not hold back the rest of its chunk."""
+        self.tracker.track(["i-0aaa", "i-0bad", "i-0ccc"])
+        not_found = ClientError(
+            {
+                "Error": {
+                    "Code": "InvalidInstanceID.NotFound",
+                    "Message": "The instance ID 'i-0bad' does not exist",
+                }
+            },
+            "DescribeInstanceStatus",
+        )
+        self.mock_client.describe_instance_status.side_effect = [
+            not_found,
+            status_response({"i-0aaa": "running", "i-0ccc": "pending"}),
+        ]
+
+        changes = self.tracker.poll()
+
+        self.assertEqual(changes, {"i-0aaa": "running"})
+        retry = self.mock_client.describe_instance_status.call_args_list[1]
+        self.assertEqual(retry.kwargs["InstanceIds"], ["i-0aaa", "i-0ccc"])
+        self.assertEqual(self.tracker.pending, ["i-0bad", "i-0ccc"])
+
+    def test_poll_raises_other_errors(self):
+        """Test that unexpected API errors are not swallowed."""
+        self.tracker.track(["i-1"])
+        self.mock_client.describe_instance_status.side_effect = ClientError(
+            {"Error": {"Code": "UnauthorizedOperation", "Message": "x"}},
+            "DescribeInstanceStatus",
+        )
+
+        with self.assertRaises(ClientError):
+            self.tracker.poll()
+
+    def test_poll_without_pending_makes_no_calls(self):
+        """Test that an empty tracker is done and does not call the API."""
+        self.assertEqual(self.tracker.poll(), {})
+        self.assertTrue(self.tracker.done())
+        self.mock_client.describe_instance_status.assert_not_called()
+
+
+def describe_response(states: dict) -> dict:
+    """Build a describe_instances response from an ID -> state map."""
+    return {
+        "Reservations": [
+            {
+                "Instances": [
+                    {"InstanceId": instance_id, "State": {"Name": state}}
+                    for instance_id, state in states.items()
+                ]
+            }
+        ]
+    }
+
+
+class FakeClock:
+    """Deterministic clock whose sleep() advances time instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestWaitForInstances(unittest.TestCase):
+    """Test cases for the batched wait_for_instances waiter."""
+
+    def setUp(self):
+        """Set up a mocked EC2 client and a fake clock."""
+        self.mock_client = Mock()
+        self.clock = FakeClock()
+
+    def wait(self, instance_ids, **kwargs):
+        """Call wait_for_instances with the fake clock."""
+        return launch_tracking.wait_for_instances(
+            self.mock_client,
+            instance_ids,
+            sleep=self.clock.sleep,
+            clock=self.clock,
+            **kwargs,
+        )
+
+    def test_large_batch_uses_chunked_calls(self):
+        """Test that 1500 instances are described in two calls per cycle."""
+        instance_ids = [f"i-{n:05d}" for n in range(1500)]
+        self.mock_client.describe_instances.side_effect = lambda InstanceIds: (
+            describe_response(dict.fromkeys(InstanceIds, "running"))
+        )
+
+        result = self.wait(instance_ids)
+
+        self.assertEqual(self.mock_client.describe_instances.call_count, 2)
+        self.assertEqual(set(result), set(instance_ids))
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_settled_instances_leave_the_working_set(self):
+        """Test that later cycles only describe instances still pending."""
+        self.mock_client.describe_instances.side_effect = [
+            describe_response({"i-1": "running", "i-2": "pending"}),
+            describe_response({"i-2": "running"}),
+        ]
+
+        result = self.wait(["i-1", "i-2"])
+
+        second_call = self.mock_client.describe_instances.call_args_list[1]
+        self.assertEqual(second_call.kwargs["InstanceIds"], ["i-2"])
+        self.assertEqual(result, {"i-1": 0.0, "i-2": 2.0})
+
+    def test_adaptive_backoff_while_idle(self):
+        """Test that the delay grows while nothing changes, capped at max_delay."""
+        self.mock_client.describe_instances.side_effect = [
+            describe_response({"i-1": "pending"}),
+            describe_response({"i-1": "pending"}),
+            describe_response({"i-1": "pending"}),
+            describe_response({"i-1": "pending"}),
+            describe_response({"i-1": "running"}),
+        ]
+
+        self.wait(["i-1"], min_delay=2.0, max_delay=5.0)
+
+        self.assertEqual(self.clock.sleeps, [3.0, 4.5, 5.0, 5.0])
+
+    def test_failed_instances_raise(self):
+        """Test that a terminated instance raises with partial results."""
+        self.mock_client.describe_instances.return_value = describe_response(
+            {"i-1": "running", "i-2": "terminated"}
+        )
+
+        with self.assertRaises(launch_tracking.InstanceWaitError) as context:
+            self.wait(["i-1", "i-2"])
+
+        self.assertEqual(context.exception.ready, {"i-1": 0.0})
+        self.assertEqual(context.exception.failed, {"i-2": "terminated"})
+        self.assertEqual(context.exception.pending, [])
+
+    def test_unknown_id_does_not_hide_the_rest(self):
+        """Test that a bogus ID times out alone while the others become ready."""
+        running = ["i-0001", "i-0002", "i-0003"]
+
+        def describe(InstanceIds):
+            if "i-0bad" in InstanceIds:
+                raise ClientError(
+                    {
+                        "Error": {
+                            "Code": "InvalidInstanceID.NotFound",
+                            "Message": "The instance ID 'i-0bad' does not exist",
+                        }
+                    },
+                    "DescribeInstances",
+                )
+            return describe_response(dict.fromkeys(InstanceIds, "running"))
+
+        self.mock_client.describe_instances.side_effect = describe
+
+        with self.assertRaises(launch_tracking.InstanceWaitError) as context:
+            self.wait([*running, "i-0bad"], timeout=10.0)
+
+        self.assertEqual(set(context.exception.ready), set(running))
+        self.assertEqual(context.exception.pending, ["i-0bad"])
+
+    def test_timeout_raises_with_pending(self):
+        """Test that instances still pending at the deadline are reported."""
+        self.mock_client.describe_instances.return_value = describe_response(
+            {"i-1": "pending"}
+        )
+
+        with self.assertRaises(launch_tracking.InstanceWaitError) as context:
+            self.wait(["i-1"], timeout=10.0)
+
+        self.assertEqual(context.exception.pending, ["i-1"])
+        self.assertLessEqual(self.clock.now, 10.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
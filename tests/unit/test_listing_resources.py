@@ -9,6 +9,11 @@ import unittest
 from unittest.mock import patch, Mock, call
 import sys
 import os
+import threading
+import time
+
+import boto3
+from moto import mock_aws
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
@@ -203,5 +208,123 @@ class TestListingResources(unittest.TestCase):
                 listing_resources.print_instance_ids(mock_ec2)
 
 
+class TestCollectResources(unittest.TestCase):
+    """Test cases for the concurrent collection pipeline."""
+
+    def setUp(self):
+        """Provide mock clients so no real clients are created."""
+        self.clients = {"s3": Mock(), "ec2": Mock()}
+
+    def test_sections_overlap(self):
+        """Test that wall time is the slowest section, not the sum."""
+
+        def slow(result):
+            def call(*args):
+                time.sleep(0.3)
+                return result
+
+            return call
+
+        with (
+            patch("listing_resources.list_buckets", side_effect=slow(["b1"])),
+            patch(
+                "listing_resources.describe_instances",
+                side_effect=slow([{"InstanceId": "i-1"}]),
+            ),
+        ):
+            started = time.perf_counter()
+            sections = list(listing_resources.collect_resources(clients=self.clients))
+            elapsed = time.perf_counter() - started
+
+        self.assertLess(elapsed, 0.55)
+        by_name = {section.name: section for section in sections}
+        self.assertEqual(by_name["buckets"].items, ["b1"])
+        self.assertEqual(by_name["instances"].items, ["i-1"])
+
+    def test_deadline_returns_partial_results(self):
+        """Test that unfinished sections are reported as timed out."""
+        release = threading.Event()
+        self.addCleanup(release.set)
+
+        def blocked(*args):
+            release.wait(5)
+            return []
+
+        with (
+            patch("listing_resources.list_buckets", return_value=["b1"]),
+            patch("listing_resources.describe_instances", side_effect=blocked),
+        ):
+            sections = list(
+                listing_resources.collect_resources(
+                    deadline_seconds=0.2, clients=self.clients
+                )
+            )
+
+        self.assertEqual([s.name for s in sections], ["buckets", "instances"])
+        self.assertEqual(sections[0].items, ["b1"])
+        self.assertTrue(sections[1].timed_out)
+        self.assertIsNone(sections[1].items)
+
+    def test_errors_are_reported_per_section(self):
+        """Test that one failing service does not hide the others."""
+        with (
+            patch("listing_resources.list_buckets", side_effect=RuntimeError("denied")),
+            patch("listing_resources.describe_instances", return_value=[]),
+        ):
+            sections = {
+                s.name: s
+                for s in listing_resources.collect_resources(clients=self.clients)
+            }
+
+        self.assertIsInstance(sections["buckets"].error, RuntimeError)
+        self.assertEqual(sections["instances"].items, [])
+
+    def test_unknown_section(self):
+        """Test that unknown section names are rejected."""
+        with self.assertRaises(ValueError):
+            list(listing_resources.collect_resources(("lambdas",)))
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_collect_against_moto(self):
+        """Test all three sections end to end, creating clients up front."""
+        boto3.client("s3").create_bucket(Bucket="red-bucket")
+        vpc_id = boto3.client("ec2").create_vpc(CidrBlock="10.9.0.0/16")["Vpc"]["VpcId"]
+
+        sections = {
+            s.name: s
+            for s in listing_resources.collect_resources(
+                ("buckets", "instances", "vpcs"), deadline_seconds=30
+            )
+        }
+
+        self.assertEqual(sections["buckets"].items, ["red-bucket"])
+        self.assertEqual(sections["instances"].items, [])
+        self.assertIn(vpc_id, sections["vpcs"].items)
+
+    @patch("builtins.print")
+    def test_print_sections(self, mock_print):
+        """Test the per-section headers."""
+        Section = listing_resources.Section
+        sections = [
+            Section("buckets", items=["b1", "b2"], seconds=0.5),
+            Section("vpcs", error=RuntimeError("denied")),
+            Section("instances", seconds=2.0, timed_out=True),
+        ]
+
+        collected = listing_resources.print_sections(sections)
+
+        mock_print.assert_has_calls(
+            [
+                call("== buckets (2 in 0.50s) =="),
+                call("b1"),
+                call("b2"),
+                call("== vpcs: failed (denied) =="),
+                call("== instances: timed out after 2.0s =="),
+            ]
+        )
+        self.assertEqual(set(collected), {"buckets", "vpcs", "instances"})
+
+
 if __name__ == "__main__":
     unittest.main()
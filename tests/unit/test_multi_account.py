@@ -0,0 +1,281 @@
+"""
+Unit tests for multi_account.py module.
+
+This module contains tests for the assumed-role credential cache and the
+account x region runner, using moto so no real AWS API calls are made.
+"""
+
+import os
+import sys
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from datetime import UTC, datetime
+from unittest.mock import Mock, patch
+
+import boto3
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import multi_account
+
+
+def sts_response(expires_at: float) -> dict:
+    """Build an AssumeRole response expiring at the given epoch time."""
+    return {
+        "Credentials": {
+            "AccessKeyId": "AKIAEXAMPLE",
+            "SecretAccessKey": "secret",
+            "SessionToken": "token",
+            "Expiration": datetime.fromtimestamp(expires_at, tz=UTC),
+        }
+    }
+
+
+class TestCredentialCache(unittest.TestCase):
+    """Test cases for CredentialCache."""
+
+    def setUp(self):
+        """Create a cache around a mocked STS client and a manual clock."""
+        self.now = [1_000_000.0]
+        self.sts = Mock()
+        self.sts.assume_role.side_effect = lambda **_: sts_response(self.now[0] + 3600)
+        self.cache = multi_account.CredentialCache(
+            self.sts, refresh_margin=300, clock=lambda: self.now[0]
+        )
+
+    def test_credentials_are_reused_until_near_expiry(self):
+        """Test that a role is assumed once per credential lifetime."""
+        first = self.cache.session("111111111111")
+        self.now[0] += 3000
+        second = self.cache.session("111111111111")
+
+        self.assertIs(first, second)
+        self.sts.assume_role.assert_called_once()
+        self.assertEqual(
+            self.sts.assume_role.call_args.kwargs["RoleArn"],
+            "arn:aws:iam::111111111111:role/OrganizationAccountAccessRole",
+        )
+
+        self.now[0] += 301  # Inside the refresh margin
+        self.cache.session("111111111111")
+        self.assertEqual(self.sts.assume_role.call_count, 2)
+
+    def test_accounts_are_cached_separately(self):
+        """Test that each account gets its own credentials."""
+        self.cache.session("111111111111")
+        self.cache.session("222222222222")
+
+        self.assertEqual(self.sts.assume_role.call_count, 2)
+
+
+class TestRunMatrix(unittest.TestCase):
+    """Test cases for run_matrix."""
+
+    def test_matrix_cells(self):
+        """Test that list_buckets runs once per account, instances per region."""
+        cells = multi_account.matrix_cells(
+            ["a", "b"],
+            ["us-east-1", "eu-west-1"],
+            ("describe_instances", "list_buckets"),
+        )
+
+        self.assertEqual(len(cells), 2 * 2 + 2)
+        self.assertIn(("a", "us-east-1", "list_buckets"), cells)
+        self.assertNotIn(("a", "eu-west-1", "list_buckets"), cells)
+
+    def test_matrix_cells_validation(self):
+        """Test that unknown operations and empty regions are rejected."""
+        with self.assertRaises(ValueError):
+            multi_account.matrix_cells(["a"], ["us-east-1"], ("list_vpcs",))
+        with self.assertRaises(ValueError):
+            multi_account.matrix_cells(["a"], [], ("list_buckets",))
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_run_matrix_streams_tagged_results(self):
+        """Test a two-account, two-region run against moto."""
+        credentials = multi_account.CredentialCache(boto3.client("sts"))
+        member = credentials.session("222222222222")
+        member.client("s3").create_bucket(Bucket="member-bucket")
+        member.client("ec2", region_name="eu-west-1").run_instances(
+            ImageId="ami-12c6146b", MinCount=2, MaxCount=2
+        )
+
+        results = list(
+            multi_account.run_matrix(
+                ["111111111111", "222222222222"],
+                ["us-east-1", "eu-west-1"],
+                credentials=credentials,
+            )
+        )
+
+        self.assertEqual(len(results), 6)
+        self.assertTrue(all(result.ok for result in results))
+        by_cell = {(r.account_id, r.region, r.operation): r.result for r in results}
+        self.assertEqual(
+            len(by_cell[("222222222222", "eu-west-1", "describe_instances")]), 2
+        )
+        self.assertEqual(
+            by_cell[("111111111111", "eu-west-1", "describe_instances")], []
+        )
+        self.assertEqual(
+            by_cell[("222222222222", "us-east-1", "list_buckets")], ["member-bucket"]
+        )
+
+    def test_failed_cells_do_not_stop_the_run(self):
+        """Test that an AssumeRole failure is reported per cell."""
+        credentials = Mock()
+        credentials.session.side_effect = RuntimeError("AccessDenied")
+
+        results = list(
+            multi_account.run_matrix(
+                ["111111111111"], ["us-east-1"], credentials=credentials
+            )
+        )
+
+        self.assertEqual(len(results), 2)
+        self.assertFalse(any(result.ok for result in results))
+        self.assertIsInstance(results[0].error, RuntimeError)
+
+
+class TestColumnarBatches(unittest.TestCase):
+    """Test cases for the columnar batch helpers."""
+
+    def setUp(self):
+        """Build two minimal instance descriptions."""
+        self.instances = [
+            {
+                "InstanceId": "i-1",
+                "InstanceType": "t3.micro",
+                "State": {"Name": "running"},
+                "Placement": {"AvailabilityZone": "us-east-1a"},
+                "LaunchTime": datetime(2025, 9, 1, tzinfo=UTC),
+                "Tags": [{"Key": "Team", "Value": "red"}],
+            },
+            {"InstanceId": "i-2", "State": {"Name": "stopped"}},
+        ]
+
+    def test_json_round_trip(self):
+        """Test that a batch survives encoding without msgpack."""
+        columns = multi_account.to_columns(self.instances)
+
+        with patch.object(multi_account, "msgpack", None):
+            payload = multi_account.encode_batch(columns)
+
+        self.assertTrue(payload.startswith(b"j"))
+        self.assertEqual(multi_account.decode_batch(payload), columns)
+        self.assertEqual(columns["State"], ["running", "stopped"])
+        self.assertEqual(columns["Tags"], [{"Team": "red"}, {}])
+        self.assertEqual(columns["LaunchTime"][1], None)
+
+    def test_msgpack_marker(self):
+        """Test that msgpack is used when it is installed."""
+        fake = Mock()
+        fake.packb.return_value = b"packed"
+        fake.unpackb.return_value = {"InstanceId": []}
+
+        with patch.object(multi_account, "msgpack", fake):
+            payload = multi_account.encode_batch({"InstanceId": []})
+            self.assertEqual(payload, b"mpacked")
+            self.assertEqual(multi_account.decode_batch(payload), {"InstanceId": []})
+
+    def test_unknown_marker(self):
+        """Test that an unknown format marker is rejected."""
+        with self.assertRaises(ValueError):
+            multi_account.decode_batch(b"x{}")
+
+    def test_rows(self):
+        """Test that a batch rebuilds one dict per instance."""
+        batch = multi_account.InstanceBatch(
+            "111111111111", "us-east-1", multi_account.to_columns(self.instances)
+        )
+
+        rows = list(batch.rows())
+
+        self.assertEqual(len(batch), 2)
+        self.assertEqual(rows[1]["InstanceId"], "i-2")
+        self.assertEqual(rows[0]["AvailabilityZone"], "us-east-1a")
+
+
+class TestSweepInstances(unittest.TestCase):
+    """Test cases for the process-pool sweep."""
+
+    def test_shard_cells(self):
+        """Test that shards cover every cell once and keep accounts together."""
+        shards = multi_account.shard_cells(["a", "b", "c"], ["r1", "r2"], 3)
+
+        self.assertEqual(
+            shards,
+            [
+                [("a", "r1"), ("a", "r2")],
+                [("b", "r1"), ("b", "r2")],
+                [("c", "r1"), ("c", "r2")],
+            ],
+        )
+        self.assertEqual(multi_account.shard_cells([], ["r1"], 4), [])
+        self.assertEqual(len(multi_account.shard_cells(["a"], ["r1"], 8)), 1)
+
+    def test_shard_cells_never_splits_an_account(self):
+        """Test that an account's regions stay together when shards are uneven."""
+        regions = ["r1", "r2", "r3"]
+
+        shards = multi_account.shard_cells(["a", "b", "c", "d", "e"], regions, 2)
+
+        self.assertEqual([len(shard) for shard in shards], [9, 6])
+        for shard in shards:
+            for account_id in {account_id for account_id, _ in shard}:
+                self.assertEqual(
+                    [region for a, region in shard if a == account_id], regions
+                )
+
+    @mock_aws
+    @patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+    def test_sweep_yields_batches_per_cell(self):
+        """Test a sweep against moto with workers run as threads."""
+        member = multi_account.CredentialCache(boto3.client("sts")).session(
+            "222222222222"
+        )
+        member.client("ec2", region_name="eu-west-1").run_instances(
+            ImageId="ami-12c6146b", MinCount=3, MaxCount=3
+        )
+
+        with ThreadPoolExecutor(
+            max_workers=2,
+            initializer=multi_account._init_sweep_worker,
+            initargs=(multi_account.DEFAULT_ROLE_NAME,),
+        ) as executor:
+            batches = list(
+                multi_account.sweep_instances(
+                    ["111111111111", "222222222222"],
+                    ["us-east-1", "eu-west-1"],
+                    processes=2,
+                    executor=executor,
+                )
+            )
+
+        self.assertEqual(len(batches), 4)
+        self.assertTrue(all(batch.ok for batch in batches))
+        sizes = {(b.account_id, b.region): len(b) for b in batches}
+        self.assertEqual(sizes[("222222222222", "eu-west-1")], 3)
+        self.assertEqual(sizes[("111111111111", "eu-west-1")], 0)
+
+    def test_worker_errors_are_reported_per_cell(self):
+        """Test that a failing cell becomes an error batch."""
+        with patch.object(multi_account, "_worker", {}):
+            multi_account._init_sweep_worker("ReadOnly")
+            with patch.object(
+                multi_account.CredentialCache,
+                "session",
+                side_effect=RuntimeError("AccessDenied"),
+            ):
+                results = multi_account._sweep_shard([("111111111111", "us-east-1")])
+
+        self.assertEqual(
+            results, [("111111111111", "us-east-1", None, "RuntimeError: AccessDenied")]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+"""
+Unit tests for rate_limiting.py module.
+
+This module contains tests for the token bucket using a fake clock, so no
+test ever sleeps.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import rate_limiting
+
+
+class FakeClock:
+    """A manual clock whose sleep just advances time."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test cases for TokenBucket."""
+
+    def setUp(self):
+        """Create a 10/s bucket with a burst of 2 on a fake clock."""
+        self.clock = FakeClock()
+        self.bucket = rate_limiting.TokenBucket(
+            rate=10, burst=2, clock=self.clock, sleep=self.clock.sleep
+        )
+
+    def test_burst_is_available_immediately(self):
+        """Test that a full bucket serves its burst without waiting."""
+        self.assertEqual(self.bucket.acquire(), 0.0)
+        self.assertEqual(self.bucket.acquire(), 0.0)
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_acquire_waits_for_refill(self):
+        """Test that an empty bucket waits for exactly one token."""
+        self.bucket.acquire(2)
+
+        waited = self.bucket.acquire()
+
+        self.assertAlmostEqual(waited, 0.1)
+        self.assertAlmostEqual(self.clock.now, 0.1)
+
+    def test_try_acquire_does_not_block(self):
+        """Test that try_acquire fails instead of sleeping."""
+        self.bucket.acquire(2)
+
+        self.assertFalse(self.bucket.try_acquire())
+        self.clock.now += 0.1
+        self.assertTrue(self.bucket.try_acquire())
+        self.assertEqual(self.clock.sleeps, [])
+
+    def test_refill_is_capped_at_burst(self):
+        """Test that idle time never accumulates more than the burst."""
+        self.clock.now += 60
+
+        self.assertTrue(self.bucket.try_acquire(2))
+        self.assertFalse(self.bucket.try_acquire())
+
+    def test_invalid_arguments(self):
+        """Test that impossible configurations are rejected."""
+        with self.assertRaises(ValueError):
+            rate_limiting.TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            self.bucket.acquire(3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,214 @@
+"""
+Unit tests for singleflight.py module.
+
+This module contains tests for thread and asyncio request coalescing.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import unittest
+from unittest.mock import Mock, patch
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import helpers
+import singleflight
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for the thread-based SingleFlight."""
+
+    def test_concurrent_callers_share_one_call(self):
+        """Test that a burst of identical calls makes one upstream call."""
+        flight = singleflight.SingleFlight()
+        release = threading.Event()
+        calls = []
+
+        def slow_listing():
+            calls.append(1)
+            release.wait()
+            return ["bucket"]
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(flight.do("key", slow_listing))
+            )
+            for _ in range(8)
+        ]
+        outcomes = []
+        with patch(
+            "singleflight._record", lambda name, outcome: outcomes.append(outcome)
+        ):
+            for thread in threads:
+                thread.start()
+            while outcomes.count("shared") < 7:
+                time.sleep(0.001)  # Wait until every follower is parked on the leader
+            release.set()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["bucket"]] * 8)
+
+    def test_no_ttl_means_no_cache(self):
+        """Test that sequential calls each go upstream without a TTL."""
+        flight = singleflight.SingleFlight()
+        func = Mock(return_value=1)
+
+        flight.do("key", func)
+        flight.do("key", func)
+
+        self.assertEqual(func.call_count, 2)
+
+    def test_ttl_cache_and_forget(self):
+        """Test that results are reused within the TTL and can be dropped."""
+        now = [0.0]
+        flight = singleflight.SingleFlight(ttl=5, clock=lambda: now[0])
+        func = Mock(return_value=1)
+
+        flight.do("key", func)
+        now[0] = 4.9
+        flight.do("key", func)
+        self.assertEqual(func.call_count, 1)
+
+        flight.forget("key")
+        flight.do("key", func)
+        self.assertEqual(func.call_count, 2)
+
+        now[0] = 100
+        flight.do("key", func)
+        self.assertEqual(func.call_count, 3)
+
+    def test_errors_are_not_cached(self):
+        """Test that a failed call is retried by the next caller."""
+        flight = singleflight.SingleFlight(ttl=60)
+        func = Mock(side_effect=[RuntimeError("throttled"), 7])
+
+        with self.assertRaises(RuntimeError):
+            flight.do("key", func)
+
+        self.assertEqual(flight.do("key", func), 7)
+
+    def test_helpers_listings_are_coalesced_per_client(self):
+        """Test that helpers keys listings by client."""
+        first, second = Mock(), Mock()
+        for client in (first, second):
+            client.list_buckets.return_value = {"Buckets": [{"Name": "b"}]}
+
+        self.assertEqual(helpers.list_buckets(first), ["b"])
+        self.assertEqual(helpers.list_buckets(second), ["b"])
+
+        first.list_buckets.assert_called_once()
+        second.list_buckets.assert_called_once()
+
+    def test_describe_instances_accepts_a_field_list(self):
+        """Test that a list of fields still makes a hashable key."""
+        client = Mock()
+        with patch.object(helpers, "_describe_instances", return_value=[]) as body:
+            self.assertEqual(
+                helpers.describe_instances(client, fields=["InstanceId"]), []
+            )
+
+        body.assert_called_once_with(client, None, ["InstanceId"])
+
+
+class TestAsyncSingleFlight(unittest.TestCase):
+    """Test cases for the asyncio AsyncSingleFlight."""
+
+    def test_concurrent_coroutines_share_one_call(self):
+        """Test that gathered identical coroutines await one call."""
+        flight = singleflight.AsyncSingleFlight()
+        calls = []
+
+        async def listing():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return ["bucket"]
+
+        async def burst():
+            return await asyncio.gather(*(flight.do("key", listing) for _ in range(5)))
+
+        results = asyncio.run(burst())
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [["bucket"]] * 5)
+
+    def test_errors_reach_every_waiter(self):
+        """Test that followers see the leader's error."""
+        flight = singleflight.AsyncSingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("throttled")
+
+        async def burst():
+            return await asyncio.gather(
+                *(flight.do("key", failing) for _ in range(3)), return_exceptions=True
+            )
+
+        results = asyncio.run(burst())
+
+        self.assertTrue(all(isinstance(r, RuntimeError) for r in results))
+        self.assertEqual(flight._calls, {})
+
+    def test_cancelled_first_caller_does_not_cancel_the_rest(self):
+        """Test that followers still get the result when the first caller leaves."""
+        flight = singleflight.AsyncSingleFlight()
+        calls = []
+
+        async def listing():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return ["bucket"]
+
+        async def burst():
+            first = asyncio.ensure_future(flight.do("key", listing))
+            await asyncio.sleep(0)  # The first caller starts the call
+            followers = [
+                asyncio.ensure_future(flight.do("key", listing)) for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            first.cancel()
+            return first, await asyncio.gather(*followers)
+
+        first, results = asyncio.run(burst())
+
+        self.assertTrue(first.cancelled())
+        self.assertEqual(results, [["bucket"]] * 2)
+        self.assertEqual(len(calls), 1)
+
+    def test_call_is_cancelled_when_every_caller_leaves(self):
+        """Test that the shared call stops once nobody awaits it."""
+        flight = singleflight.AsyncSingleFlight()
+        stopped = []
+
+        async def listing():
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                stopped.append(1)
+                raise
+
+        async def burst():
+            callers = [
+                asyncio.ensure_future(flight.do("key", listing)) for _ in range(2)
+            ]
+            await asyncio.sleep(0)
+            for caller in callers:
+                caller.cancel()
+            await asyncio.gather(*callers, return_exceptions=True)
+            await asyncio.sleep(0)  # Let the shared task see its cancellation
+
+        asyncio.run(burst())
+
+        self.assertEqual(stopped, [1])
+        self.assertEqual(flight._calls, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""
+Unit tests for snapshot_diff.py module.
+
+This module contains tests for the snapshot diff engine over instance and
+bucket listings.
+"""
+
+import os
+import sys
+import unittest
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import snapshot_diff
+
+
+def make_instance(instance_id, state="running", **tags):
+    """Build a minimal DescribeInstances instance dict."""
+    return {
+        "InstanceId": instance_id,
+        "State": {"Code": 16, "Name": state},
+        "Tags": [{"Key": key, "Value": value} for key, value in tags.items()],
+    }
+
+
+class TestSnapshotDiff(unittest.TestCase):
+    """Test cases for snapshot_diff change events."""
+
+    def test_added_changed_removed(self):
+        """Test that each kind of change is reported once."""
+        old = [make_instance("i-1"), make_instance("i-2"), make_instance("i-3")]
+        new = [
+            make_instance("i-1"),
+            make_instance("i-2", "stopped"),
+            make_instance("i-4"),
+        ]
+
+        events = {event.record_id: event for event in snapshot_diff.diff(old, new)}
+
+        self.assertEqual(events["i-2"].kind, "changed")
+        self.assertEqual(events["i-3"].kind, "removed")
+        self.assertEqual(events["i-4"].kind, "added")
+        self.assertNotIn("i-1", events)
+
+    def test_field_level_deltas(self):
+        """Test that nested fields are reported by dotted path."""
+        old = [make_instance("i-1", Team="red")]
+        new = [make_instance("i-1", "stopped", Team="blue", Env="dev")]
+
+        (event,) = snapshot_diff.diff(old, new)
+
+        self.assertEqual(
+            event.changes,
+            {
+                "State.Name": ("running", "stopped"),
+                "Tags.Env": (None, "dev"),
+                "Tags.Team": ("red", "blue"),
+            },
+        )
+
+    def test_tag_order_is_not_a_change(self):
+        """Test that reordered tags produce no event."""
+        old = [make_instance("i-1", Team="red", Env="prod")]
+        new = [make_instance("i-1", Env="prod", Team="red")]
+
+        self.assertEqual(list(snapshot_diff.diff(old, new)), [])
+
+    def test_ignore_fields(self):
+        """Test that ignored fields never cause a change."""
+        old = [make_instance("i-1")]
+        new = [make_instance("i-1", "stopped")]
+
+        self.assertEqual(
+            list(snapshot_diff.diff(old, new, ignore_fields=("State",))), []
+        )
+
+    def test_streams_new_listing(self):
+        """Test that events are produced before the new listing is exhausted."""
+        consumed = []
+
+        def stream():
+            for instance_id in ("i-1", "i-2"):
+                consumed.append(instance_id)
+                yield make_instance(instance_id)
+
+        events = snapshot_diff.diff(iter([]), stream())
+
+        self.assertEqual(next(events).record_id, "i-1")
+        self.assertEqual(consumed, ["i-1"])
+
+    def test_digest_only_snapshot(self):
+        """Test that a digest-only snapshot still detects changes."""
+        snapshot = snapshot_diff.Snapshot.build(
+            [make_instance("i-1")], keep_records=False
+        )
+
+        (event,) = snapshot_diff.diff(snapshot, [make_instance("i-1", "stopped")])
+
+        self.assertEqual(event.kind, "changed")
+        self.assertIsNone(event.old)
+        self.assertEqual(event.changes, {})
+
+    def test_bucket_names(self):
+        """Test diffing list_buckets output, where names are their own IDs."""
+        events = snapshot_diff.diff(
+            ["logs", "data"], ["data", "backups"], key=snapshot_diff.BUCKET_KEY
+        )
+
+        self.assertEqual(
+            snapshot_diff.summarize(events), {"added": 1, "changed": 0, "removed": 1}
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,275 @@
+"""
+Unit tests for uploads.py module.
+
+This module contains tests for the multipart upload helper, including resumes
+and stale-upload cleanup, using moto so no real AWS API calls are made.
+"""
+
+import mmap
+import os
+import sys
+import tempfile
+import unittest
+from datetime import timedelta
+from unittest.mock import patch
+
+import boto3
+from moto import mock_aws
+
+# Add the project root to the Python path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+import uploads
+
+PART = uploads.MIN_PART_SIZE
+
+
+class TestPartLayout(unittest.TestCase):
+    """Test cases for part sizing and the memory-mapped part body."""
+
+    def test_part_size_minimum(self):
+        """Test that parts below S3's minimum are rejected."""
+        with self.assertRaises(ValueError):
+            uploads.part_size_for(100, part_size=1024)
+
+    def test_part_size_grows_for_huge_files(self):
+        """Test that the part size grows to stay within 10,000 parts."""
+        size = 2 * 1024**4  # 2 TiB
+        part_size = uploads.part_size_for(size, PART)
+
+        self.assertLessEqual(len(uploads.part_ranges(size, part_size)), 10000)
+        self.assertEqual(part_size % (1024 * 1024), 0)
+
+    def test_part_ranges(self):
+        """Test that parts cover the file exactly, with a short last part."""
+        self.assertEqual(
+            uploads.part_ranges(25, 10), [(1, 0, 10), (2, 10, 10), (3, 20, 5)]
+        )
+
+    def test_part_body_reads_and_seeks(self):
+        """Test the seekable window over a memory map."""
+        with tempfile.TemporaryFile() as source:
+            source.write(b"0123456789")
+            source.flush()
+            with mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+                body = uploads._PartBody(mapping, 3, 4)
+
+                self.assertEqual(len(body), 4)
+                self.assertEqual(body.read(3), b"345")
+                self.assertEqual(body.read(), b"6")
+                self.assertEqual(body.read(), b"")
+                body.seek(0)
+                self.assertEqual(body.read(), b"3456")
+                self.assertEqual(body.seek(-1, os.SEEK_END), 3)
+                self.assertEqual(body.tell(), 3)
+
+
+@mock_aws
+@patch.dict(os.environ, {"AWS_DEFAULT_REGION": "us-east-1"})
+class TestUploadFile(unittest.TestCase):
+    """Test cases for upload_file against moto."""
+
+    def setUp(self):
+        """Create a bucket and a three-part source file."""
+        self.client = boto3.client("s3", region_name="us-east-1")
+        self.client.create_bucket(Bucket="artifacts")
+        handle, self.path = tempfile.mkstemp()
+        self.data = os.urandom(2 * PART + 1234)
+        with os.fdopen(handle, "wb") as source:
+            source.write(self.data)
+        self.addCleanup(os.remove, self.path)
+
+    def stored(self, key: str) -> bytes:
+        """Read an object back."""
+        return self.client.get_object(Bucket="artifacts", Key=key)["Body"].read()
+
+    def open_uploads(self) -> list:
+        """List the open multipart uploads in the bucket."""
+        return self.client.list_multipart_uploads(Bucket="artifacts").get("Uploads", [])
+
+    def fail_part(self, failing: int):
+        """Patch upload_part to fail for one part number."""
+        upload_part = self.client.upload_part
+
+        def flaky(**kwargs):
+            if kwargs["PartNumber"] == failing:
+                raise ConnectionError("connection reset")
+            return upload_part(**kwargs)
+
+        return patch.object(self.client, "upload_part", side_effect=flaky)
+
+    def test_small_file_single_put(self):
+        """Test that a file of one part is sent with PutObject."""
+        with open(self.path, "wb") as source:
+            source.write(b"tiny")
+
+        result = uploads.upload_file(self.path, "artifacts", "tiny", client=self.client)
+
+        self.assertIsNone(result.upload_id)
+        self.assertEqual(self.stored("tiny"), b"tiny")
+
+    def test_multipart_upload(self):
+        """Test that parts are uploaded concurrently and reassembled."""
+        result = uploads.upload_file(
+            self.path, "artifacts", "big", client=self.client, part_size=PART
+        )
+
+        self.assertEqual(result.parts, 3)
+        self.assertEqual(result.bytes_sent, len(self.data))
+        self.assertEqual(result.reused_parts, 0)
+        self.assertEqual(self.stored("big"), self.data)
+        self.assertEqual(self.open_uploads(), [])
+
+    def test_parts_carry_content_md5(self):
+        """Test that every part is sent with its checksum."""
+        with patch.object(
+            self.client, "upload_part", wraps=self.client.upload_part
+        ) as upload_part:
+            uploads.upload_file(
+                self.path, "artifacts", "big", client=self.client, part_size=PART
+            )
+
+        self.assertEqual(upload_part.call_count, 3)
+        for call in upload_part.call_args_list:
+            self.assertIn("ContentMD5", call.kwargs)
+
+    def test_failure_leaves_upload_open_then_resumes(self):
+        """Test that a second call sends only the parts that are missing."""
+        with (
+            self.fail_part(2),
+            self.assertRaises(uploads.UploadIncompleteError) as raised,
+        ):
+            uploads.upload_file(
+                self.path,
+                "artifacts",
+                "big",
+                client=self.client,
+                part_size=PART,
+                concurrency=1,
+            )
+        self.assertEqual(raised.exception.completed, [1])
+        self.assertIn(2, raised.exception.failed)
+        self.assertEqual(len(self.open_uploads()), 1)
+
+        result = uploads.upload_file(
+            self.path, "artifacts", "big", client=self.client, part_size=PART
+        )
+
+        self.assertEqual(result.upload_id, raised.exception.upload_id)
+        self.assertEqual(result.reused_parts, 1)
+        self.assertEqual(result.bytes_sent, len(self.data) - PART)
+        self.assertEqual(self.stored("big"), self.data)
+
+    def test_changed_parts_are_sent_again(self):
+        """Test that a stored part is not reused once the local bytes change."""
+        with self.fail_part(3), self.assertRaises(uploads.UploadIncompleteError):
+            uploads.upload_file(
+                self.path,
+                "artifacts",
+                "big",
+                client=self.client,
+                part_size=PART,
+                concurrency=1,
+            )
+        self.data = b"x" + self.data[1:]
+        with open(self.path, "wb") as source:
+            source.write(self.data)
+
+        result = uploads.upload_file(
+            self.path, "artifacts", "big", client=self.client, part_size=PART
+        )
+
+        self.assertEqual(result.reused_parts, 1)  # Part 2 only
+        self.assertEqual(self.stored("big"), self.data)
+
+    def test_empty_file(self):
+        """Test that an empty file is one PutObject and cannot be resumed."""
+        open(self.path, "wb").close()
+
+        result = uploads.upload_file(
+            self.path, "artifacts", "empty", client=self.client
+        )
+
+        self.assertEqual(self.stored("empty"), b"")
+        self.assertEqual(result.size, 0)
+        with self.assertRaises(ValueError):
+            uploads.upload_file(
+                self.path, "artifacts", "empty", client=self.client, upload_id="u-1"
+            )
+
+    def test_extra_args_are_rejected_on_resume(self):
+        """Test that settings an open upload already has are not silently dropped."""
+        with self.fail_part(2), self.assertRaises(uploads.UploadIncompleteError):
+            uploads.upload_file(
+                self.path,
+                "artifacts",
+                "big",
+                client=self.client,
+                part_size=PART,
+                concurrency=1,
+            )
+
+        with (
+            patch.object(self.client, "upload_part") as upload_part,
+            self.assertRaises(ValueError),
+        ):
+            uploads.upload_file(
+                self.path,
+                "artifacts",
+                "big",
+                client=self.client,
+                part_size=PART,
+                ContentType="application/x-tar",
+            )
+
+        upload_part.assert_not_called()
+        result = uploads.upload_file(
+            self.path,
+            "artifacts",
+            "big",
+            client=self.client,
+            part_size=PART,
+            resume=False,
+            ContentType="application/x-tar",
+        )
+        self.assertEqual(result.reused_parts, 0)
+        self.assertEqual(
+            self.client.head_object(Bucket="artifacts", Key="big")["ContentType"],
+            "application/x-tar",
+        )
+
+    def test_abort_on_failure(self):
+        """Test that nothing is left open when asked to abort."""
+        with self.fail_part(1), self.assertRaises(uploads.UploadIncompleteError):
+            uploads.upload_file(
+                self.path,
+                "artifacts",
+                "big",
+                client=self.client,
+                part_size=PART,
+                abort_on_failure=True,
+            )
+
+        self.assertEqual(self.open_uploads(), [])
+
+    def test_abort_stale_uploads(self):
+        """Test that only uploads older than the threshold are aborted."""
+        upload_id = self.client.create_multipart_upload(Bucket="artifacts", Key="old")[
+            "UploadId"
+        ]
+        initiated = self.open_uploads()[0]["Initiated"]
+
+        kept = uploads.abort_stale_uploads(
+            self.client, "artifacts", now=initiated + timedelta(hours=1)
+        )
+        aborted = uploads.abort_stale_uploads(
+            self.client, "artifacts", now=initiated + timedelta(days=2)
+        )
+
+        self.assertEqual(kept, [])
+        self.assertEqual(aborted, [("old", upload_id)])
+        self.assertEqual(self.open_uploads(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
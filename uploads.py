@@ -0,0 +1,361 @@
+"""
+Parallel, resumable multipart uploads to S3.
+
+``upload_file`` memory-maps the source file and uploads fixed-size parts
+concurrently in the shared "s3" pool. Each part is sent straight out of the
+mapping through a small seekable window, so a multi-GB file is never read into
+memory; only the pages being hashed or sent are resident. Every part carries a
+Content-MD5 header, which S3 checks before accepting the part.
+
+If some parts fail, the upload is left open and ``UploadIncompleteError`` is
+raised. Calling ``upload_file`` again with the same bucket and key resumes the
+most recent open upload. Parts already in S3 are kept when their size and ETag
+match the local part's MD5, and only the rest are sent. (With SSE-KMS or
+SSE-C the part ETags are not MD5 digests, so every part is sent again.)
+Object settings such as ContentType are fixed when an upload starts, so
+resuming with ``extra_args`` is rejected rather than silently ignored. Use
+``abort_stale_uploads`` to clean up uploads that were never resumed, because
+S3 bills for their stored parts.
+
+Example::
+
+    result = upload_file("build/artifact.tar", "my-artifacts", "releases/1.2.tar")
+    print(result.etag, result.parts, result.reused_parts)
+"""
+
+import base64
+import hashlib
+import mmap
+import os
+import threading
+from dataclasses import dataclass
+from datetime import UTC, datetime
+
+import boto3
+
+import executors
+from helpers import get_s3_client
+from instrumentation import timed
+
+MIN_PART_SIZE: int = 5 * 1024 * 1024  # S3's minimum for every part but the last
+MAX_PARTS: int = 10000  # S3's limit on parts per upload
+
+# Part size used unless another is given; override with UPLOAD_PART_SIZE_MB
+DEFAULT_PART_SIZE: int = int(os.environ.get("UPLOAD_PART_SIZE_MB", "64")) * 1024 * 1024
+
+# Open uploads older than this are aborted by abort_stale_uploads
+STALE_UPLOAD_SECONDS: float = 24 * 3600.0
+
+
+class UploadIncompleteError(Exception):
+    """Raised when some parts fail; the upload is left open for a resume."""
+
+    def __init__(self, message: str, upload_id: str, completed: list, failed: dict):
+        super().__init__(message)
+        self.upload_id = upload_id  # Pass to upload_file(upload_id=...) to resume
+        self.completed = completed  # Part numbers now stored in S3
+        self.failed = failed  # Part number -> exception
+
+
+@dataclass
+class UploadResult:
+    """The outcome of one upload_file call."""
+
+    bucket: str
+    key: str
+    etag: str
+    size: int  # Bytes in the object
+    upload_id: str | None = None  # None if the file fit in one PutObject
+    parts: int = 1
+    reused_parts: int = 0  # Parts kept from an earlier, interrupted attempt
+    bytes_sent: int = 0  # Bytes actually sent by this call
+
+
+class _PartBody:
+    """A read-only, seekable file over one slice of a memory map."""
+
+    def __init__(self, mapping: mmap.mmap, offset: int, length: int):
+        self._mapping = mapping
+        self._offset = offset
+        self._length = length
+        self._position = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    def read(self, size: int = -1) -> bytes:
+        remaining = self._length - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        start = self._offset + self._position
+        self._position += size
+        return self._mapping[start : start + size]  # Copies only this chunk
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: self._length}
+        self._position = min(max(base[whence] + offset, 0), self._length)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+
+def part_size_for(size: int, part_size: int = DEFAULT_PART_SIZE) -> int:
+    """
+    Returns the part size to use for a file, growing it to stay within MAX_PARTS.
+
+    Args:
+        size (int): File size in bytes.
+        part_size (int, optional): Requested part size. Defaults to
+            DEFAULT_PART_SIZE.
+
+    Returns:
+        int: The part size in bytes.
+
+    Raises:
+        ValueError: If part_size is below S3's 5 MiB minimum.
+    """
+    if part_size < MIN_PART_SIZE:
+        raise ValueError(f"part_size must be at least {MIN_PART_SIZE} bytes")
+    needed = -(-size // MAX_PARTS)  # Ceiling division
+    if needed > part_size:
+        part_size = -(-needed // (1024 * 1024)) * 1024 * 1024  # Round up to a MiB
+    return part_size
+
+
+def part_ranges(size: int, part_size: int) -> list:
+    """
+    Splits a file into parts.
+
+    Args:
+        size (int): File size in bytes.
+        part_size (int): Part size in bytes.
+
+    Returns:
+        list: (part number, offset, length) tuples; part numbers start at 1.
+    """
+    return [
+        (number, offset, min(part_size, size - offset))
+        for number, offset in enumerate(range(0, size, part_size), start=1)
+    ]
+
+
+def find_open_upload(client: boto3.client, bucket: str, key: str) -> str:
+    """
+    Returns the most recently started open multipart upload for a key.
+
+    Args:
+        client (boto3.client): The S3 client.
+        bucket (str): The bucket name.
+        key (str): The object key.
+
+    Returns:
+        str: The upload ID, or None if there is none.
+    """
+    latest = None
+    paginator = client.get_paginator("list_multipart_uploads")
+    for page in paginator.paginate(Bucket=bucket, Prefix=key):
+        for upload in page.get("Uploads", []):
+            if upload["Key"] == key and (
+                latest is None or upload["Initiated"] > latest["Initiated"]
+            ):
+                latest = upload
+    return latest["UploadId"] if latest else None
+
+
+def _uploaded_parts(client: boto3.client, bucket: str, key: str, upload_id: str):
+    """Returns part number -> (size, ETag without quotes) for an open upload."""
+    parts = {}
+    paginator = client.get_paginator("list_parts")
+    for page in paginator.paginate(Bucket=bucket, Key=key, UploadId=upload_id):
+        for part in page.get("Parts", []):
+            parts[part["PartNumber"]] = (part["Size"], part["ETag"].strip('"'))
+    return parts
+
+
+def _send_part(client, bucket, key, upload_id, mapping, existing, part) -> tuple:
+    """Hashes one part and uploads it unless S3 already holds the same bytes."""
+    number, offset, length = part
+    with memoryview(mapping)[offset : offset + length] as view:
+        digest = hashlib.md5(view, usedforsecurity=False).digest()  # No copy
+    if existing.get(number) == (length, digest.hex()):
+        return number, f'"{digest.hex()}"', 0  # Stored by an earlier attempt
+    response = client.upload_part(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        PartNumber=number,
+        Body=_PartBody(mapping, offset, length),
+        ContentLength=length,
+        ContentMD5=base64.b64encode(digest).decode(),
+    )
+    return number, response["ETag"], length
+
+
+@timed
+def upload_file(
+    path: str,
+    bucket: str,
+    key: str,
+    client: boto3.client = None,
+    part_size: int = DEFAULT_PART_SIZE,
+    concurrency: int | None = None,
+    resume: bool = True,
+    upload_id: str | None = None,
+    abort_on_failure: bool = False,
+    **extra_args,
+) -> UploadResult:
+    """
+    Uploads a file to S3, in concurrent parts when it is larger than one part.
+
+    Args:
+        path (str): The local file.
+        bucket (str): The bucket name.
+        key (str): The object key.
+        client (boto3.client, optional): The S3 client. Defaults to one from
+            ``get_s3_client`` sized for ``concurrency``.
+        part_size (int, optional): Bytes per part, at least 5 MiB; grown if the
+            file would need more than 10,000 parts. Defaults to
+            DEFAULT_PART_SIZE.
+        concurrency (int, optional): Most parts in flight at once. Defaults to
+            the size of the "s3" pool.
+        resume (bool, optional): Continue the latest open upload for the key
+            instead of starting a new one. Defaults to True.
+        upload_id (str, optional): A specific open upload to continue.
+        abort_on_failure (bool, optional): Abort the upload instead of leaving
+            it open for a resume when parts fail. Defaults to False.
+        **extra_args: Passed to CreateMultipartUpload or PutObject, e.g.
+            ContentType or ServerSideEncryption. Only for new uploads.
+
+    Returns:
+        UploadResult: The object's ETag and what was sent.
+
+    Raises:
+        ValueError: If part_size is below 5 MiB, if upload_id is given for an
+            empty file, or if extra_args are given while resuming an upload.
+            Nothing is sent.
+        UploadIncompleteError: If some parts could not be uploaded.
+    """
+    concurrency = concurrency or executors.pool_size("s3")
+    client = client or get_s3_client(concurrency=concurrency)
+    size = os.path.getsize(path)
+    part_size = part_size_for(size, part_size)
+    if size == 0 and upload_id is not None:
+        raise ValueError(f"{path} is empty; there are no parts to resume {upload_id}")
+
+    if size <= part_size and upload_id is None:
+        with open(path, "rb") as source:  # Streamed by botocore, not read up front
+            response = client.put_object(
+                Bucket=bucket, Key=key, Body=source, **extra_args
+            )
+        return UploadResult(bucket, key, response["ETag"], size, bytes_sent=size)
+
+    if upload_id is None and resume:
+        upload_id = find_open_upload(client, bucket, key)
+    if upload_id is not None and extra_args:
+        raise ValueError(
+            f"Cannot apply {sorted(extra_args)} when resuming upload {upload_id}; "
+            "they were fixed when it started (pass resume=False for a new upload)"
+        )
+    if upload_id is None:
+        upload_id = client.create_multipart_upload(
+            Bucket=bucket, Key=key, **extra_args
+        )["UploadId"]
+        existing = {}
+    else:
+        existing = _uploaded_parts(client, bucket, key, upload_id)
+
+    parts = part_ranges(size, part_size)
+    etags, failed = {}, {}
+    bytes_sent = reused = 0
+    stop = threading.Event()  # Set on the first failure; queued parts are skipped
+    with (
+        open(path, "rb") as source,
+        mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ) as mapping,
+    ):
+
+        def send(part):
+            return _send_part(client, bucket, key, upload_id, mapping, existing, part)
+
+        for part, result in executors.map_unordered(
+            send,
+            parts,
+            pool="s3",
+            max_in_flight=concurrency,
+            cancel_event=stop,
+            return_exceptions=True,
+        ):
+            if isinstance(result, Exception):
+                failed[part[0]] = result
+                stop.set()
+            else:
+                number, etag, sent = result
+                etags[number] = etag
+                bytes_sent += sent
+                reused += not sent
+
+    if failed or len(etags) < len(parts):
+        if abort_on_failure:
+            client.abort_multipart_upload(Bucket=bucket, Key=key, UploadId=upload_id)
+        raise UploadIncompleteError(
+            f"{len(parts) - len(etags)} of {len(parts)} parts of {key} not uploaded",
+            upload_id,
+            sorted(etags),
+            failed,
+        )
+
+    response = client.complete_multipart_upload(
+        Bucket=bucket,
+        Key=key,
+        UploadId=upload_id,
+        MultipartUpload={
+            "Parts": [
+                {"PartNumber": number, "ETag": etags[number]}
+                for number in sorted(etags)
+            ]
+        },
+    )
+    return UploadResult(
+        bucket,
+        key,
+        response["ETag"],
+        size,
+        upload_id=upload_id,
+        parts=len(parts),
+        reused_parts=reused,
+        bytes_sent=bytes_sent,
+    )
+
+
+def abort_stale_uploads(
+    client: boto3.client,
+    bucket: str,
+    prefix: str = "",
+    older_than_seconds: float = STALE_UPLOAD_SECONDS,
+    now: datetime | None = None,
+) -> list:
+    """
+    Aborts open multipart uploads that were started too long ago.
+
+    Args:
+        client (boto3.client): The S3 client.
+        bucket (str): The bucket name.
+        prefix (str, optional): Only consider keys with this prefix.
+        older_than_seconds (float, optional): Minimum age of an upload to
+            abort. Defaults to one day.
+        now (datetime, optional): The current time, for tests.
+
+    Returns:
+        list: (key, upload ID) of every aborted upload.
+    """
+    now = now or datetime.now(UTC)
+    aborted = []
+    paginator = client.get_paginator("list_multipart_uploads")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+        for upload in page.get("Uploads", []):
+            if (now - upload["Initiated"]).total_seconds() >= older_than_seconds:
+                client.abort_multipart_upload(
+                    Bucket=bucket, Key=upload["Key"], UploadId=upload["UploadId"]
+                )
+                aborted.append((upload["Key"], upload["UploadId"]))
+    return aborted